@@ -0,0 +1,171 @@
+"""Limites de memória por processo: tamanho das requisições e PDFs simultâneos.
+
+Dois controles:
+
+- ``BoundedRequest``: classe de requisição do Flask com limite de corpo
+  (413 acima dele), limite por campo de texto do formulário e uploads
+  gravados em arquivo temporário a partir de um tamanho, em vez de ficarem
+  inteiros na memória;
+- ``RenderAdmission``: cada PDF em andamento reserva uma estimativa da
+  memória que vai usar (base + fator x tamanho do HTML). Acima do orçamento
+  o pedido espera até ``wait`` segundos por espaço e depois é recusado com
+  ``MemoryBusy`` (503 com Retry-After). Um render sozinho sempre é aceito,
+  mesmo maior que o orçamento, para não travar currículos grandes.
+
+Configuração por variáveis de ambiente:
+- CURRICULO_MAX_REQUEST_BYTES corpo máximo de uma requisição;
+- CURRICULO_BATCH_MAX_BYTES corpo máximo de /gerar/lote;
+- CURRICULO_MAX_FORM_FIELD_BYTES campo de texto máximo (a ``foto_url`` pode
+  ser uma data URL);
+- CURRICULO_UPLOAD_SPOOL_BYTES a partir de quanto um upload vai para disco;
+- CURRICULO_RENDER_MEMORY_BUDGET orçamento por processo (0 desliga);
+- CURRICULO_RENDER_MEMORY_BASE / CURRICULO_RENDER_MEMORY_FACTOR estimativa;
+- CURRICULO_RENDER_MEMORY_WAIT espera máxima (s) por espaço no orçamento.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from tempfile import SpooledTemporaryFile
+from typing import Any, Dict, IO, Iterator, Optional
+
+from flask import Request
+
+from render_pool import Busy
+
+MB = 1024 * 1024
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class BoundedRequest(Request):
+    """Requisição com limites de tamanho e uploads em arquivo temporário."""
+
+    max_form_memory_size = _env_int("CURRICULO_MAX_FORM_FIELD_BYTES", 4 * MB)
+    spool_bytes = _env_int("CURRICULO_UPLOAD_SPOOL_BYTES", 512 * 1024)
+    max_request_bytes = _env_int("CURRICULO_MAX_REQUEST_BYTES", 16 * MB)
+    max_batch_bytes = _env_int("CURRICULO_BATCH_MAX_BYTES", 256 * MB)
+
+    @property
+    def max_content_length(self) -> Optional[int]:
+        # O lote aceita arquivos bem maiores, lidos em streaming registro a registro
+        if self.endpoint == "gerar_lote":
+            return self.max_batch_bytes or None
+        return self.max_request_bytes or None
+
+    def _get_file_stream(
+        self,
+        total_content_length: Optional[int],
+        content_type: Optional[str],
+        filename: Optional[str] = None,
+        content_length: Optional[int] = None,
+    ) -> IO[bytes]:
+        return SpooledTemporaryFile(max_size=self.spool_bytes, mode="rb+")
+
+
+class MemoryBusy(Busy):
+    """Orçamento de memória de renderização esgotado."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Memória de renderização esgotada", retry_after)
+
+
+class RenderAdmission:
+    def __init__(
+        self,
+        budget_bytes: int = 768 * MB,
+        base_bytes: int = 32 * MB,
+        html_factor: int = 25,
+        wait: float = 10.0,
+        retry_after: int = 5,
+    ):
+        self.budget_bytes = budget_bytes
+        self.base_bytes = base_bytes
+        self.html_factor = html_factor
+        self.wait = wait
+        self.retry_after = retry_after
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._in_flight_bytes = 0
+        self.stats = {
+            "admitted": 0,
+            "deferred": 0,
+            "rejected": 0,
+            "peak_bytes": 0,
+            "peak_renders": 0,
+            "wait_seconds": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "RenderAdmission":
+        return cls(
+            budget_bytes=_env_int("CURRICULO_RENDER_MEMORY_BUDGET", 768 * MB),
+            base_bytes=_env_int("CURRICULO_RENDER_MEMORY_BASE", 32 * MB),
+            html_factor=_env_int("CURRICULO_RENDER_MEMORY_FACTOR", 25),
+            wait=float(_env_int("CURRICULO_RENDER_MEMORY_WAIT", 10)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_bytes > 0
+
+    def estimate(self, html: str) -> int:
+        """Memória estimada para renderizar este HTML (layout + PDF)."""
+        return self.base_bytes + self.html_factor * len(html)
+
+    def _fits(self, estimate: int) -> bool:
+        return self._in_flight == 0 or self._in_flight_bytes + estimate <= self.budget_bytes
+
+    @contextmanager
+    def admit(self, estimate: int) -> Iterator[Dict[str, Any]]:
+        """Reserva ``estimate`` bytes enquanto o bloco roda; levanta ``MemoryBusy``.
+
+        Devolve um dict com ``waited`` (segundos de espera; 0 se entrou direto)
+        e ``in_flight_bytes`` (total reservado logo após a admissão), para métricas.
+        """
+        if not self.enabled:
+            yield {"waited": 0.0, "in_flight_bytes": 0}
+            return
+        waited = 0.0
+        with self._cond:
+            if not self._fits(estimate):
+                self.stats["deferred"] += 1
+                started = time.perf_counter()
+                deadline = started + self.wait
+                while not self._fits(estimate):
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self.stats["rejected"] += 1
+                        raise MemoryBusy(self.retry_after)
+                    self._cond.wait(remaining)
+                waited = time.perf_counter() - started
+            self._in_flight += 1
+            self._in_flight_bytes += estimate
+            self.stats["admitted"] += 1
+            self.stats["wait_seconds"] += waited
+            self.stats["peak_bytes"] = max(self.stats["peak_bytes"], self._in_flight_bytes)
+            self.stats["peak_renders"] = max(self.stats["peak_renders"], self._in_flight)
+            info = {"waited": waited, "in_flight_bytes": self._in_flight_bytes}
+        try:
+            yield info
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._in_flight_bytes -= estimate
+                self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            info = dict(self.stats)
+            info.update(
+                enabled=self.enabled,
+                budget_bytes=self.budget_bytes,
+                in_flight=self._in_flight,
+                in_flight_bytes=self._in_flight_bytes,
+            )
+        return info
@@ -1,23 +1,97 @@
-from flask import Flask, render_template, request, make_response
-try:
-    from weasyprint import HTML
-    WEASYPRINT_OK = True
-    WEASYPRINT_ERROR = None
-except Exception as exc:  # ambiente Windows pode faltar libs do sistema
-    HTML = None
-    WEASYPRINT_OK = False
-    WEASYPRINT_ERROR = exc
+from flask import (
+    Flask,
+    Response,
+    g,
+    jsonify,
+    make_response,
+    render_template,
+    request,
+    stream_with_context,
+    url_for,
+)
+import hashlib
+import importlib
 import io
+import os
 import re
-import json
-from typing import Dict, Any
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
-
-import requests
-from bs4 import BeautifulSoup
-from docx import Document
+from urllib.parse import urlsplit
+
+
+from admission import BoundedRequest, MemoryBusy, RenderAdmission
+from batch import BatchInputError, iter_records, stream_zip
+from fetcher import ResourceFetcher
+from form_schema import parse_form, validate_cv_data
+from job_cache import JobKeywordCache
+from job_fetch import JobFetcher
+from metrics import metrics, server_timing
+from profiling import RequestProfiler
+import docx_writer
+import json_codec
+import photo
+import preview
+import ranking
+import stylesheets
+from photo import PhotoError, PhotoTooLarge, ProcessedPhoto, process_photo
+from render_cache import RenderCache, make_key as make_cache_key
+from render_jobs import QueueFull, RenderJobQueue
+from render_pool import Busy, RenderPool, RenderTimeout
 
 app = Flask(__name__)
+# Limites de tamanho do corpo e uploads grandes em arquivo temporário
+app.request_class = BoundedRequest
+render_cache = RenderCache.from_env()
+job_cache = JobKeywordCache.from_env()
+job_fetcher = JobFetcher.from_env()
+render_pool = (
+    RenderPool.from_env() if os.environ.get("CURRICULO_RENDER_POOL", "1") != "0" else None
+)
+_batch_pool = None
+resource_fetcher = ResourceFetcher.from_env()
+job_queue = RenderJobQueue.from_env()
+render_admission = RenderAdmission.from_env()
+request_profiler = RequestProfiler.from_env()
+metrics.gauge(
+    "curriculo_async_jobs",
+    "Tarefas assíncronas por estado (todos os workers)",
+    lambda: {f'status="{status}"': count for status, count in job_queue.depth().items()},
+)
+
+
+# WeasyPrint (cairo, pango, fontconfig) só é importado no primeiro PDF: tráfego
+# só de JSON/Word e quem importa o app (testes, scripts) não pagam por ele
+_weasyprint: Optional[Tuple[Any, Optional[Exception]]] = None
+_weasyprint_lock = threading.Lock()
+
+
+def weasyprint_html():
+    """Classe ``weasyprint.HTML``, importada na primeira chamada; ``None`` se indisponível."""
+    global _weasyprint
+    if _weasyprint is None:
+        with _weasyprint_lock:
+            if _weasyprint is None:
+                try:
+                    from weasyprint import HTML
+
+                    _weasyprint = (HTML, None)
+                except Exception as exc:  # ambiente Windows pode faltar libs do sistema
+                    _weasyprint = (None, exc)
+    return _weasyprint[0]
+
+
+def weasyprint_ok() -> bool:
+    return weasyprint_html() is not None
+
+
+def weasyprint_error() -> Optional[Exception]:
+    """Erro do import do WeasyPrint (tenta importar se ainda não tentou); ``None`` se carregou."""
+    weasyprint_html()
+    return _weasyprint[1]
 
 
 def sanitize_filename(name: str) -> str:
@@ -27,127 +101,366 @@ def sanitize_filename(name: str) -> str:
     return name.strip("_") or "curriculo"
 
 
-def normalize_text(text: str) -> str:
-    """Limpeza simples: tira espaços extras e garante início com maiúscula."""
-    text = (text or "").strip()
-    if not text:
-        return ""
-    # Espaços internos
-    text = re.sub(r"\s+", " ", text)
-    # Primeira letra maiúscula
-    return text[0].upper() + text[1:]
-
+def fetch_job_keywords(url: str, max_terms: int = 60) -> Dict[str, int]:
+    """Busca vaga por URL e devolve seus termos mais frequentes."""
+    if not url:
+        return {}
+    with metrics.timer("vaga"):
+        terms = job_cache.get_or_fetch(
+            url,
+            job_fetcher.download,
+            # O downloader já entrega o texto visível da página
+            lambda text: ranking.term_counts(text, max_terms),
+            variant=f"termos:{max_terms}",
+        )
+    return dict(terms or {})
 
-def normalize_period(periodo: str) -> str:
-    """Padroniza o separador do período em ' — ' sem tentar parser complexo."""
-    if not periodo:
-        return ""
-    periodo = re.sub(r"\s*[-–—]+\s*", " — ", periodo.strip())
-    return periodo
 
+def generate_word(cv_data: Dict[str, Any]) -> io.BytesIO:
+    """Gera um DOCX simples a partir dos dados do currículo (ver ``docx_writer``)."""
+    return io.BytesIO(docx_writer.write_docx(cv_data))
+
+
+def render_pdf(
+    html: str,
+    base_url: str = None,
+    pool: RenderPool = None,
+    template_name: str = None,
+    timings: Dict[str, float] = None,
+) -> bytes:
+    """Converte HTML em PDF, no pool de processos quando habilitado.
+
+    Com ``template_name``, aplica o CSS pré-compilado daquele template.
+    ``timings`` (opcional) recebe os segundos de layout e de escrita do PDF.
+    """
+    pool = pool or render_pool
+    # Na captura de perfil o WeasyPrint roda aqui, para aparecer no cProfile
+    if pool is not None and not request_profiler.capturing:
+        return pool.render(html, base_url, template_name, timings=timings)
+    started = time.perf_counter()
+    document = weasyprint_html()(
+        string=html, base_url=base_url, url_fetcher=resource_fetcher
+    ).render(
+        **stylesheets.pdf_options(template_name)
+    )
+    laid_out = time.perf_counter()
+    pdf = document.write_pdf()
+    if timings is not None:
+        timings["pdf_layout"] = laid_out - started
+        timings["pdf_escrita"] = time.perf_counter() - laid_out
+    return pdf
+
+
+# Formatos aquecidos em cada worker antes da primeira requisição
+WARM_FORMATS = {
+    name.strip()
+    for name in os.environ.get("CURRICULO_WARM_FORMATS", "pdf,word").split(",")
+    if name.strip()
+}
+
+
+def warm_up() -> None:
+    """Aquece o worker: sobe o pool de PDF ou compila o CSS no próprio processo.
+
+    Também sobe as threads da fila assíncrona, que retomam tarefas pendentes, e
+    monta o pacote base do DOCX. Só os formatos de CURRICULO_WARM_FORMATS são
+    aquecidos; os outros carregam as dependências no primeiro uso.
+    """
+    job_queue.start(run_render_job)
+    if "word" in WARM_FORMATS:
+        docx_writer.warm_up()
+    if "pdf" not in WARM_FORMATS or not weasyprint_ok():
+        return
+    if render_pool is not None:
+        render_pool.start()
+    else:
+        stylesheets.warm_up()
+
+
+def preload() -> Dict[str, float]:
+    """Carrega no processo mestre do gunicorn o que os workers só leem.
+
+    Com CURRICULO_PRELOAD=1 (ver ``gunicorn.conf.py``) roda antes do fork:
+    WeasyPrint, CSS compilado e fontes (se o PDF sai no próprio worker),
+    templates Jinja, Pillow, requests e o pacote base do DOCX ficam em
+    páginas compartilhadas (copy-on-write) por todos os workers. Nada de
+    threads, processos ou sockets aqui: isso é por worker (``warm_up``).
+    Conexões SQLite também não passam pelo fork: métricas, cache de vagas e
+    fila de tarefas criam o esquema ao importar com uma conexão que fecham
+    em seguida, e cada processo abre as suas no primeiro uso. Devolve os
+    segundos de cada parte.
+    """
+    timings: Dict[str, float] = {}
+
+    def step(name: str, fn) -> None:
+        started = time.perf_counter()
+        fn()
+        timings[name] = round(time.perf_counter() - started, 4)
+
+    step("weasyprint", weasyprint_html)
+    # Com o pool, o PDF sai de processos próprios (spawn), que compilam o seu CSS
+    if render_pool is None and weasyprint_ok():
+        step("css", stylesheets.warm_up)
+    templates = (*PDF_TEMPLATES.values(), "index.html")
+    step("templates", lambda: [app.jinja_env.get_template(name) for name in templates])
+    step("pillow", photo.pil)
+    step("requests", lambda: importlib.import_module("requests"))
+    step("docx", docx_writer.warm_up)
+    return timings
+
+
+# Templates de PDF por estilo; estilos desconhecidos caem no corporativo
+PDF_TEMPLATES = {
+    "corporativo": "resume_template.html",
+    "minimalista": "resume_template_minimal.html",
+    "ats": "resume_template_ats.html",
+}
+
+# Formato -> (Content-Type, extensão do arquivo)
+EXPORT_FORMATS = {
+    "pdf": ("application/pdf", "pdf"),
+    "word": (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "docx",
+    ),
+    "json": ("application/json; charset=utf-8", "json"),
+}
+
+
+def export_format(output_format: str) -> str:
+    """Qualquer formato diferente de json/word gera PDF, como sempre foi."""
+    return output_format if output_format in EXPORT_FORMATS else "pdf"
+
+
+@dataclass
+class RenderedDocument:
+    payload: bytes
+    output_format: str
+    cache_key: str
+    cache_hit: bool = False
+
+
+def build_document(
+    cv_data: Dict[str, Any],
+    template_style: str,
+    output_format: str,
+    base_url: str = None,
+    pool: RenderPool = None,
+) -> RenderedDocument:
+    """Gera o arquivo final (ou reaproveita do cache)."""
+    output_format = export_format(output_format)
+    cache_key = make_cache_key(cv_data, template_style, output_format)
+    # Numa captura de perfil o documento é sempre gerado: o custo real é o que interessa
+    payload = None if request_profiler.capturing else render_cache.get(cache_key)
+    if payload is not None:
+        metrics.inc("curriculo_documents_total", format=output_format, cache="hit")
+        return RenderedDocument(payload, output_format, cache_key, cache_hit=True)
 
-def fetch_job_keywords(url: str, max_keywords: int = 30) -> set:
-    """Busca vaga por URL e extrai palavras-chave simples."""
-    if not url:
-        return set()
+    if output_format == "json":
+        with metrics.timer("json", format="json"):
+            payload = json_codec.dumps_pretty(cv_data)
+    elif output_format == "word":
+        with metrics.timer("docx", format="word"):
+            payload = generate_word(cv_data).getvalue()
+    else:
+        if template_style not in PDF_TEMPLATES:
+            template_style = "corporativo"
+        template_pdf = PDF_TEMPLATES[template_style]
+        # Com CSS pré-compilado, o HTML leva só os dados (sem o bloco <style>)
+        with metrics.timer("template", template=template_style):
+            html = render_template(template_pdf, css_externo=stylesheets.ENABLED, **cv_data)
+        timings: Dict[str, float] = {}
+        try:
+            # Reserva a memória estimada do render (espera ou recusa acima do orçamento)
+            with render_admission.admit(render_admission.estimate(html)) as admitted:
+                if admitted["waited"]:
+                    timings["admissao"] = admitted["waited"]
+                metrics.inc(
+                    "curriculo_render_admission_total",
+                    result="deferred" if admitted["waited"] else "admitted",
+                )
+                metrics.histogram("curriculo_render_memory_bytes", admitted["in_flight_bytes"])
+                payload = render_pdf(
+                    html,
+                    base_url=base_url,
+                    pool=pool,
+                    template_name=template_pdf if stylesheets.ENABLED else None,
+                    timings=timings,
+                )
+        except MemoryBusy:
+            metrics.inc("curriculo_render_admission_total", result="rejected")
+            raise
+        finally:
+            for stage, seconds in timings.items():
+                metrics.observe(stage, seconds, template=template_style)
+
+    metrics.histogram("curriculo_output_bytes", len(payload), format=output_format)
+    metrics.inc("curriculo_documents_total", format=output_format, cache="miss")
+    render_cache.put(cache_key, payload)
+    return RenderedDocument(payload, output_format, cache_key)
+
+
+def prepare_template(template_style: str, output_format: str) -> None:
+    """Carrega (e compila, na primeira vez) o template do PDF enquanto a vaga é baixada."""
+    if export_format(output_format) == "pdf":
+        app.jinja_env.get_template(PDF_TEMPLATES.get(template_style, PDF_TEMPLATES["corporativo"]))
+
+
+def send_document(payload: bytes, output_format: str, filename: str):
+    """Envia o arquivo direto do buffer, sem cópias extras.
+
+    A resposta usa os próprios ``bytes`` (``direct_passthrough``): nada de
+    ``BytesIO``, cujo ``getbuffer()`` no ``send_file`` duplicaria o conteúdo.
+    ``make_conditional`` cuida do ETag (hash do conteúdo), do 304 e das
+    requisições Range para retomar downloads.
+    """
+    mimetype, _ = EXPORT_FORMATS[output_format]
+    etag = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    response = Response(payload, mimetype=mimetype, direct_passthrough=True)
+    response.content_length = len(payload)
+    response.headers.set("Content-Disposition", "attachment", filename=filename)
+    response.cache_control.no_cache = True
+    response.cache_control.max_age = 0
+    response.set_etag(etag)
+    return response.make_conditional(
+        request, accept_ranges=True, complete_length=len(payload)
+    )
+
+
+def weasyprint_unavailable():
+    # Falha amigável se as bibliotecas de sistema do WeasyPrint não estiverem instaladas
+    msg = (
+        "Não foi possível gerar o PDF neste ambiente porque o WeasyPrint "
+        "não conseguiu carregar as bibliotecas de sistema necessárias. "
+        "Em Windows, instale o pacote oficial conforme a documentação: "
+        "https://doc.courtbouillon.org/weasyprint/stable/first_steps.html#installation.\n\n"
+    )
+    msg += f"Detalhes técnicos: {weasyprint_error()}"
+    return msg, 500
+
+
+def document_filename(cv_data: Dict[str, Any], output_format: str) -> str:
+    _, ext = EXPORT_FORMATS[output_format]
+    return f"curriculo_{sanitize_filename(cv_data.get('nome') or 'curriculo')}.{ext}"
+
+
+def document_response(cv_data: Dict[str, Any], template_style: str, output_format: str):
+    """Gera o documento e monta a resposta (ou o erro amigável) de /gerar e /api/gerar."""
     try:
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-    except Exception:
-        return set()
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
-    text = soup.get_text(" ")
-    text = re.sub(r"\s+", " ", text)
-    words = re.findall(r"[A-Za-zÀ-ÖØ-öø-ÿ]{4,}", text.lower())
-    freq: Dict[str, int] = {}
-    for w in words:
-        freq[w] = freq.get(w, 0) + 1
-    sorted_words = sorted(freq.items(), key=lambda x: x[1], reverse=True)
-    return {w for w, _ in sorted_words[:max_keywords]}
-
-
-def score_text(text: str, keywords: set) -> int:
-    if not text or not keywords:
-        return 0
-    words = set(re.findall(r"[A-Za-zÀ-ÖØ-öø-ÿ]{4,}", text.lower()))
-    return len(words & keywords)
+        document = build_document(
+            cv_data, template_style, output_format, base_url=request.base_url
+        )
+    except Busy as exc:
+        # Servidor sobrecarregado: responde rápido em vez de acumular na fila
+        if isinstance(exc, MemoryBusy):
+            kind = "memoria"
+            message = (
+                "O servidor está no limite de memória para gerar PDFs. "
+                "Tente novamente em instantes."
+            )
+        else:
+            kind = "fila_cheia"
+            message = "Muitos currículos sendo gerados agora. Tente novamente em instantes."
+        metrics.inc("curriculo_errors_total", stage="pdf", kind=kind)
+        response = make_response(message, 503)
+        response.headers["Content-Type"] = "text/plain; charset=utf-8"
+        response.headers["Retry-After"] = str(exc.retry_after)
+        return response
+    except RenderTimeout as exc:
+        metrics.inc("curriculo_errors_total", stage="pdf", kind="timeout")
+        response = make_response(f"Tempo esgotado ao gerar o PDF: {exc}", 504)
+        response.headers["Content-Type"] = "text/plain; charset=utf-8"
+        return response
+    except Exception as exc:  # fallback amigável caso o WeasyPrint falhe no ambiente
+        fmt = export_format(output_format)
+        metrics.inc("curriculo_errors_total", stage=fmt, kind=type(exc).__name__)
+        if fmt != "pdf":
+            raise
+        message = (
+            "Erro ao gerar PDF. Parece que o WeasyPrint não está totalmente "
+            "configurado neste sistema (bibliotecas gráficas ausentes). "
+            "Siga as instruções de instalação em https://weasyprint.org/ "
+            "ou use a imagem Docker incluída no projeto.\n\n"
+            f"Detalhes técnicos: {type(exc).__name__}: {exc}"
+        )
+        response = make_response(message, 500)
+        response.headers["Content-Type"] = "text/plain; charset=utf-8"
+        return response
 
+    filename = document_filename(cv_data, document.output_format)
 
-def generate_word(cv_data: Dict[str, Any]) -> io.BytesIO:
-    """Gera um DOCX simples a partir dos dados do currículo."""
-    doc = Document()
-
-    doc.add_heading(cv_data.get("nome") or "Currículo", level=0)
-    if cv_data.get("titulo"):
-        doc.add_paragraph(cv_data["titulo"])
-
-    contato_parts = []
-    for k in ("email", "telefone", "endereco", "portfolio"):
-        v = cv_data.get(k)
-        if v:
-            contato_parts.append(str(v))
-    if contato_parts:
-        doc.add_paragraph(" | ".join(contato_parts))
-
-    if cv_data.get("resumo"):
-        doc.add_heading("Resumo profissional", level=1)
-        doc.add_paragraph(cv_data["resumo"])
-
-    if cv_data.get("experiencias"):
-        doc.add_heading("Experiência profissional", level=1)
-        for exp in cv_data["experiencias"]:
-            titulo = " | ".join(
-                [
-                    part
-                    for part in [exp.get("cargo"), exp.get("empresa"), exp.get("periodo")]
-                    if part
-                ]
-            )
-            if titulo:
-                doc.add_paragraph(titulo, style="List Bullet")
-            if exp.get("descricao"):
-                doc.add_paragraph(exp["descricao"])
-
-    if cv_data.get("formacoes"):
-        doc.add_heading("Formação", level=1)
-        for edu in cv_data["formacoes"]:
-            linha = " | ".join(
-                [
-                    part
-                    for part in [
-                        edu.get("curso"),
-                        edu.get("instituicao"),
-                        edu.get("cidade"),
-                        edu.get("ano"),
-                        edu.get("status"),
-                    ]
-                    if part
-                ]
-            )
-            if linha:
-                doc.add_paragraph(linha, style="List Bullet")
-
-    if any(
-        cv_data.get(k)
-        for k in ("skills_tecnicas", "skills_comportamentais", "skills_outras")
-    ):
-        doc.add_heading("Habilidades", level=1)
-        for label, key in (
-            ("Técnicas", "skills_tecnicas"),
-            ("Comportamentais", "skills_comportamentais"),
-            ("Outras", "skills_outras"),
-        ):
-            skills = cv_data.get(key) or []
-            if skills:
-                doc.add_paragraph(f"{label}: {', '.join(skills)}")
-
-    buf = io.BytesIO()
-    doc.save(buf)
-    buf.seek(0)
-    return buf
+    response = send_document(document.payload, document.output_format, filename)
+    response.headers["X-Cache"] = "HIT" if document.cache_hit else "MISS"
+    if render_cache.enabled and render_cache.disk_dir:
+        # URL GET estável para o mesmo arquivo: permite cache e retomada (Range).
+        # Só com o cache em disco, que todos os workers enxergam: o da memória é
+        # de cada processo e o GET seguinte pode cair noutro worker (404)
+        response.headers["Content-Location"] = url_for(
+            "baixar_arquivo", cache_key=document.cache_key, filename=filename
+        )
+    return response
+
+
+def uploaded_photo() -> Optional[ProcessedPhoto]:
+    """Foto enviada em ``foto_arquivo``, já reduzida; ``None`` se não houver upload.
+
+    WeasyPrint aceita data URL; mantemos tudo em memória, sem salvar em disco.
+    A foto é reduzida ao tamanho de impressão antes de virar base64, lida do
+    arquivo temporário do upload, sem uma cópia inteira em memória.
+    """
+    foto_arquivo = request.files.get("foto_arquivo")
+    if not (foto_arquivo and foto_arquivo.filename):
+        return None
+    with metrics.timer("foto"):
+        return process_photo(foto_arquivo.stream, foto_arquivo.mimetype)
+
+
+def embedded_photo(cv_data: Dict[str, Any]) -> None:
+    """Reduz a foto que veio como data URL no JSON, como um upload (ver ``photo``).
+
+    Sem isso uma data URL de megabytes iria inteira para o HTML e o WeasyPrint.
+    Levanta ``PhotoError`` se a imagem for inválida.
+    """
+    foto_url = cv_data.get("foto_url") or ""
+    if not foto_url.startswith("data:"):
+        return
+    with metrics.timer("foto"):
+        processed = photo.process_data_url(foto_url)
+    if processed is not None:
+        cv_data["foto_url"] = processed.data_url()
+
+
+def photo_error(exc: PhotoError):
+    if isinstance(exc, PhotoTooLarge):
+        metrics.inc("curriculo_errors_total", stage="foto", kind="foto_grande")
+        return str(exc), 413
+    metrics.inc("curriculo_errors_total", stage="foto", kind="foto_invalida")
+    return str(exc), 400
+
+
+@app.errorhandler(413)
+def request_too_large(exc):
+    metrics.inc("curriculo_errors_total", stage="requisicao", kind="muito_grande")
+    limit = request.max_content_length
+    message = "Requisição grande demais."
+    if limit:
+        message += f" O limite é {limit // (1024 * 1024)} MB."
+    return message, 413, {"Content-Type": "text/plain; charset=utf-8"}
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _add_server_timing(response):
+    """Tempos das etapas no cabeçalho Server-Timing (visível no DevTools)."""
+    if g.get("server_timing"):
+        total = time.perf_counter() - g.request_started
+        metrics.observe("total", total, endpoint=request.endpoint or "")
+        response.headers["Server-Timing"] = server_timing()
+    return response
 
 
 @app.route("/", methods=["GET"])
@@ -156,346 +469,453 @@ def index():
 
 
 @app.route("/gerar", methods=["POST"])
+@request_profiler.profiled
 def gerar():
-    if not WEASYPRINT_OK:
-        # Falha amigável se as bibliotecas de sistema do WeasyPrint não estiverem instaladas
-        msg = (
-            "Não foi possível gerar o PDF neste ambiente porque o WeasyPrint "
-            "não conseguiu carregar as bibliotecas de sistema necessárias. "
-            "Em Windows, instale o pacote oficial conforme a documentação: "
-            "https://doc.courtbouillon.org/weasyprint/stable/first_steps.html#installation.\n\n"
-        )
-        msg += f"Detalhes técnicos: {WEASYPRINT_ERROR}"
-        return msg, 500
-
-    # Limites simples de segurança (poderia ser ajustado)
-    max_len = 4000
-
-    def limited(field):
-        value = request.form.get(field, "").strip()
-        return value[:max_len]
-
-    def limited_list(field):
-        values = request.form.getlist(field)
-        result = []
-        for v in values:
-            v = (v or "").strip()
-            result.append(v[:max_len])
-        return result
-
-    nome = normalize_text(limited("nome"))
-    titulo = normalize_text(limited("titulo"))
-    email = limited("email")
-    telefone = limited("telefone")
-    endereco = normalize_text(limited("endereco"))
-    # Foto: prioriza upload, cai para URL se não houver arquivo
-    foto_url = limited("foto_url")
-    foto_arquivo = request.files.get("foto_arquivo")
-    if foto_arquivo and foto_arquivo.filename:
-        # WeasyPrint aceita data URL; mantemos tudo em memória, sem salvar em disco
-        foto_bytes = foto_arquivo.read()
-        import base64
-
-        mime = foto_arquivo.mimetype or "image/jpeg"
-        b64 = base64.b64encode(foto_bytes).decode("ascii")
-        foto_url = f"data:{mime};base64,{b64}"
-    resumo = normalize_text(limited("resumo"))[:1000]
-
     job_url = request.form.get("job_url", "").strip()
     output_format = request.form.get("output_format", "pdf").lower()
+    if export_format(output_format) == "pdf" and not weasyprint_ok():
+        return weasyprint_unavailable()
     template_style = request.form.get("template_style", "corporativo").lower()
+    modo_async = (request.form.get("modo") or request.args.get("modo")) == "async"
+    # A vaga começa a ser baixada já, em paralelo com formulário, foto e template
+    job_future = None if modo_async else job_fetcher.start(
+        fetch_job_keywords, job_url, inline=request_profiler.capturing
+    )
 
-    # Experiências profissionais (múltiplas)
-    exp_empresas = limited_list("exp_empresa")
-    exp_cargos = limited_list("exp_cargo")
-    exp_periodos = [normalize_period(p) for p in limited_list("exp_periodo")]
-    exp_descricoes = limited_list("exp_descricao")
-    exp_locais = limited_list("exp_local")
-    exp_conquistas = limited_list("exp_conquistas")
-    exp_tecnologias = limited_list("exp_tech")
-
-    experiencias = []
-    for empresa, cargo, periodo, descricao, local, conquistas, tecnologias in zip(
-        exp_empresas,
-        exp_cargos,
-        exp_periodos,
-        exp_descricoes,
-        exp_locais,
-        exp_conquistas,
-        exp_tecnologias,
-    ):
-        if not (empresa or cargo or periodo or descricao or local or conquistas or tecnologias):
-            continue
-        experiencias.append(
-            {
-                "empresa": empresa,
-                "cargo": cargo,
-                "periodo": periodo,
-                "descricao": descricao,
-                "local": local,
-                "conquistas": conquistas,
-                "tecnologias": tecnologias,
-            }
-        )
+    # Campos do currículo: uma única passada pelo formulário (ver form_schema)
+    with metrics.timer("formulario"):
+        cv_data: Dict[str, Any] = parse_form(request.form)
+    cv_data["data_geracao"] = datetime.now().strftime("%d/%m/%Y")
 
-    # Formação / educação (múltiplas)
-    edu_cursos = limited_list("edu_curso")
-    edu_insts = limited_list("edu_inst")
-    edu_cidades = limited_list("edu_cidade")
-    edu_anos = limited_list("edu_ano")
-    edu_status_list = limited_list("edu_status")
-
-    formacoes = []
-    for curso, inst, cidade, ano, status in zip(
-        edu_cursos, edu_insts, edu_cidades, edu_anos, edu_status_list
-    ):
-        if not (curso or inst or cidade or ano or status):
-            continue
-        formacoes.append(
-            {
-                "curso": curso,
-                "instituicao": inst,
-                "cidade": cidade,
-                "ano": ano,
-                "status": status,
-            }
-        )
+    # Foto: prioriza upload, cai para URL se não houver arquivo
+    try:
+        foto = uploaded_photo()
+    except PhotoError as exc:
+        return photo_error(exc)
+    if foto is not None:
+        cv_data["foto_url"] = foto.data_url()
+
+    if modo_async:
+        return submit_render_job(cv_data, template_style, output_format, job_url)
+    prepare_template(template_style, output_format)
+
+    # Inteligência básica: usar vaga (se URL fornecida) para priorizar palavras-chave.
+    # Se a vaga passar do orçamento de latência, o currículo sai sem esse ajuste.
+    job_terms = job_fetcher.wait(job_future, {})
+    with metrics.timer("ranking"):
+        ranking.rank_cv(cv_data, ranking.job_weights(job_terms))
+
+    response = document_response(cv_data, template_style, output_format)
+    if foto is not None:
+        response.headers["X-Photo-Original-Bytes"] = str(foto.original_bytes)
+        response.headers["X-Photo-Processed-Bytes"] = str(foto.processed_bytes)
 
-    # Habilidades em categorias
-    skills_tecnicas_raw = limited("skills_tecnicas")
-    skills_comport_raw = limited("skills_comportamentais")
-    skills_outras_raw = limited("skills_outras")
-
-    def parse_skills(raw: str):
-        return [s.strip() for s in raw.split(",") if s.strip()]
-
-    skills_tecnicas = parse_skills(skills_tecnicas_raw)
-    skills_comportamentais = parse_skills(skills_comport_raw)
-    skills_outras = parse_skills(skills_outras_raw)
-
-    # Certificações
-    cert_nomes = limited_list("cert_nome")
-    cert_insts = limited_list("cert_inst")
-    cert_anos = limited_list("cert_ano")
-    cert_codigos = limited_list("cert_codigo")
-
-    certificacoes = []
-    for nome_c, inst_c, ano_c, cod in zip(
-        cert_nomes, cert_insts, cert_anos, cert_codigos
-    ):
-        if not (nome_c or inst_c or ano_c or cod):
-            continue
-        certificacoes.append(
-            {
-                "nome": nome_c,
-                "instituicao": inst_c,
-                "ano": ano_c,
-                "codigo": cod,
-            }
-        )
+    return response
 
-    # Projetos
-    proj_nomes = limited_list("proj_nome")
-    proj_tecs = limited_list("proj_tec")
-    proj_descs = limited_list("proj_desc")
-    proj_links = limited_list("proj_link")
-
-    projetos = []
-    for nome_p, tec_p, desc_p, link_p in zip(
-        proj_nomes, proj_tecs, proj_descs, proj_links
-    ):
-        if not (nome_p or tec_p or desc_p or link_p):
-            continue
-        projetos.append(
-            {
-                "nome": nome_p,
-                "tecnologias": tec_p,
-                "descricao": desc_p,
-                "link": link_p,
-            }
-        )
 
-    # Idiomas
-    idioma_nomes = limited_list("idioma_nome")
-    idioma_niveis = limited_list("idioma_nivel")
-
-    idiomas = []
-    for nome_i, nivel_i in zip(idioma_nomes, idioma_niveis):
-        if not (nome_i or nivel_i):
-            continue
-        idiomas.append({"nome": nome_i, "nivel": nivel_i})
-
-    # Cursos / workshops
-    curso_extra_nomes = limited_list("curso_extra_nome")
-    curso_extra_cargas = limited_list("curso_extra_carga")
-    curso_extra_insts = limited_list("curso_extra_inst")
-    curso_extra_anos = limited_list("curso_extra_ano")
-
-    cursos_extra = []
-    for nome_e, carga_e, inst_e, ano_e in zip(
-        curso_extra_nomes, curso_extra_cargas, curso_extra_insts, curso_extra_anos
-    ):
-        if not (nome_e or carga_e or inst_e or ano_e):
-            continue
-        cursos_extra.append(
-            {
-                "nome": nome_e,
-                "carga": carga_e,
-                "instituicao": inst_e,
-                "ano": ano_e,
-            }
+@app.route("/preview", methods=["POST"])
+def preview_html():
+    """Prévia em HTML do template escolhido, sem passar pelo WeasyPrint.
+
+    Recebe o mesmo formulário de /gerar (ou um ``cv_data`` em JSON, como
+    /api/gerar). As seções inalteradas vêm do cache de fragmentos (ver
+    ``preview``) e o ETag permite responder 304 quando nada mudou.
+    """
+    if request.is_json:
+        try:
+            body = json_codec.loads(request.get_data())
+        except ValueError:
+            return "Corpo da requisição não é um JSON válido.", 400
+        params = body if isinstance(body, dict) and isinstance(body.get("cv_data"), dict) else {}
+        cv_data, errors = validate_cv_data(params.get("cv_data", body))
+        if errors:
+            return jsonify({"erros": errors}), 400
+        try:
+            embedded_photo(cv_data)
+        except PhotoError as exc:
+            return photo_error(exc)
+        template_style = str(
+            params.get("template_style") or request.args.get("template_style") or ""
         )
+    else:
+        with metrics.timer("formulario"):
+            cv_data = parse_form(request.form)
+        try:
+            foto = uploaded_photo()
+        except PhotoError as exc:
+            return photo_error(exc)
+        if foto is not None:
+            cv_data["foto_url"] = foto.data_url()
+        template_style = request.form.get("template_style", "")
+    cv_data.setdefault("data_geracao", datetime.now().strftime("%d/%m/%Y"))
+    template_style = template_style.lower()
+    if template_style not in PDF_TEMPLATES:
+        template_style = "corporativo"
+    template_name = PDF_TEMPLATES[template_style]
+
+    # Prévia com o CSS embutido, para abrir sozinha no navegador/iframe
+    context = dict(cv_data, css_externo=False)
+    tag = preview.etag(app.jinja_env, template_name, context)
+    # O Werkzeug só trata If-None-Match em GET/HEAD; aqui a prévia é POST
+    if request.if_none_match.contains(tag):
+        response = make_response("", 304)
+    else:
+        app.update_template_context(context)
+        with metrics.timer("preview", template=template_style):
+            html = preview.render(app.jinja_env, template_name, context)
+        response = make_response(html)
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response.set_etag(tag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
-    # Prêmios e reconhecimentos
-    premio_titulos = limited_list("premio_titulo")
-    premio_insts = limited_list("premio_inst")
-    premio_anos = limited_list("premio_ano")
-    premio_descs = limited_list("premio_desc")
-
-    premios = []
-    for titulo_p, inst_p, ano_p, desc_pr in zip(
-        premio_titulos, premio_insts, premio_anos, premio_descs
-    ):
-        if not (titulo_p or inst_p or ano_p or desc_pr):
-            continue
-        premios.append(
-            {
-                "titulo": titulo_p,
-                "instituicao": inst_p,
-                "ano": ano_p,
-                "descricao": desc_pr,
-            }
+
+@app.route("/api/gerar", methods=["POST"])
+@request_profiler.profiled
+def api_gerar():
+    """Gera o currículo a partir de um ``cv_data`` em JSON, sem formulário HTML.
+
+    Aceita ``{"cv_data": {...}, "template_style": ..., "output_format": ...,
+    "job_url": ...}`` ou o próprio ``cv_data`` no corpo (por exemplo o JSON
+    exportado por /gerar), com as opções na query string. Os textos não são
+    normalizados de novo, só validados contra o esquema do formulário.
+    """
+    try:
+        body = json_codec.loads(request.get_data())
+    except ValueError:
+        return "Corpo da requisição não é um JSON válido.", 400
+    if isinstance(body, dict) and isinstance(body.get("cv_data"), dict):
+        params = body
+        raw_cv = body["cv_data"]
+    else:
+        params = request.args
+        raw_cv = body
+
+    output_format = str(params.get("output_format") or "pdf").lower()
+    template_style = str(params.get("template_style") or "corporativo").lower()
+    if export_format(output_format) == "pdf" and not weasyprint_ok():
+        return weasyprint_unavailable()
+    job_url = str(params.get("job_url") or "").strip()
+    modo_async = str(params.get("modo") or "") == "async"
+    job_future = None if modo_async else job_fetcher.start(
+        fetch_job_keywords, job_url, inline=request_profiler.capturing
+    )
+
+    cv_data, errors = validate_cv_data(raw_cv)
+    if errors:
+        return jsonify({"erros": errors}), 400
+    try:
+        embedded_photo(cv_data)
+    except PhotoError as exc:
+        return photo_error(exc)
+    cv_data.setdefault("data_geracao", datetime.now().strftime("%d/%m/%Y"))
+
+    if modo_async:
+        return submit_render_job(cv_data, template_style, output_format, job_url)
+    if job_future is not None:
+        prepare_template(template_style, output_format)
+        job_terms = job_fetcher.wait(job_future, {})
+        with metrics.timer("ranking"):
+            ranking.rank_cv(cv_data, ranking.job_weights(job_terms))
+
+    return document_response(cv_data, template_style, output_format)
+
+
+def run_render_job(job: Dict[str, Any]) -> Tuple[str, str, bytes]:
+    """Executa uma tarefa da fila assíncrona (thread em segundo plano)."""
+    cv_data = job["cv_data"]
+    with app.app_context():
+        if job.get("job_url"):
+            ranking.rank_cv(cv_data, ranking.job_weights(fetch_job_keywords(job["job_url"])))
+        document = build_document(
+            cv_data, job["template_style"], job["output_format"], base_url=job.get("base_url")
         )
+    filename = document_filename(cv_data, document.output_format)
+    return filename, document.output_format, document.payload
+
+
+def async_unavailable():
+    """503 quando a fila assíncrona não conseguiu abrir o seu SQLite."""
+    response = make_response(
+        "A geração em segundo plano está indisponível no momento. "
+        "Gere o currículo sem o modo assíncrono.",
+        503,
+    )
+    response.headers["Content-Type"] = "text/plain; charset=utf-8"
+    return response
 
-    # Voluntariado
-    vol_orgs = limited_list("vol_org")
-    vol_funcoes = limited_list("vol_funcao")
-    vol_periodos = limited_list("vol_periodo")
-    vol_descs = limited_list("vol_desc")
-
-    voluntariados = []
-    for org_v, func_v, per_v, desc_v in zip(
-        vol_orgs, vol_funcoes, vol_periodos, vol_descs
-    ):
-        if not (org_v or func_v or per_v or desc_v):
-            continue
-        voluntariados.append(
+
+def submit_render_job(
+    cv_data: Dict[str, Any], template_style: str, output_format: str, job_url: str
+):
+    """Enfileira a geração e responde 202 com o endereço para acompanhar a tarefa."""
+    if not job_queue.enabled:
+        return async_unavailable()
+    try:
+        job_id = job_queue.submit(
             {
-                "organizacao": org_v,
-                "funcao": func_v,
-                "periodo": per_v,
-                "descricao": desc_v,
+                "cv_data": cv_data,
+                "template_style": template_style,
+                "output_format": output_format,
+                "job_url": job_url,
+                "base_url": request.base_url,
             }
         )
-
-    # Publicações (texto livre, opcional)
-    publicacoes_texto = limited("publicacoes")
-
-    # Inteligência básica: usar vaga (se URL fornecida) para priorizar palavras-chave
-    keywords = fetch_job_keywords(job_url)
-    if keywords:
-        for lista_nome in ("skills_tecnicas", "skills_comportamentais", "skills_outras"):
-            lst = locals().get(lista_nome) or []
-            lst.sort(key=lambda s: score_text(s, keywords), reverse=True)
-            locals()[lista_nome] = lst
-
-        experiencias.sort(
-            key=lambda e: score_text(
-                " ".join(
-                    [
-                        e.get("cargo", ""),
-                        e.get("empresa", ""),
-                        e.get("descricao", ""),
-                        e.get("conquistas", ""),
-                        e.get("tecnologias", ""),
-                    ]
-                ),
-                keywords,
-            ),
-            reverse=True,
+    except QueueFull as exc:
+        response = make_response(
+            "Muitos currículos na fila agora. Tente novamente em instantes.", 503
         )
-
-    # Pacote único de dados do currículo para PDF/Word/JSON
-    cv_data: Dict[str, Any] = {
-        "nome": nome,
-        "titulo": titulo,
-        "email": email,
-        "telefone": telefone,
-        "endereco": endereco,
-        "foto_url": foto_url,
-        "resumo": resumo,
-        "experiencias": experiencias,
-        "formacoes": formacoes,
-        "skills_tecnicas": skills_tecnicas,
-        "skills_comportamentais": skills_comportamentais,
-        "skills_outras": skills_outras,
-        "certificacoes": certificacoes,
-        "projetos": projetos,
-        "idiomas": idiomas,
-        "cursos_extra": cursos_extra,
-        "premios": premios,
-        "voluntariados": voluntariados,
-        "publicacoes_texto": publicacoes_texto,
-        "data_geracao": datetime.now().strftime("%d/%m/%Y"),
-    }
-
-    # Exportar em JSON
-    if output_format == "json":
-        payload = json.dumps(cv_data, ensure_ascii=False, indent=2)
-        safe_name = sanitize_filename(nome or "curriculo")
-        filename = f"curriculo_{safe_name}.json"
-        resp = make_response(payload)
-        resp.headers["Content-Type"] = "application/json; charset=utf-8"
-        resp.headers["Content-Disposition"] = f"attachment; filename={filename}"
-        return resp
-
-    # Exportar em Word
-    if output_format == "word":
-        doc_io = generate_word(cv_data)
-        safe_name = sanitize_filename(nome or "curriculo")
-        filename = f"curriculo_{safe_name}.docx"
-        response = make_response(doc_io.read())
-        response.headers[
-            "Content-Type"
-        ] = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+        response.headers["Content-Type"] = "text/plain; charset=utf-8"
+        response.headers["Retry-After"] = str(exc.retry_after)
         return response
+    except sqlite3.Error:
+        # Banco travado, só leitura ou sem espaço: mesma resposta da fila desligada
+        metrics.inc("curriculo_errors_total", stage="tarefa", kind="fila_indisponivel")
+        return async_unavailable()
+    job_queue.start(run_render_job)
+    status_url = url_for("tarefa_status", job_id=job_id)
+    response = jsonify(
+        {
+            "id": job_id,
+            "status": "queued",
+            "status_url": status_url,
+            "download_url": url_for("tarefa_arquivo", job_id=job_id),
+        }
+    )
+    response.status_code = 202
+    response.headers["Location"] = status_url
+    return response
 
-    # Escolha de template PDF
-    if template_style == "minimalista":
-        template_pdf = "resume_template_minimal.html"
-    elif template_style == "ats":
-        template_pdf = "resume_template_ats.html"
-    else:
-        template_pdf = "resume_template.html"
 
-    html = render_template(template_pdf, **cv_data)
+@app.route("/tarefas/<job_id>", methods=["GET"])
+def tarefa_status(job_id: str):
+    """Estado de uma tarefa assíncrona (queued, running, done ou error)."""
+    if not job_queue.enabled:
+        return async_unavailable()
+    info = job_queue.get(job_id) if re.fullmatch(r"[0-9a-f]{32}", job_id) else None
+    if info is None:
+        return "Tarefa expirada ou inexistente. Gere o currículo novamente.", 404
+    if info["status"] == "done":
+        info["download_url"] = url_for("tarefa_arquivo", job_id=job_id)
+    response = jsonify(info)
+    if info["status"] in ("queued", "running"):
+        response.headers["Retry-After"] = "1"
+    return response
 
-    pdf_io = io.BytesIO()
-    try:
-        HTML(string=html, base_url=request.base_url).write_pdf(pdf_io)
-    except Exception as exc:  # fallback amigável caso o WeasyPrint falhe no ambiente
-        message = (
-            "Erro ao gerar PDF. Parece que o WeasyPrint não está totalmente "
-            "configurado neste sistema (bibliotecas gráficas ausentes). "
-            "Siga as instruções de instalação em https://weasyprint.org/ "
-            "ou use a imagem Docker incluída no projeto.\n\n"
-            f"Detalhes técnicos: {type(exc).__name__}: {exc}"
+
+@app.route("/tarefas/<job_id>/arquivo", methods=["GET"])
+def tarefa_arquivo(job_id: str):
+    """Baixa o arquivo de uma tarefa concluída (até expirar)."""
+    if not job_queue.enabled:
+        return async_unavailable()
+    if not re.fullmatch(r"[0-9a-f]{32}", job_id):
+        return "Tarefa expirada ou inexistente. Gere o currículo novamente.", 404
+    result = job_queue.result(job_id)
+    if result is None:
+        info = job_queue.get(job_id)
+        if info is None:
+            return "Tarefa expirada ou inexistente. Gere o currículo novamente.", 404
+        if info["status"] == "error":
+            return f"A geração falhou: {info['error']}", 500
+        return "O currículo ainda está sendo gerado. Consulte o status da tarefa.", 409
+    filename, output_format, payload = result
+    return send_document(payload, output_format, filename)
+
+
+def batch_pool() -> Optional[RenderPool]:
+    """Pool separado para lotes, para não disputar processos com o /gerar."""
+    global _batch_pool
+    if render_pool is None:
+        return None
+    if _batch_pool is None:
+        workers = int(os.environ.get("CURRICULO_BATCH_WORKERS") or os.cpu_count() or 2)
+        _batch_pool = RenderPool(
+            workers=workers,
+            max_queue=workers,
+            timeout=render_pool.timeout,
+            max_jobs_per_worker=render_pool.max_jobs_per_worker,
         )
-        response = make_response(message, 500)
-        response.headers["Content-Type"] = "text/plain; charset=utf-8"
-        return response
+    return _batch_pool
+
+
+@app.route("/gerar/lote", methods=["POST"])
+def gerar_lote():
+    """Recebe vários currículos (array JSON ou JSONL) e devolve um ZIP em streaming.
+
+    O corpo pode ser enviado direto (parâmetros na query string) ou como
+    arquivo ``arquivo`` num formulário multipart.
+    """
+    max_records = int(os.environ.get("CURRICULO_BATCH_MAX_RECORDS", 1000))
+    max_array_bytes = int(os.environ.get("CURRICULO_BATCH_MAX_ARRAY_BYTES", 8 * 1024 * 1024))
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("arquivo")
+        if upload is None:
+            return "Envie o arquivo JSON/JSONL no campo 'arquivo'.", 400
+        params = request.form
+        lines = upload.stream
+    else:
+        params = request.args
+        lines = request.stream
+
+    output_format = export_format(params.get("output_format", "pdf").lower())
+    template_style = params.get("template_style", "corporativo").lower()
+    _, ext = EXPORT_FORMATS[output_format]
+    base_url = request.base_url
+    data_geracao = datetime.now().strftime("%d/%m/%Y")
+    pool = batch_pool() if output_format == "pdf" else None
+    workers = pool.workers if pool is not None else (os.cpu_count() or 2)
+
+    def render(index: int, record: Dict[str, Any]) -> Tuple[str, bytes]:
+        cv_data, errors = validate_cv_data(record)
+        if errors:
+            raise BatchInputError("; ".join(errors[:5]))
+        embedded_photo(cv_data)
+        cv_data.setdefault("data_geracao", data_geracao)
+        with app.app_context():
+            payload = build_document(
+                cv_data, template_style, output_format, base_url=base_url, pool=pool
+            ).payload
+        safe_name = sanitize_filename(str(cv_data.get("nome") or "curriculo"))
+        return f"{index + 1:04d}_curriculo_{safe_name}.{ext}", payload
+
+    stream = stream_zip(iter_records(lines, max_records, max_array_bytes), render, workers)
+    response = Response(stream_with_context(stream), mimetype="application/zip")
+    response.headers["Content-Disposition"] = "attachment; filename=curriculos.zip"
+    return response
 
-    pdf_io.seek(0)
 
-    safe_name = sanitize_filename(nome or "curriculo")
-    filename = f"curriculo_{safe_name}.pdf"
+@app.route("/gerar/vagas", methods=["POST"])
+def gerar_vagas():
+    """Um currículo, várias vagas: uma versão ranqueada para cada vaga, num ZIP.
+
+    Recebe o formulário de /gerar com as URLs em ``job_urls`` (uma por linha)
+    ou repetindo ``job_url``, ou um JSON ``{"cv_data": ..., "job_urls": [...],
+    "template_style": ..., "output_format": ...}``. Formulário, foto e
+    template são processados uma única vez; as vagas são baixadas em paralelo
+    (com o mesmo orçamento de latência do /gerar) e as versões são
+    renderizadas em paralelo e transmitidas como em /gerar/lote.
+    """
+    max_urls = int(os.environ.get("CURRICULO_MULTI_MAX_URLS", 10))
+    if request.is_json:
+        try:
+            body = json_codec.loads(request.get_data())
+        except ValueError:
+            return "Corpo da requisição não é um JSON válido.", 400
+        if not isinstance(body, dict):
+            return "Esperado um objeto JSON com cv_data e job_urls.", 400
+        params = body
+        urls = body.get("job_urls") if isinstance(body.get("job_urls"), list) else []
+    else:
+        params = request.form
+        urls = request.form.get("job_urls", "").splitlines() + request.form.getlist("job_url")
+    urls = list(dict.fromkeys(str(url).strip() for url in urls if str(url).strip()))
+    if not urls:
+        return "Informe ao menos uma URL de vaga em job_urls.", 400
+    if len(urls) > max_urls:
+        return f"Máximo de {max_urls} vagas por pedido.", 400
+
+    output_format = export_format(str(params.get("output_format") or "pdf").lower())
+    template_style = str(params.get("template_style") or "corporativo").lower()
+    if output_format == "pdf" and not weasyprint_ok():
+        return weasyprint_unavailable()
+    # Todas as vagas começam a ser baixadas já, enquanto o resto é preparado
+    futures = [job_fetcher.start(fetch_job_keywords, url) for url in urls]
+
+    if request.is_json:
+        cv_data, errors = validate_cv_data(body.get("cv_data"))
+        if errors:
+            return jsonify({"erros": errors}), 400
+        try:
+            embedded_photo(cv_data)
+        except PhotoError as exc:
+            return photo_error(exc)
+    else:
+        with metrics.timer("formulario"):
+            cv_data = parse_form(request.form)
+        try:
+            foto = uploaded_photo()
+        except PhotoError as exc:
+            return photo_error(exc)
+        if foto is not None:
+            cv_data["foto_url"] = foto.data_url()
+    cv_data.setdefault("data_geracao", datetime.now().strftime("%d/%m/%Y"))
+    prepare_template(template_style, output_format)
+
+    _, ext = EXPORT_FORMATS[output_format]
+    base_url = request.base_url
+    safe_name = sanitize_filename(str(cv_data.get("nome") or "curriculo"))
+    pool = batch_pool() if output_format == "pdf" else None
+    workers = min(len(urls), pool.workers if pool is not None else (os.cpu_count() or 2))
+    # O currículo é o mesmo em todas as vagas: tokeniza os itens uma vez só
+    with metrics.timer("ranking"):
+        cv_tokens = ranking.tokenize_cv(cv_data)
+
+    def variants():
+        # Downloads em paralelo: a espera total é a da vaga mais lenta (até o orçamento)
+        for url, future in zip(urls, futures):
+            yield {"url": url, "terms": job_fetcher.wait(future, {})}
+
+    def render(index: int, record: Dict[str, Any]) -> Tuple[str, bytes, Dict[str, Any]]:
+        # rank_cv troca as listas de seção, então uma cópia rasa basta
+        variant = dict(cv_data)
+        with metrics.timer("ranking"):
+            ranking.rank_cv(variant, ranking.job_weights(record["terms"]), cv_tokens)
+        with app.app_context():
+            payload = build_document(
+                variant, template_style, output_format, base_url=base_url, pool=pool
+            ).payload
+        parts = urlsplit(record["url"])
+        slug = sanitize_filename(f"{parts.hostname or ''} {parts.path}")[:48].strip("_")
+        name = f"{index + 1:02d}_curriculo_{safe_name}_{slug or 'vaga'}.{ext}"
+        return name, payload, {"url": record["url"], "ranqueado": bool(record["terms"])}
+
+    stream = stream_zip(variants(), render, workers)
+    response = Response(stream_with_context(stream), mimetype="application/zip")
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename=curriculos_{safe_name}_vagas.zip"
+    )
+    return response
 
-    response = make_response(pdf_io.read())
-    response.headers["Content-Type"] = "application/pdf"
-    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
 
-    return response
+@app.route("/arquivos/<cache_key>/<filename>", methods=["GET"])
+def baixar_arquivo(cache_key: str, filename: str):
+    """Baixa de novo um arquivo já gerado (enquanto estiver no cache).
+
+    Só é anunciada (``Content-Location``) com ``CURRICULO_RENDER_CACHE_DIR``.
+    """
+    ext = filename.rsplit(".", 1)[-1].lower()
+    output_format = next((f for f, (_, e) in EXPORT_FORMATS.items() if e == ext), None)
+    payload = render_cache.get(cache_key) if re.fullmatch(r"[0-9a-f]{64}", cache_key) else None
+    if output_format is None or payload is None:
+        return "Arquivo expirado ou inexistente. Gere o currículo novamente.", 404
+    safe_name = sanitize_filename(filename[: -len(ext) - 1])
+    return send_document(payload, output_format, f"{safe_name}.{ext}")
+
+
+@app.route("/status", methods=["GET"])
+def status():
+    """Contadores internos (cache etc.) em JSON, para diagnóstico."""
+    return jsonify(
+        {
+            "render_cache": render_cache.snapshot(),
+            "job_cache": job_cache.snapshot(),
+            "job_fetch": job_fetcher.snapshot(),
+            "render_pool": render_pool.snapshot() if render_pool is not None else None,
+            "batch_pool": _batch_pool.snapshot() if _batch_pool is not None else None,
+            "photo": photo.snapshot(),
+            "preview": preview.snapshot(),
+            "resource_fetcher": resource_fetcher.snapshot(),
+            "async_jobs": job_queue.snapshot(),
+            "render_admission": render_admission.snapshot(),
+            "profiling": request_profiler.snapshot(),
+        }
+    )
+
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Histogramas e contadores de todos os workers, no formato do Prometheus."""
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+"""Geração em lote: vários currículos (JSON/JSONL) -> um ZIP transmitido aos poucos.
+
+O ZIP é escrito num destino sem ``seek`` (descritores de dados após cada
+entrada), então cada arquivo sai para o cliente assim que fica pronto, sem
+montar o pacote inteiro em memória. Erros de registros individuais vão para
+``manifest.json`` dentro do ZIP em vez de derrubar o lote.
+
+A entrada em streaming é o JSONL (um currículo por linha, lido à medida que
+chega). Um array JSON precisa ser lido e decodificado inteiro, por isso só é
+aceito até ``max_array_bytes``; lotes maiores devem vir em JSONL.
+"""
+import json
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+import json_codec
+
+# render(indice, registro) -> (nome_do_arquivo, bytes) ou
+# (nome_do_arquivo, bytes, campos extras para o manifesto)
+RenderFn = Callable[[int, Dict[str, Any]], tuple]
+
+
+class BatchInputError(ValueError):
+    """Corpo da requisição não é JSON nem JSONL válido."""
+
+
+def iter_records(
+    lines: Iterable[bytes], max_records: int, max_array_bytes: int = 8 * 1024 * 1024
+) -> Iterator[Any]:
+    """Lê um array JSON ou JSONL (um objeto por linha).
+
+    Registros com JSON inválido viram ``BatchInputError`` no lugar do dict,
+    para que o erro seja reportado no manifesto sem interromper o lote. Um
+    array com mais de ``max_array_bytes`` é recusado antes de ser decodificado.
+    """
+    it = iter(lines)
+    first = b""
+    for line in it:
+        if line.strip():
+            first = line
+            break
+    if not first:
+        return
+    if first.lstrip().startswith(b"["):
+        # Array JSON: precisa do documento inteiro, então o tamanho é limitado
+        chunks = [first]
+        size = len(first)
+        for line in it:
+            size += len(line)
+            if size > max_array_bytes:
+                raise BatchInputError(
+                    f"Array JSON acima de {max_array_bytes // (1024 * 1024)} MB; "
+                    "envie lotes grandes em JSONL (um currículo por linha)"
+                )
+            chunks.append(line)
+        body = b"".join(chunks)
+        try:
+            records = json_codec.loads(body)
+        except ValueError as exc:
+            raise BatchInputError(f"JSON inválido: {exc}") from exc
+        if not isinstance(records, list):
+            raise BatchInputError("Esperado um array de currículos")
+        if len(records) > max_records:
+            raise BatchInputError(f"Máximo de {max_records} currículos por lote")
+        yield from records
+        return
+
+    count = 0
+    for line in _chain_first(first, it):
+        if not line.strip():
+            continue
+        count += 1
+        if count > max_records:
+            yield BatchInputError(f"Máximo de {max_records} currículos por lote; restante ignorado")
+            return
+        try:
+            yield json_codec.loads(line)
+        except ValueError as exc:
+            yield BatchInputError(f"JSON inválido: {exc}")
+
+
+def _chain_first(first: bytes, rest: Iterable[bytes]) -> Iterator[bytes]:
+    yield first
+    yield from rest
+
+
+class _ChunkSink:
+    """Destino de escrita sem seek: acumula pedaços até serem enviados."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self.chunks = self.chunks, []
+        yield from chunks
+
+
+def stream_zip(records: Iterable[Any], render: RenderFn, workers: int) -> Iterator[bytes]:
+    """Renderiza os registros em paralelo e produz o ZIP em pedaços."""
+    sink = _ChunkSink()
+    manifest: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+
+    def run(index: int, record: Any) -> tuple:
+        if isinstance(record, BatchInputError):
+            raise record
+        if not isinstance(record, dict):
+            raise BatchInputError("Cada registro deve ser um objeto JSON")
+        return render(index, record)
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf, ThreadPoolExecutor(
+        max_workers=workers
+    ) as executor:
+        in_flight: Dict[Any, int] = {}
+
+        def collect(done) -> None:
+            for fut in done:
+                index = in_flight.pop(fut)
+                try:
+                    name, payload, *extra = fut.result()
+                except Exception as exc:
+                    manifest.append(
+                        {"index": index, "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+                    )
+                    continue
+                # PDF/DOCX já são comprimidos; só o JSON ganha com deflate
+                compress = zipfile.ZIP_DEFLATED if name.endswith(".json") else zipfile.ZIP_STORED
+                zf.writestr(name, payload, compress_type=compress)
+                entry = {"index": index, "ok": True, "file": name, "bytes": len(payload)}
+                entry.update(*extra)
+                manifest.append(entry)
+
+        try:
+            for index, record in enumerate(records):
+                # Janela limitada: no máximo 2x workers registros em memória
+                while len(in_flight) >= workers * 2:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    collect(done)
+                    yield from sink.drain()
+                in_flight[executor.submit(run, index, record)] = index
+        except BatchInputError as exc:
+            manifest.append({"index": None, "ok": False, "error": str(exc)})
+
+        while in_flight:
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            collect(done)
+            yield from sink.drain()
+
+        manifest.sort(key=lambda m: (m["index"] is None, m["index"] or 0))
+        summary = {
+            "total": sum(1 for m in manifest if m["index"] is not None),
+            "ok": sum(1 for m in manifest if m["ok"]),
+            "errors": sum(1 for m in manifest if not m["ok"]),
+            "seconds": round(time.perf_counter() - started, 3),
+            "items": manifest,
+        }
+        zf.writestr("manifest.json", json.dumps(summary, ensure_ascii=False, indent=2))
+    yield from sink.drain()
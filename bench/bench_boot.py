@@ -0,0 +1,152 @@
+"""Tempo de boot e memória dos workers do gunicorn, com e sem preload.
+
+Uso (na raiz do projeto; Linux, lê /proc):
+
+    python bench/bench_boot.py [--workers 4] [--gunicorn "--threads 2"]
+
+Duas medições:
+
+1. ``import app`` num interpretador novo: tempo e quais dependências pesadas
+   (WeasyPrint, Pillow, requests, python-docx) ficaram carregadas. A linha
+   "import ansioso" importa as mesmas dependências junto, como o app fazia
+   antes de carregá-las só no primeiro uso;
+2. ``gunicorn app:app -w N`` sem e com CURRICULO_PRELOAD=1: tempo até todos
+   os workers terminarem o aquecimento (linha "pronto" do ``gunicorn.conf.py``)
+   e, por worker, RSS e PSS. O RSS conta inteiras as páginas compartilhadas
+   com o mestre; o PSS as divide entre os processos, então é a soma dos PSS
+   que mostra quanto o preload economiza.
+"""
+import argparse
+import os
+import re
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("weasyprint", "PIL", "requests", "docx")
+MB = 1024 * 1024
+
+_IMPORT_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+{eager}
+import app
+elapsed = time.perf_counter() - started
+rss = [l for l in open("/proc/self/status") if l.startswith("VmRSS")][0].split()[1]
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(f"{{elapsed * 1000:.0f}} {{int(rss) // 1024}} {{','.join(heavy) or '-'}}")
+"""
+
+
+def import_time(eager: bool) -> str:
+    lines = []
+    if eager:
+        for module in HEAVY:
+            lines.append(f"try:\n    import {module}\nexcept Exception:\n    pass")
+    script = _IMPORT_SCRIPT.format(eager="\n".join(lines), heavy=HEAVY)
+    out = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return out.stdout.strip().splitlines()[-1]
+
+
+def _memory(pid: int) -> Dict[str, int]:
+    info = {}
+    for name, key in (("status", "VmRSS"), ("smaps_rollup", "Pss")):
+        try:
+            with open(f"/proc/{pid}/{name}") as fh:
+                for line in fh:
+                    if line.startswith(key + ":"):
+                        info[key] = int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    return info
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as fh:
+            return [int(child) for child in fh.read().split()]
+    except OSError:
+        return []
+
+
+def boot(workers: int, preload: bool, extra: str, timeout: float) -> Optional[Dict]:
+    env = dict(os.environ, CURRICULO_PRELOAD="1" if preload else "0")
+    command = ["gunicorn", "app:app", "-b", "127.0.0.1:0", "-w", str(workers)]
+    command += shlex.split(extra)
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True, bufsize=1
+    )
+    ready: List[float] = []
+    done = threading.Event()
+
+    def read_log() -> None:
+        for line in process.stderr:
+            if re.search(r"curriculo: worker \d+ pronto", line):
+                ready.append(time.perf_counter() - started)
+                if len(ready) >= workers:
+                    done.set()
+        done.set()
+
+    threading.Thread(target=read_log, daemon=True).start()
+    done.wait(timeout)
+    try:
+        if len(ready) < workers:
+            print(f"  só {len(ready)} de {workers} workers ficaram prontos", file=sys.stderr)
+            return None
+        time.sleep(0.5)  # deixa o aquecimento assentar antes de medir
+        worker_pids = _children(process.pid)
+        per_worker = {pid: _memory(pid) for pid in worker_pids}
+        return {
+            "boot_s": ready[-1],
+            "master": _memory(process.pid),
+            "workers": per_worker,
+        }
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--gunicorn", default="", help="opções extras do gunicorn")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    print(f"{'':18} {'ms':>6} {'RSS MB':>7}  dependências carregadas")
+    for label, eager in (("import ansioso", True), ("import sob demanda", False)):
+        elapsed, rss, heavy = import_time(eager).split()
+        print(f"{label:18} {elapsed:>6} {rss:>7}  {heavy}")
+
+    print(
+        f"\n{'gunicorn -w ' + str(args.workers):18} {'boot':>8} {'RSS/worker':>11}"
+        f" {'PSS/worker':>11} {'PSS total':>10}"
+    )
+    for label, preload in (("sem preload", False), ("com preload", True)):
+        result = boot(args.workers, preload, args.gunicorn, args.timeout)
+        if result is None:
+            continue
+        workers = list(result["workers"].values())
+        rss = sum(w.get("VmRSS", 0) for w in workers) / max(len(workers), 1)
+        pss = sum(w.get("Pss", 0) for w in workers) / max(len(workers), 1)
+        total = sum(w.get("Pss", 0) for w in workers) + result["master"].get("Pss", 0)
+        print(
+            f"{label:18} {result['boot_s'] * 1000:6.0f}ms {rss / MB:9.1f}MB"
+            f" {pss / MB:9.1f}MB {total / MB:8.1f}MB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
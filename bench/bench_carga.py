@@ -0,0 +1,465 @@
+"""Teste de carga de ponta a ponta do ``/gerar`` num gunicorn de verdade.
+
+Uso (na raiz do projeto; não precisa de rede):
+
+    python bench/bench_carga.py [--taxa 5] [--duracao 30] [--gunicorn "-w 4"]
+    python bench/bench_carga.py --mix "pdf/corporativo=3,pdf/ats=1,word=2,json=1"
+    python bench/bench_carga.py --url http://127.0.0.1:8000   # app já no ar
+
+Sobe o app com ``gunicorn app:app`` (o mesmo comando do Procfile e do
+Dockerfile; ``--gunicorn`` acrescenta opções, e o ``gunicorn.conf.py`` da
+raiz vale como em produção) e um servidor local que faz o papel dos sites
+de vagas e das fotos por URL, com latência e tamanho de página
+configuráveis. Depois dispara pedidos ao ``/gerar`` numa taxa fixa (carga
+aberta: um pedido atrasado não segura os seguintes), sorteando formato e
+template pelos pesos do ``--mix`` e variando currículo, vaga e foto.
+
+A latência de cada pedido conta desde o instante em que ele deveria ter
+saído, não de quando saiu de fato; assim uma fila no cliente aparece nos
+percentis em vez de esconder a lentidão do servidor. O relatório traz
+vazão, p50/p90/p99/máximo (no total e por item do mix), erros por status e
+a memória (RSS) de cada worker do gunicorn, amostrada durante o teste
+(só no Linux, via /proc). ``--saida`` grava o mesmo relatório em JSON.
+
+As variáveis CURRICULO_* do ambiente passam para o app; com
+``--variedade`` e ``--vagas`` pequenos muitos pedidos se repetem e saem do
+cache de renderização (CURRICULO_RENDER_CACHE=0 mede só o trabalho novo).
+"""
+import argparse
+import json
+import os
+import random
+import shlex
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+
+from synthetic import (  # noqa: E402
+    PROFILES,
+    form_pairs,
+    synthetic_cv,
+    synthetic_job_page,
+    synthetic_photo,
+)
+
+MB = 1024 * 1024
+
+
+def parse_mix(spec: str) -> List[Tuple[str, str, float]]:
+    """``"pdf/corporativo=3,word=1"`` -> [(formato, template, peso), ...]."""
+    mix = []
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        output_format, _, template = name.partition("/")
+        mix.append((output_format, template or "corporativo", float(weight or 1)))
+    return mix
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        return round(ordered[min(int(fraction * len(ordered)), len(ordered) - 1)], 1)
+
+    return {
+        "p50": round(statistics.median(ordered), 1),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 1),
+    }
+
+
+class StandIn:
+    """Servidor local no lugar dos sites de vagas (``/vaga/N.html``) e fotos (``/foto/N.jpg``)."""
+
+    def __init__(self, job_kb: int, job_latency: float, photo_px: int, photo_latency: float):
+        self.job_kb = job_kb
+        self.job_latency = job_latency
+        self.photo_px = photo_px
+        self.photo_latency = photo_latency
+        self._pages: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.hits = {"vaga": 0, "foto": 0}
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                found = stand_in.resource(self.path)
+                if found is None:
+                    self.send_error(404)
+                    return
+                content_type, body = found
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # o app para de ler a vaga no limite de bytes
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+
+            def handle_error(self, request, client_address):
+                pass
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _cached(self, key: str, build) -> bytes:
+        with self._lock:
+            body = self._pages.get(key)
+        if body is None:
+            body = build()
+            with self._lock:
+                self._pages[key] = body
+        return body
+
+    def _hit(self, kind: str) -> None:
+        with self._lock:
+            self.hits[kind] += 1
+
+    def resource(self, path: str) -> Optional[Tuple[str, bytes]]:
+        kind, _, name = path.strip("/").partition("/")
+        seed = int("".join(ch for ch in name if ch.isdigit()) or 0)
+        if kind == "vaga":
+            time.sleep(self.job_latency)
+            self._hit("vaga")
+            body = self._cached(
+                path, lambda: synthetic_job_page(self.job_kb, seed=seed).encode("utf-8")
+            )
+            return "text/html; charset=utf-8", body
+        if kind == "foto" and self.photo_px > 0:
+            time.sleep(self.photo_latency)
+            self._hit("foto")
+            return "image/jpeg", self._cached(path, lambda: synthetic_photo(self.photo_px, seed))
+        return None
+
+    def start(self) -> None:
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(extra: str, workdir: str) -> Tuple[subprocess.Popen, str]:
+    """``gunicorn app:app`` na raiz do projeto, com cache e fila num diretório temporário."""
+    port = _free_port()
+    env = dict(os.environ)
+    env.setdefault("CURRICULO_JOB_CACHE_PATH", os.path.join(workdir, "vagas.sqlite3"))
+    env.setdefault("CURRICULO_ASYNC_PATH", os.path.join(workdir, "tarefas.sqlite3"))
+    command = ["gunicorn", "app:app", "-b", f"127.0.0.1:{port}", *shlex.split(extra)]
+    process = subprocess.Popen(command, cwd=ROOT, env=env)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def wait_ready(base: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(base + "/status", timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"app não respondeu em {timeout:.0f}s: {base}")
+
+
+def worker_rss(master_pid: Optional[int]) -> Dict[int, int]:
+    """RSS (bytes) de cada worker do gunicorn, somado ao dos seus processos de PDF.
+
+    Vazio fora do Linux (lê /proc).
+    """
+    if not master_pid or not os.path.isdir("/proc"):
+        return {}
+    parents: Dict[int, int] = {}
+    own: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as fh:
+                fields = dict(line.split(":", 1) for line in fh if ":" in line)
+        except OSError:
+            continue
+        pid = int(entry)
+        parents[pid] = int(fields.get("PPid", "0").strip())
+        own[pid] = int(fields["VmRSS"].split()[0]) * 1024 if "VmRSS" in fields else 0
+
+    def worker_of(pid: int) -> Optional[int]:
+        while pid in parents and parents[pid] != master_pid:
+            pid = parents[pid]
+            if pid <= 1:
+                return None
+        return pid if pid in parents else None
+
+    rss: Dict[int, int] = {}
+    for pid in own:
+        worker = worker_of(pid)
+        if worker is not None:
+            rss[worker] = rss.get(worker, 0) + own[pid]
+    return rss
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, master_pid: Optional[int], interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.peak: Dict[int, int] = {}
+        self.last: Dict[int, int] = {}
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self.sample()
+            self._stop_event.wait(self.interval)
+
+    def sample(self) -> None:
+        self.last = worker_rss(self.master_pid)
+        for pid, rss in self.last.items():
+            self.peak[pid] = max(self.peak.get(pid, 0), rss)
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop_event.set()
+        self.sample()
+        return {
+            "workers": len(self.last),
+            "rss_mb": {str(pid): round(rss / MB, 1) for pid, rss in sorted(self.last.items())},
+            "peak_rss_mb": {
+                str(pid): round(rss / MB, 1) for pid, rss in sorted(self.peak.items())
+            },
+        }
+
+
+class Payloads:
+    """Formulários do ``/gerar``: currículo, vaga e foto variam de um pedido para outro."""
+
+    def __init__(self, args: argparse.Namespace, stand_in: StandIn):
+        profile = PROFILES[args.perfil]
+        self.forms = [
+            form_pairs(
+                synthetic_cv(profile["experiences"], profile["words"], profile["skills"], seed)
+            )
+            for seed in range(args.variedade)
+        ]
+        self.photo = synthetic_photo(profile["photo_px"]) if args.foto == "upload" else None
+        self.args = args
+        self.base = stand_in.base
+
+    def build(self, rng: random.Random, output_format: str, template: str):
+        args = self.args
+        data = [(name, value) for name, value in rng.choice(self.forms) if name != "foto_url"]
+        if args.foto == "url":
+            data.append(("foto_url", f"{self.base}/foto/{rng.randrange(args.fotos)}.jpg"))
+        if args.vagas > 0:
+            data.append(("job_url", f"{self.base}/vaga/{rng.randrange(args.vagas)}.html"))
+        data += [("output_format", output_format), ("template_style", template)]
+        files = None
+        if self.photo is not None:
+            files = {"foto_arquivo": ("foto.jpg", self.photo, "image/jpeg")}
+        return data, files
+
+
+def run_load(args: argparse.Namespace, base: str, payloads: Payloads) -> List[Dict[str, Any]]:
+    """Carga aberta: o pedido ``i`` sai em ``início + i / taxa``."""
+    mix = parse_mix(args.mix)
+    weights = [weight for _, _, weight in mix]
+    rng = random.Random(args.semente)
+    local = threading.local()
+    results: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+
+    def session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def one(scheduled: float, label: str, data, files) -> None:
+        sent = time.perf_counter()
+        try:
+            resp = session().post(base + "/gerar", data=data, files=files, timeout=args.timeout)
+            status, size = resp.status_code, len(resp.content)
+        except requests.RequestException as exc:
+            status, size = type(exc).__name__, 0
+        done = time.perf_counter()
+        with lock:
+            results.append(
+                {
+                    "mix": label,
+                    "status": status,
+                    "bytes": size,
+                    "latency_ms": (done - scheduled) * 1000,
+                    "service_ms": (done - sent) * 1000,
+                    "queued_ms": (sent - scheduled) * 1000,
+                }
+            )
+
+    total = int(args.taxa * args.duracao)
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        started = time.perf_counter()
+        for i in range(total):
+            scheduled = started + i / args.taxa
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            output_format, template, _ = rng.choices(mix, weights)[0]
+            label = output_format if output_format != "pdf" else f"pdf/{template}"
+            data, files = payloads.build(rng, output_format, template)
+            executor.submit(one, scheduled, label, data, files)
+    return results
+
+
+def report(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    ok = [r for r in results if r["status"] == 200]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r["status"] != 200:
+            errors[str(r["status"])] = errors.get(str(r["status"]), 0) + 1
+    by_mix = {}
+    for label in sorted({r["mix"] for r in results}):
+        rows = [r for r in results if r["mix"] == label]
+        good = [r["latency_ms"] for r in rows if r["status"] == 200]
+        by_mix[label] = {
+            "requests": len(rows),
+            "errors": len(rows) - len(good),
+            "latency_ms": percentiles(good),
+        }
+    return {
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "errors": errors,
+        "latency_ms": percentiles([r["latency_ms"] for r in ok]),
+        "service_ms": percentiles([r["service_ms"] for r in ok]),
+        "client_queue_ms": percentiles([r["queued_ms"] for r in results]),
+        "by_mix": by_mix,
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(
+        f"\n{result['requests']} pedidos em {result['elapsed_s']}s:"
+        f" {result['throughput_rps']} req/s com sucesso,"
+        f" erros {result['error_rate']:.1%} {result['errors'] or ''}"
+    )
+    print(f"{'':>20} {'pedidos':>8} {'erros':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'máx':>8}")
+    rows = [("total", result["requests"], sum(result["errors"].values()), result["latency_ms"])]
+    rows += [
+        (label, info["requests"], info["errors"], info["latency_ms"])
+        for label, info in result["by_mix"].items()
+    ]
+    for label, count, errors, lat in rows:
+        cells = " ".join(f"{lat.get(k, 0):7.0f}ms" for k in ("p50", "p90", "p99", "max"))
+        print(f"{label:>20} {count:8d} {errors:6d} {cells}")
+    queue = result["client_queue_ms"]
+    if queue.get("p99", 0) > 50:
+        print(f"aviso: fila no cliente (p99 {queue['p99']:.0f}ms); aumente --concorrencia")
+    memory = result.get("memory") or {}
+    if memory.get("rss_mb"):
+        peak = memory["peak_rss_mb"]
+        print(
+            f"workers: {memory['workers']}; RSS por worker (MB) fim={memory['rss_mb']}"
+            f" pico={peak} soma do pico={sum(peak.values()):.0f}MB"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="app já no ar (não sobe o gunicorn)")
+    parser.add_argument("--gunicorn", default="", help='opções extras, ex.: "-w 4 --threads 2"')
+    parser.add_argument("--taxa", type=float, default=5.0, help="pedidos por segundo")
+    parser.add_argument("--duracao", type=float, default=30.0, help="segundos de carga")
+    parser.add_argument("--concorrencia", type=int, default=64, help="pedidos em voo no máximo")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--mix", default="pdf/corporativo=4,pdf/minimalista=1,pdf/ats=1,word=2,json=1")
+    parser.add_argument("--perfil", choices=sorted(PROFILES), default="medio")
+    parser.add_argument("--variedade", type=int, default=20, help="currículos diferentes")
+    parser.add_argument("--vagas", type=int, default=10, help="URLs de vaga diferentes (0 = sem vaga)")
+    parser.add_argument("--vaga-kb", type=int, default=300, help="tamanho da página da vaga")
+    parser.add_argument("--vaga-latencia-ms", type=float, default=200.0)
+    parser.add_argument("--foto", choices=("upload", "url", "nenhuma"), default="upload")
+    parser.add_argument("--fotos", type=int, default=10, help="URLs de foto diferentes (--foto url)")
+    parser.add_argument("--foto-latencia-ms", type=float, default=100.0)
+    parser.add_argument("--aquecimento", type=float, default=3.0, help="segundos de carga descartados")
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--saida", help="grava o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    stand_in = StandIn(
+        args.vaga_kb,
+        args.vaga_latencia_ms / 1000,
+        PROFILES[args.perfil]["photo_px"] or 400,
+        args.foto_latencia_ms / 1000,
+    )
+    stand_in.start()
+    payloads = Payloads(args, stand_in)
+
+    process = None
+    workdir = tempfile.mkdtemp(prefix="curriculo-carga-")
+    try:
+        if args.url:
+            base = args.url.rstrip("/")
+        else:
+            process, base = start_gunicorn(args.gunicorn, workdir)
+        wait_ready(base)
+        sampler = MemorySampler(process.pid if process else None)
+        sampler.start()
+
+        if args.aquecimento > 0:
+            warm = argparse.Namespace(**{**vars(args), "duracao": args.aquecimento})
+            run_load(warm, base, payloads)
+        started = time.perf_counter()
+        results = run_load(args, base, payloads)
+        elapsed = time.perf_counter() - started
+
+        result = report(results, elapsed)
+        result["memory"] = sampler.stop()
+        result["config"] = {k: v for k, v in vars(args).items() if k != "saida"}
+        result["stand_in_hits"] = dict(stand_in.hits)
+        print_report(result)
+        if args.saida:
+            with open(args.saida, "w", encoding="utf-8") as fh:
+                json.dump(result, fh, indent=2, ensure_ascii=False)
+                fh.write("\n")
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        stand_in.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
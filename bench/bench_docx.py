@@ -0,0 +1,51 @@
+"""Compara os motores de DOCX (``docx_writer``): python-docx vs. rápido.
+
+Uso (na raiz do projeto):
+
+    python bench/bench_docx.py [repeticoes]
+
+Para cada perfil de currículo sintético mede o tempo médio por arquivo nos
+dois motores e confere que o ``word/document.xml`` gerado é idêntico.
+"""
+import io
+import os
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx_writer  # noqa: E402
+
+from synthetic import PROFILES, synthetic_cv  # noqa: E402
+
+
+def _time(fn, repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def _document_xml(payload: bytes) -> bytes:
+    return zipfile.ZipFile(io.BytesIO(payload)).read("word/document.xml")
+
+
+def main(repeat: int = 50) -> None:
+    print(f"{'perfil':>8} {'python-docx':>12} {'rápido':>10} {'ganho':>7} {'bytes':>8} {'igual':>6}")
+    for name, params in PROFILES.items():
+        cv_data = synthetic_cv(params["experiences"], params["words"], params["skills"])
+        slow = _time(lambda: docx_writer.write_python_docx(cv_data), repeat)
+        fast = _time(lambda: docx_writer.write_fast(cv_data), repeat)
+        reference = docx_writer.write_python_docx(cv_data)
+        payload = docx_writer.write_fast(cv_data)
+        same = _document_xml(reference) == _document_xml(payload)
+        print(
+            f"{name:>8} {slow * 1000:10.2f}ms {fast * 1000:8.2f}ms {slow / fast:6.1f}x"
+            f" {len(payload):8d} {'sim' if same else 'NÃO':>6}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
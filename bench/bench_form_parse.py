@@ -0,0 +1,80 @@
+"""Tempo de parse do formulário (``form_schema.parse_form``) com muitas entradas.
+
+Uso (na raiz do projeto):
+
+    python bench/bench_form_parse.py [itens_por_secao ...]
+
+Compara com o parse antigo do ``gerar`` (um ``getlist`` + ``zip`` por seção),
+sobre o mesmo ``ImmutableMultiDict`` que o Flask entrega em ``request.form``.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.datastructures import ImmutableMultiDict  # noqa: E402
+
+from form_schema import SCHEMA, SECTIONS, MAX_LEN, Field, parse_form  # noqa: E402
+
+
+def synthetic_pairs(items: int):
+    pairs = [(f.name, f"  valor de {f.name}  ") for f in SCHEMA if isinstance(f, Field)]
+    for section in SECTIONS:
+        for i in range(items):
+            for field in section.fields:
+                pairs.append((field.name, f"{field.key} {i} " + "texto " * 20))
+    return pairs
+
+
+def legacy_parse(form) -> dict:
+    def limited(name):
+        return form.get(name, "").strip()[:MAX_LEN]
+
+    def limited_list(name):
+        return [(v or "").strip()[:MAX_LEN] for v in form.getlist(name)]
+
+    data = {}
+    for entry in SCHEMA:
+        if isinstance(entry, Field):
+            value = limited(entry.name)
+            data[entry.key] = entry.normalizer(value) if entry.normalizer else value
+            continue
+        columns = [limited_list(f.name) for f in entry.fields]
+        items = []
+        for row in zip(*columns):
+            if not any(row):
+                continue
+            items.append(
+                {f.key: f.normalizer(v) if f.normalizer else v for f, v in zip(entry.fields, row)}
+            )
+            if len(items) >= entry.max_items:  # mesmo limite do esquema
+                break
+        data[entry.key] = items
+    return data
+
+
+def _time(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main(sizes=(10, 100, 500), repeat: int = 20) -> None:
+    print(f"{'itens/seção':>11} {'campos':>7} {'antigo':>10} {'esquema':>10} {'pares':>10}")
+    for items in sizes:
+        form = ImmutableMultiDict(synthetic_pairs(items))
+        pairs = list(form.items(multi=True))
+        legacy = _time(lambda: legacy_parse(form), repeat)
+        schema = _time(lambda: parse_form(form), repeat)
+        # Modo PyScript: pares (nome, valor) na ordem do documento
+        schema_pairs = _time(lambda: parse_form(pairs), repeat)
+        print(
+            f"{items:11d} {len(pairs):7d} {legacy * 1000:8.2f}ms {schema * 1000:8.2f}ms"
+            f" {schema_pairs * 1000:8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main(tuple(int(a) for a in sys.argv[1:]) or (10, 100, 500))
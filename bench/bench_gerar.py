@@ -0,0 +1,211 @@
+"""Benchmark das etapas do ``/gerar`` com currículos sintéticos.
+
+Uso (na raiz do projeto; não precisa de rede):
+
+    python bench/bench_gerar.py [--perfil medio] [--repeticoes 5] [--saida resultado.json]
+    python bench/bench_gerar.py --salvar-baseline bench/baseline.json
+    python bench/bench_gerar.py --baseline bench/baseline.json [--limite 0.2]
+
+Mede cada etapa separadamente, sem os caches do app: parse do formulário,
+redução da foto, ranqueamento pela vaga, ``render_template``, layout e
+escrita do PDF no WeasyPrint (por template), ``generate_word`` e exportação
+JSON. O resultado (mediana e mínimo em ms) sai em JSON. Com ``--baseline``,
+compara as medianas e termina com código 1 se alguma etapa ficou mais lenta
+que ``--limite`` (fração; 0.2 = 20%). Diferenças abaixo de
+``--tolerancia-ms`` são ignoradas, pois são ruído nas etapas rápidas.
+
+Baselines só são comparáveis na mesma máquina e com as mesmas versões.
+``bench/baseline.json`` é a medição desta série de otimizações (perfil
+``medio``, máquina de desenvolvimento Linux, sem as bibliotecas de sistema do
+WeasyPrint, então sem as etapas de PDF). Etapas cuja dependência falta
+(WeasyPrint para o PDF, Pillow para a foto, python-docx para o Word) ficam de
+fora do resultado e da comparação; as versões encontradas vão no ``meta``.
+Para comparar em outra máquina, salve primeiro a baseline dela a partir do
+commit de referência (``--salvar-baseline``) e só então rode a comparação
+(``--baseline``) na mudança a avaliar.
+"""
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CURRICULO_RENDER_POOL", "0")
+
+from flask import render_template  # noqa: E402
+from werkzeug.datastructures import ImmutableMultiDict  # noqa: E402
+
+import json_codec  # noqa: E402
+import photo  # noqa: E402
+import ranking  # noqa: E402
+import stylesheets  # noqa: E402
+from app import (  # noqa: E402
+    PDF_TEMPLATES,
+    app,
+    generate_word,
+    resource_fetcher,
+    weasyprint_html,
+    weasyprint_ok,
+)
+from form_schema import parse_form  # noqa: E402
+
+from synthetic import (  # noqa: E402
+    PROFILES,
+    form_pairs,
+    synthetic_cv,
+    synthetic_job,
+    synthetic_photo,
+)
+
+
+def dependency_version(dist: str) -> Optional[str]:
+    """Versão instalada do pacote ``dist``; ``None`` se ausente."""
+    try:
+        return importlib.metadata.version(dist)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    fn()  # aquecimento (imports, caches de módulo, CSS compilado)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+    }
+
+
+def run(params: Dict[str, int], repeat: int) -> Dict[str, Any]:
+    cv_data = synthetic_cv(params["experiences"], params["words"], params["skills"])
+    form = ImmutableMultiDict(form_pairs(cv_data))
+    job_text = synthetic_job()
+    results: Dict[str, Any] = {}
+
+    results["form_parse"] = measure(lambda: parse_form(form), repeat)
+
+    raw_photo = synthetic_photo(params["photo_px"])
+    if raw_photo and photo.pil() is not None:
+        # Direto na redução, sem o cache por hash do process_photo
+        results["photo"] = measure(
+            lambda: photo._shrink(raw_photo, photo.MAX_PX, photo.QUALITY), repeat
+        )
+        cv_data["foto_url"] = photo.ProcessedPhoto(
+            photo._shrink(raw_photo, photo.MAX_PX, photo.QUALITY), "image/jpeg", len(raw_photo)
+        ).data_url()
+
+    def score():
+        ranking.rank_cv(dict(cv_data), ranking.job_weights(ranking.term_counts(job_text)))
+
+    results["ranking"] = measure(score, repeat)
+    if dependency_version("python-docx") is not None:
+        results["word"] = measure(lambda: generate_word(cv_data), repeat)
+    results["json"] = measure(lambda: json_codec.dumps_pretty(cv_data), repeat)
+
+    for style, template in PDF_TEMPLATES.items():
+        css_externo = stylesheets.ENABLED
+        with app.test_request_context("/gerar", method="POST"):
+            results[f"render_template/{style}"] = measure(
+                lambda: render_template(template, css_externo=css_externo, **cv_data), repeat
+            )
+            html = render_template(template, css_externo=css_externo, **cv_data)
+        if not weasyprint_ok():
+            continue
+        options = stylesheets.pdf_options(template)
+
+        def layout():
+            return weasyprint_html()(string=html, url_fetcher=resource_fetcher).render(**options)
+
+        results[f"pdf_layout/{style}"] = measure(layout, repeat)
+        document = layout()
+        results[f"pdf_write/{style}"] = measure(document.write_pdf, repeat)
+    return results
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], limit: float, tolerance_ms: float
+) -> list:
+    """Etapas mais lentas que a baseline além do limite (nome, antes, depois)."""
+    regressions = []
+    for name, before in baseline.get("results", {}).items():
+        after = current["results"].get(name)
+        if after is None:
+            continue
+        old, new = before["median_ms"], after["median_ms"]
+        if new > old * (1 + limit) and new - old > tolerance_ms:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--perfil", choices=sorted(PROFILES), default="medio")
+    parser.add_argument("--experiencias", type=int)
+    parser.add_argument("--palavras", type=int, help="palavras por descrição")
+    parser.add_argument("--skills", type=int)
+    parser.add_argument("--foto-px", type=int, help="lado da foto enviada (0 = sem foto)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", help="grava o resultado JSON neste arquivo")
+    parser.add_argument("--baseline", help="compara com este resultado salvo")
+    parser.add_argument("--salvar-baseline", help="grava o resultado como nova baseline")
+    parser.add_argument("--limite", type=float, default=0.2)
+    parser.add_argument("--tolerancia-ms", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    params = dict(PROFILES[args.perfil])
+    for key, value in (
+        ("experiences", args.experiencias),
+        ("words", args.palavras),
+        ("skills", args.skills),
+        ("photo_px", args.foto_px),
+    ):
+        if value is not None:
+            params[key] = value
+
+    report = {
+        "meta": {
+            "perfil": args.perfil,
+            "params": params,
+            "repeticoes": args.repeticoes,
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "weasyprint": weasyprint_ok(),
+            "pillow": dependency_version("Pillow") if photo.pil() is not None else None,
+            "python_docx": dependency_version("python-docx"),
+            "css_precompilado": stylesheets.ENABLED,
+        },
+        "results": run(params, args.repeticoes),
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    for path in (args.saida, args.salvar_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(output + "\n")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    if baseline.get("meta", {}).get("params") != params:
+        print("aviso: baseline gerada com outro perfil/parâmetros", file=sys.stderr)
+    regressions = compare(report, baseline, args.limite, args.tolerancia_ms)
+    for name, old, new in regressions:
+        growth = (new / old - 1) * 100 if old else float("inf")
+        print(f"REGRESSÃO {name}: {old:.2f}ms -> {new:.2f}ms (+{growth:.0f}%)", file=sys.stderr)
+    if regressions:
+        return 1
+    print(f"ok: nenhuma etapa mais de {args.limite:.0%} mais lenta que a baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Compara a busca de vagas: download inteiro + BeautifulSoup vs. streaming.
+
+Uso (na raiz do projeto; não precisa de rede):
+
+    python bench/bench_job_fetch.py [--repeticoes 5] [paginas.html ...]
+
+Sem arquivos, usa páginas sintéticas de vários tamanhos (``synthetic``);
+com arquivos, usa páginas de vagas salvas do navegador. As páginas são
+servidas por um servidor HTTP local: o download passa por um socket de
+verdade, mas sem a variação da internet.
+
+Para cada página mede, por busca: tempo (mediana), pico de memória alocada
+em Python (``tracemalloc``) e quantos dos termos do caminho antigo o novo
+também achou. Páginas maiores que CURRICULO_JOB_FETCH_MAX_BYTES são lidas
+só até o limite, então perdem os termos do fim (rodapé). O caminho antigo
+precisa do ``beautifulsoup4``, que não é mais dependência do app; sem ele,
+só o novo é medido.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+import ranking  # noqa: E402
+from job_fetch import JobFetcher  # noqa: E402
+
+from synthetic import synthetic_job_page  # noqa: E402
+
+MB = 1024 * 1024
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # pragma: no cover - só o caminho novo é medido
+    BeautifulSoup = None
+
+
+def _serve(pages: Dict[str, bytes]) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = pages.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # o caminho novo para de ler no limite de bytes
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        def handle_error(self, request, client_address):
+            pass  # conexões fechadas no meio pelo caminho novo
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def legacy(session: requests.Session, url: str) -> Dict[str, int]:
+    """O caminho antigo do app: ``resp.text`` inteiro e árvore do BeautifulSoup."""
+    resp = session.get(url, timeout=30)
+    resp.raise_for_status()
+    soup = BeautifulSoup(resp.text, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return ranking.term_counts(soup.get_text(" "), 60)
+
+
+def streaming(fetcher: JobFetcher, url: str) -> Dict[str, int]:
+    _, text, _ = fetcher.download(url, {})
+    return ranking.term_counts(text, 60)
+
+
+def measure(fn: Callable[[], Dict[str, int]], repeat: int) -> Tuple[float, int, Dict[str, int]]:
+    """Mediana do tempo (ms), pico de memória (bytes) e os termos da última busca."""
+    terms = fn()  # aquecimento (conexão, imports)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        terms = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(samples), peak, terms
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paginas", nargs="*", help="páginas de vagas salvas (HTML)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    pages: Dict[str, bytes] = {}
+    if args.paginas:
+        for path in args.paginas:
+            with open(path, "rb") as fh:
+                pages["/" + os.path.basename(path)] = fh.read()
+    else:
+        for size_kb in (100, 500, 2000, 5000):
+            pages[f"/vaga-{size_kb}kb.html"] = synthetic_job_page(size_kb).encode("utf-8")
+
+    server = _serve(pages)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    fetcher = JobFetcher.from_env()
+    session = requests.Session()
+
+    print(f"limite de leitura: {fetcher.max_bytes} bytes")
+    print(
+        f"{'página':>22} {'KB':>6} {'antigo':>10} {'pico':>8}"
+        f" {'streaming':>10} {'pico':>8} {'ganho':>6} {'termos':>7}"
+    )
+    for path, body in pages.items():
+        url = base + path
+        new_ms, new_peak, new_terms = measure(lambda: streaming(fetcher, url), args.repeticoes)
+        old = f"{'-':>10} {'-':>8}"
+        gain = match = "-"
+        if BeautifulSoup is not None:
+            old_ms, old_peak, old_terms = measure(lambda: legacy(session, url), args.repeticoes)
+            old = f"{old_ms:8.1f}ms {old_peak / MB:6.1f}MB"
+            gain = f"{old_ms / new_ms:.1f}x"
+            match = f"{len(set(old_terms) & set(new_terms))}/{len(old_terms)}"
+        print(
+            f"{path:>22} {len(body) // 1024:6d} {old}"
+            f" {new_ms:8.1f}ms {new_peak / MB:6.1f}MB {gain:>6} {match:>7}"
+        )
+    print(f"truncadas no limite: {fetcher.snapshot()['truncated']}")
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
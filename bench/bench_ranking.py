@@ -0,0 +1,102 @@
+"""Vazão do ranqueamento (``ranking``) para currículos grandes e vagas longas.
+
+Uso (na raiz do projeto):
+
+    python bench/bench_ranking.py [experiencias] [palavras_da_vaga]
+
+Compara com a pontuação antiga (regex + interseção de palavras por item) e
+mede à parte só a pontuação dos itens, que é o custo por requisição quando os
+termos da vaga já estão no cache de vagas.
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ranking  # noqa: E402
+
+VOCAB = (
+    "python java kubernetes docker aws gestão liderança análise dados sql vendas "
+    "comunicação negociação flask django react node.js c++ c# excel power bi "
+    "scrum kanban marketing finanças contabilidade logística produção qualidade "
+    "segurança redes suporte atendimento planejamento estratégia inovação"
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCAB) for _ in range(words))
+
+
+def synthetic_cv(rng: random.Random, experiences: int):
+    return {
+        "experiencias": [
+            {
+                "cargo": _text(rng, 3),
+                "empresa": _text(rng, 2),
+                "descricao": _text(rng, 80),
+                "conquistas": _text(rng, 30),
+                "tecnologias": _text(rng, 8),
+            }
+            for _ in range(experiences)
+        ],
+        "projetos": [
+            {"nome": _text(rng, 3), "tecnologias": _text(rng, 5), "descricao": _text(rng, 40)}
+            for _ in range(experiences // 2)
+        ],
+        "skills_tecnicas": [_text(rng, 2) for _ in range(experiences)],
+        "skills_comportamentais": [_text(rng, 1) for _ in range(experiences // 4)],
+        "skills_outras": [_text(rng, 2) for _ in range(experiences // 4)],
+    }
+
+
+def legacy_rank(cv, posting: str) -> None:
+    word_re = r"[A-Za-zÀ-ÖØ-öø-ÿ]{4,}"
+    freq = {}
+    for w in re.findall(word_re, posting.lower()):
+        freq[w] = freq.get(w, 0) + 1
+    keywords = {w for w, _ in sorted(freq.items(), key=lambda x: x[1], reverse=True)[:30]}
+
+    def score(text):
+        return len(set(re.findall(word_re, text.lower())) & keywords)
+
+    for key in ("skills_tecnicas", "skills_comportamentais", "skills_outras"):
+        cv[key].sort(key=score, reverse=True)
+    cv["experiencias"].sort(
+        key=lambda e: score(" ".join(e[k] for k in ("cargo", "empresa", "descricao", "conquistas", "tecnologias"))),
+        reverse=True,
+    )
+
+
+def new_rank(cv, posting: str) -> None:
+    ranking.rank_cv(cv, ranking.job_weights(ranking.term_counts(posting)))
+
+
+def main(experiences: int = 500, posting_words: int = 50_000, repeat: int = 5) -> None:
+    rng = random.Random(42)
+    posting = _text(rng, posting_words)
+    base = synthetic_cv(rng, experiences)
+    items = sum(len(v) for v in base.values())
+    print(f"currículo: {items} itens | vaga: {posting_words} palavras | {repeat} repetições")
+    # No /gerar os termos da vaga vêm do cache de vagas; mede também só a pontuação
+    weights = ranking.job_weights(ranking.term_counts(posting))
+
+    def cached_rank(cv, _posting):
+        ranking.rank_cv(cv, weights)
+
+    for label, fn in (("antigo", legacy_rank), ("ranking", new_rank), ("só itens", cached_rank)):
+        elapsed = 0.0
+        for _ in range(repeat):
+            cv = {k: list(v) for k, v in base.items()}
+            started = time.perf_counter()
+            fn(cv, posting)
+            elapsed += time.perf_counter() - started
+        per_run = elapsed / repeat
+        print(f"{label:8} {per_run * 1000:8.1f} ms/currículo  {items / per_run:10.0f} itens/s")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,76 @@
+"""Compara o PDF com CSS embutido vs. CSS pré-compilado (``stylesheets``).
+
+Uso (na raiz do projeto, com o WeasyPrint funcionando):
+
+    python bench/bench_stylesheets.py [repeticoes]
+
+Para cada template mede o tempo médio por PDF nos dois modos e a economia.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import render_template  # noqa: E402
+
+import stylesheets  # noqa: E402
+from app import PDF_TEMPLATES, app  # noqa: E402
+
+SAMPLE = {
+    "nome": "Maria Exemplo",
+    "titulo": "Engenheira de Software",
+    "email": "maria@example.com",
+    "telefone": "(11) 99999-0000",
+    "endereco": "São Paulo - SP",
+    "resumo": "Desenvolvedora com foco em backend Python e dados. " * 4,
+    "experiencias": [
+        {
+            "cargo": f"Cargo {i}",
+            "empresa": f"Empresa {i}",
+            "periodo": "2019 — 2023",
+            "descricao": "Responsável por APIs, filas e observabilidade. " * 3,
+            "tecnologias": "Python, Flask, PostgreSQL",
+        }
+        for i in range(6)
+    ],
+    "formacoes": [{"curso": "Ciência da Computação", "instituicao": "USP", "ano": "2018"}],
+    "skills_tecnicas": ["Python", "Flask", "SQL", "Docker"],
+    "skills_comportamentais": ["Comunicação", "Liderança"],
+    "skills_outras": ["Inglês avançado"],
+    "data_geracao": "01/01/2025",
+}
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # primeira execução fora da medição
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main(repeat: int = 10) -> None:
+    from weasyprint import HTML
+
+    font_config = stylesheets.font_config()
+    print(f"{'template':32} {'embutido':>10} {'pré-comp.':>10} {'economia':>9}")
+    with app.app_context():
+        for template in PDF_TEMPLATES.values():
+            html_inline = render_template(template, **SAMPLE)
+            html_data = render_template(template, css_externo=True, **SAMPLE)
+            options = {
+                "stylesheets": [stylesheets.get_stylesheet(template)],
+                "font_config": font_config,
+            }
+
+            inline = _time(lambda: HTML(string=html_inline).write_pdf(), repeat)
+            precompiled = _time(lambda: HTML(string=html_data).write_pdf(**options), repeat)
+            saving = (1 - precompiled / inline) * 100 if inline else 0.0
+            print(
+                f"{template:32} {inline * 1000:8.1f}ms {precompiled * 1000:8.1f}ms {saving:8.1f}%"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,177 @@
+"""Gerador de currículos sintéticos para os benchmarks.
+
+Os dados são determinísticos (semente fixa), então duas execuções com os
+mesmos parâmetros medem exatamente o mesmo trabalho.
+"""
+import io
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from form_schema import SCHEMA, Field
+
+VOCAB = (
+    "python java kubernetes docker aws gestão liderança análise dados sql vendas "
+    "comunicação negociação flask django react node.js c++ c# excel power bi "
+    "scrum kanban marketing finanças contabilidade logística produção qualidade "
+    "segurança redes suporte atendimento planejamento estratégia inovação "
+    "clientes indicadores processos automação relatórios integração equipe"
+).split()
+
+# Perfis prontos: experiências, palavras por descrição, habilidades, lado da foto (px)
+PROFILES = {
+    "pequeno": {"experiences": 2, "words": 20, "skills": 5, "photo_px": 0},
+    "medio": {"experiences": 6, "words": 60, "skills": 15, "photo_px": 800},
+    "grande": {"experiences": 20, "words": 150, "skills": 40, "photo_px": 3000},
+}
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCAB) for _ in range(words))
+
+
+def _title(rng: random.Random, words: int) -> str:
+    return _text(rng, words).capitalize()
+
+
+def synthetic_photo(px: int, seed: int = 0) -> Optional[bytes]:
+    """JPEG ``px`` x ``px`` com ruído (difícil de comprimir, como uma foto real)."""
+    if px <= 0:
+        return None
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    rng = random.Random(seed)
+    tile = Image.frombytes("RGB", (64, 64), bytes(rng.getrandbits(8) for _ in range(64 * 64 * 3)))
+    image = tile.resize((px, px))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def synthetic_cv(
+    experiences: int = 6,
+    words: int = 60,
+    skills: int = 15,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """``cv_data`` no formato montado pelo ``/gerar`` (sem foto; ver ``synthetic_photo``)."""
+    rng = random.Random(seed)
+    return {
+        "nome": "Pessoa Sintética",
+        "titulo": _title(rng, 3),
+        "email": "pessoa@example.com",
+        "telefone": "(11) 99999-0000",
+        "endereco": "São Paulo - SP",
+        "portfolio": "https://example.com",
+        "foto_url": "",
+        "resumo": _title(rng, min(words * 2, 150)),
+        "experiencias": [
+            {
+                "empresa": _title(rng, 2),
+                "cargo": _title(rng, 3),
+                "periodo": f"{2000 + i} — {2001 + i}",
+                "descricao": _title(rng, words),
+                "local": "São Paulo",
+                "conquistas": _title(rng, words // 3),
+                "tecnologias": ", ".join(rng.sample(VOCAB, 5)),
+            }
+            for i in range(experiences)
+        ],
+        "formacoes": [
+            {
+                "curso": _title(rng, 3),
+                "instituicao": _title(rng, 2),
+                "cidade": "São Paulo",
+                "ano": "2015",
+                "status": "Concluído",
+            }
+            for _ in range(2)
+        ],
+        "skills_tecnicas": [_title(rng, 1) for _ in range(skills)],
+        "skills_comportamentais": [_title(rng, 1) for _ in range(max(skills // 3, 1))],
+        "skills_outras": [_title(rng, 2) for _ in range(max(skills // 5, 1))],
+        "certificacoes": [
+            {"nome": _title(rng, 3), "instituicao": _title(rng, 1), "ano": "2020", "codigo": ""}
+        ],
+        "projetos": [
+            {
+                "nome": _title(rng, 2),
+                "tecnologias": ", ".join(rng.sample(VOCAB, 4)),
+                "descricao": _title(rng, words),
+                "link": "https://example.com/projeto",
+            }
+            for _ in range(max(experiences // 2, 1))
+        ],
+        "idiomas": [{"nome": "Inglês", "nivel": "Avançado"}],
+        "cursos_extra": [],
+        "premios": [],
+        "voluntariados": [],
+        "publicacoes_texto": "",
+        "data_geracao": "01/01/2025",
+    }
+
+
+def form_pairs(cv_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Pares (name, valor) que o formulário HTML enviaria para este ``cv_data``."""
+    pairs: List[Tuple[str, str]] = []
+    for entry in SCHEMA:
+        value = cv_data.get(entry.key)
+        if isinstance(entry, Field):
+            if isinstance(value, list):
+                value = ", ".join(value)
+            elif entry.key == "foto_url" and str(value).startswith("data:"):
+                value = ""  # foto enviada por upload não passa pelo campo de URL
+            pairs.append((entry.name, value or ""))
+            continue
+        for item in value or ():
+            for field in entry.fields:
+                pairs.append((field.name, item.get(field.key, "")))
+    return pairs
+
+
+def synthetic_job(words: int = 600, seed: int = 1) -> str:
+    """Texto de uma vaga (o que sobra do HTML após a extração)."""
+    return _text(random.Random(seed), words)
+
+
+def synthetic_job_page(size_kb: int = 800, words: int = 600, seed: int = 1) -> str:
+    """HTML de uma página de vaga como as dos sites de carreira.
+
+    Poucos KB de texto da vaga no meio de scripts, JSON de estado, CSS, SVGs
+    e menus, até chegar a ``size_kb``.
+    """
+    rng = random.Random(seed)
+    filler_words = " ".join(rng.choice(VOCAB) for _ in range(40))
+    state = '{"jobs":[' + ",".join(
+        '{"id":%d,"title":"%s","tags":["%s"]}' % (i, filler_words[:60], rng.choice(VOCAB))
+        for i in range(200)
+    ) + "]}"
+    parts = [
+        "<!doctype html><html lang='pt-BR'><head><meta charset='utf-8'>",
+        f"<title>Vaga: {_title(rng, 4)}</title>",
+        "<style>body{margin:0 auto;padding:4px}</style>",
+        "<script>window.__STATE__=" + state + ";</script>",
+        "</head><body><nav><ul>",
+        "".join(f"<li><a href='/v/{i}'>{_title(rng, 3)}</a></li>" for i in range(30)),
+        "</ul></nav><main><article><h1>Descrição da vaga</h1>",
+        "".join(
+            f"<p>{_text(rng, 60)} <b>{rng.choice(VOCAB)}</b> &amp; {_text(rng, 20)}</p>"
+            for _ in range(max(words // 80, 1))
+        ),
+        "</article></main>",
+    ]
+    size = sum(len(part) for part in parts)
+    block = 0
+    while size < size_kb * 1024:
+        if block % 3 == 0:
+            chunk = "<script>(function(){var s=%s;render(s)})();</script>" % state
+        elif block % 3 == 1:
+            chunk = "<style>" + "".join(f".x{i}>a{{color:#{i:06x}}}" for i in range(300)) + "</style>"
+        else:
+            chunk = "<svg viewBox='0 0 24 24'>" + "<path d='M0 0L24 24'/>" * 200 + "</svg>"
+        parts.append(chunk)
+        size += len(chunk)
+        block += 1
+    parts.append("<footer><p>Empresa Exemplo &copy; 2025</p></footer></body></html>")
+    return "".join(parts)
@@ -0,0 +1,41 @@
+// Web Worker do modo estático: carrega o Pyodide fora da thread principal e
+// executa cv_worker.process com os pares do formulário enviados pela página.
+// O runtime vem de vendor/ (ver vendor_assets.py), com o CDN da mesma versão
+// como alternativa.
+const PYODIDE_VERSION = '0.23.4';
+const LOCAL_URL = 'vendor/pyodide/' + PYODIDE_VERSION + '/';
+const CDN_URL = 'https://cdn.jsdelivr.net/pyodide/v' + PYODIDE_VERSION + '/full/';
+
+let indexURL = LOCAL_URL;
+try {
+    importScripts(LOCAL_URL + 'pyodide.js');
+} catch (e) {
+    indexURL = CDN_URL;
+    importScripts(CDN_URL + 'pyodide.js');
+}
+
+const ready = (async function () {
+    const started = performance.now();
+    const pyodide = await loadPyodide({ indexURL: indexURL });
+    for (const name of ['form_schema.py', 'cv_worker.py']) {
+        const response = await fetch(name);
+        pyodide.FS.writeFile(name, await response.text());
+    }
+    const module = pyodide.pyimport('cv_worker');
+    self.postMessage({ pronto: true, bootMs: performance.now() - started, origem: indexURL });
+    return module;
+})();
+// Sem o Python o Worker não serve: a página passa para o PyScript
+ready.catch(function (e) {
+    self.postMessage({ falhou: String(e) });
+});
+
+self.onmessage = async function (ev) {
+    const { id, pairsJson } = ev.data;
+    try {
+        const module = await ready;
+        self.postMessage({ id: id, result: module.process(pairsJson) });
+    } catch (e) {
+        self.postMessage({ id: id, error: String(e) });
+    }
+};
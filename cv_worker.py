@@ -0,0 +1,45 @@
+"""Lógica Python do modo estático (Pyodide), sem acesso ao DOM.
+
+Roda dentro de um Web Worker (ver ``cv_worker.js``), para não travar a
+página em currículos grandes; ``script.py`` usa a mesma função na thread
+principal quando o navegador não tem Worker. O formulário chega de uma vez,
+como JSON com os pares (nome, valor) do ``FormData``: uma única travessia
+da ponte JS/Python em vez de um ``querySelector`` por campo.
+"""
+import json
+import time
+
+from form_schema import parse_form
+
+
+def process(pairs_json: str) -> str:
+    """Pares do formulário (JSON) -> resultado para o navegador (JSON).
+
+    O resultado traz ``formato``, ``arquivo`` (nome do JSON), ``conteudo``
+    (JSON do currículo: indentado para download, compacto para o jsPDF) e
+    ``python_ms`` (tempo de reorganização dos campos em Python).
+    """
+    started = time.perf_counter()
+    pairs = json.loads(pairs_json)
+    # Mesmo esquema do backend Flask (form_schema.py); job_url é apenas
+    # informativo neste modo estático
+    data = parse_form(pairs)
+    output_format = next((v.strip() for k, v in pairs if k == "output_format"), "") or "pdf"
+
+    if output_format == "json":
+        safe_name = (data.get("nome") or "curriculo").lower().replace(" ", "_")
+        conteudo = json.dumps(data, ensure_ascii=False, indent=2)
+        arquivo = f"curriculo_{safe_name}.json"
+    else:
+        # O jsPDF escolhe o nome do PDF (ver gerarPDFFromJson)
+        conteudo = json.dumps(data, ensure_ascii=False)
+        arquivo = None
+    return json.dumps(
+        {
+            "formato": output_format,
+            "arquivo": arquivo,
+            "conteudo": conteudo,
+            "python_ms": round((time.perf_counter() - started) * 1000, 2),
+        },
+        ensure_ascii=False,
+    )
@@ -0,0 +1,288 @@
+"""Exportação para Word (DOCX).
+
+O conteúdo é descrito uma única vez em ``paragraphs`` (estilo + texto) e há
+dois motores para escrevê-lo:
+
+- ``write_fast`` (padrão): o pacote base do python-docx (estilos, tema,
+  numeração etc.) é gerado e compactado uma vez por processo; a cada
+  exportação só o ``word/document.xml`` é escrito, direto como texto XML e
+  compactado em streaming, e os bytes já comprimidos das demais partes são
+  copiados para o ZIP sem recompressão;
+- ``write_python_docx``: o caminho original, montando o documento pelo modelo
+  de objetos do python-docx. Serve de referência e de alternativa.
+
+Os dois geram o mesmo ``word/document.xml``. CURRICULO_DOCX_ENGINE=python-docx
+volta ao motor original.
+"""
+import io
+import os
+import re
+import struct
+import threading
+import zipfile
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+ENGINE = os.environ.get("CURRICULO_DOCX_ENGINE", "rapido")
+
+# (estilo do python-docx ou None, texto)
+Paragraph = Tuple[Optional[str], str]
+
+_SKILL_GROUPS = (
+    ("Técnicas", "skills_tecnicas"),
+    ("Comportamentais", "skills_comportamentais"),
+    ("Outras", "skills_outras"),
+)
+
+
+def _join(*parts: Any) -> str:
+    return " | ".join(part for part in parts if part)
+
+
+def paragraphs(cv_data: Dict[str, Any]) -> List[Paragraph]:
+    """Parágrafos do DOCX, na ordem, com o estilo de cada um."""
+    out: List[Paragraph] = [("Title", cv_data.get("nome") or "Currículo")]
+    if cv_data.get("titulo"):
+        out.append((None, cv_data["titulo"]))
+
+    contato = _join(
+        *(str(cv_data.get(k) or "") for k in ("email", "telefone", "endereco", "portfolio"))
+    )
+    if contato:
+        out.append((None, contato))
+
+    if cv_data.get("resumo"):
+        out.append(("Heading 1", "Resumo profissional"))
+        out.append((None, cv_data["resumo"]))
+
+    if cv_data.get("experiencias"):
+        out.append(("Heading 1", "Experiência profissional"))
+        for exp in cv_data["experiencias"]:
+            titulo = _join(exp.get("cargo"), exp.get("empresa"), exp.get("periodo"))
+            if titulo:
+                out.append(("List Bullet", titulo))
+            if exp.get("descricao"):
+                out.append((None, exp["descricao"]))
+
+    if cv_data.get("formacoes"):
+        out.append(("Heading 1", "Formação"))
+        for edu in cv_data["formacoes"]:
+            linha = _join(
+                edu.get("curso"),
+                edu.get("instituicao"),
+                edu.get("cidade"),
+                edu.get("ano"),
+                edu.get("status"),
+            )
+            if linha:
+                out.append(("List Bullet", linha))
+
+    if any(cv_data.get(key) for _, key in _SKILL_GROUPS):
+        out.append(("Heading 1", "Habilidades"))
+        for label, key in _SKILL_GROUPS:
+            skills = cv_data.get(key) or []
+            if skills:
+                out.append((None, f"{label}: {', '.join(skills)}"))
+    return out
+
+
+def write_python_docx(cv_data: Dict[str, Any]) -> bytes:
+    """Motor original: documento montado pelo python-docx."""
+    from docx import Document
+
+    doc = Document()
+    for style, text in paragraphs(cv_data):
+        doc.add_paragraph(text, style=style)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+# --- motor rápido -----------------------------------------------------------
+
+_DOCUMENT_PART = "word/document.xml"
+# Caracteres que o XML 1.0 não aceita (tab, \n e \r são tratados antes)
+_INVALID_XML_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_RUN_SPLIT_RE = re.compile(r"(\t|\r|\n)")
+
+
+class _BasePackage:
+    """Pacote DOCX padrão do python-docx, já compactado, sem o document.xml."""
+
+    def __init__(self):
+        from docx import Document
+
+        buf = io.BytesIO()
+        Document().save(buf)
+        source = zipfile.ZipFile(buf)
+
+        document_xml = source.read(_DOCUMENT_PART).decode("utf-8")
+        body_at = document_xml.index("<w:body>") + len("<w:body>")
+        sect_at = document_xml.index("<w:sectPr", body_at)
+        self.head = document_xml[:body_at].encode("utf-8")
+        self.tail = document_xml[sect_at:].encode("utf-8")
+
+        raw = buf.getvalue()
+        local = io.BytesIO()
+        central = io.BytesIO()
+        self.date_time = None
+        for info in source.infolist():
+            if info.filename == _DOCUMENT_PART:
+                self.date_time = _dos_time(info.date_time)
+                continue
+            # Bytes comprimidos copiados do ZIP original (sem recompactar)
+            header = info.header_offset
+            name_len, extra_len = struct.unpack("<HH", raw[header + 26 : header + 30])
+            start = header + 30 + name_len + extra_len
+            data = raw[start:start + info.compress_size]
+            entry = _Entry(
+                info.filename.encode("utf-8"),
+                info.compress_type,
+                _dos_time(info.date_time),
+                info.CRC,
+                info.compress_size,
+                info.file_size,
+            )
+            offset = local.tell()
+            local.write(entry.local_header())
+            local.write(data)
+            central.write(entry.central_header(offset))
+        self.entries = len(source.infolist()) - 1
+        self.local = local.getvalue()
+        self.central = central.getvalue()
+
+
+class _Entry:
+    """Uma entrada do ZIP: cabeçalho local e registro do diretório central."""
+
+    def __init__(
+        self,
+        name: bytes,
+        method: int,
+        dos_time: Tuple[int, int],
+        crc: int,
+        compress_size: int,
+        file_size: int,
+    ):
+        self.name = name
+        self.method = method
+        self.dos_time = dos_time
+        self.crc = crc
+        self.compress_size = compress_size
+        self.file_size = file_size
+
+    def _fields(self) -> tuple:
+        # versão mínima, flags, método, hora, data, CRC, tamanhos, nome, extra
+        return (
+            20,
+            0,
+            self.method,
+            self.dos_time[1],
+            self.dos_time[0],
+            self.crc,
+            self.compress_size,
+            self.file_size,
+            len(self.name),
+            0,
+        )
+
+    def local_header(self) -> bytes:
+        return struct.pack("<IHHHHHIIIHH", 0x04034B50, *self._fields()) + self.name
+
+    def central_header(self, offset: int) -> bytes:
+        return (
+            # + comentário, disco, atributos internos/externos e posição do cabeçalho local
+            struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 20, *self._fields(), 0, 0, 0, 0, offset)
+            + self.name
+        )
+
+
+def _dos_time(date_time: Tuple[int, ...]) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = date_time[:6]
+    return (
+        (year - 1980) << 9 | month << 5 | day,
+        hour << 11 | minute << 5 | second // 2,
+    )
+
+
+_base: Optional[_BasePackage] = None
+_base_lock = threading.Lock()
+
+
+def base_package() -> _BasePackage:
+    """Pacote base do processo (montado na primeira chamada)."""
+    global _base
+    if _base is None:
+        with _base_lock:
+            if _base is None:
+                _base = _BasePackage()
+    return _base
+
+
+def _text_xml(text: str) -> str:
+    """Conteúdo de um ``<w:r>``, com as mesmas regras do python-docx."""
+    parts = []
+    for piece in _RUN_SPLIT_RE.split(_INVALID_XML_RE.sub("", text)):
+        if piece == "\t":
+            parts.append("<w:tab/>")
+        elif piece in ("\r", "\n"):
+            parts.append("<w:br/>")
+        elif piece:
+            if len(piece.strip()) < len(piece):
+                parts.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+            else:
+                parts.append(f"<w:t>{escape(piece)}</w:t>")
+    return "".join(parts)
+
+
+def _paragraph_xml(style: Optional[str], text: str) -> str:
+    ppr = f'<w:pPr><w:pStyle w:val="{style.replace(" ", "")}"/></w:pPr>' if style else ""
+    run = f"<w:r>{_text_xml(text)}</w:r>" if text else ""
+    if not ppr and not run:
+        return "<w:p/>"
+    return f"<w:p>{ppr}{run}</w:p>"
+
+
+def write_fast(cv_data: Dict[str, Any]) -> bytes:
+    """Motor rápido: só o document.xml é gerado a cada chamada."""
+    base = base_package()
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    crc = 0
+    size = 0
+    chunks = []
+
+    def feed(data: bytes) -> None:
+        nonlocal crc, size
+        crc = zlib.crc32(data, crc)
+        size += len(data)
+        chunks.append(compressor.compress(data))
+
+    feed(base.head)
+    for style, text in paragraphs(cv_data):
+        feed(_paragraph_xml(style, text).encode("utf-8"))
+    feed(base.tail)
+    chunks.append(compressor.flush())
+    data = b"".join(chunks)
+
+    entry = _Entry(
+        _DOCUMENT_PART.encode("ascii"), zipfile.ZIP_DEFLATED, base.date_time, crc, len(data), size
+    )
+    offset = len(base.local)
+    central = base.central + entry.central_header(offset)
+    central_at = offset + 30 + len(entry.name) + len(data)
+    count = base.entries + 1
+    end = struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count, count, len(central), central_at, 0)
+    return b"".join((base.local, entry.local_header(), data, central, end))
+
+
+def write_docx(cv_data: Dict[str, Any]) -> bytes:
+    """DOCX do currículo com o motor configurado."""
+    if ENGINE == "python-docx":
+        return write_python_docx(cv_data)
+    return write_fast(cv_data)
+
+
+def warm_up() -> None:
+    if ENGINE != "python-docx":
+        base_package()
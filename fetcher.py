@@ -0,0 +1,166 @@
+"""``url_fetcher`` do WeasyPrint para recursos remotos (ex.: ``foto_url``).
+
+Em vez do fetcher padrão (uma conexão nova por recurso, sem limites), usa uma
+``requests.Session`` com pool de conexões, limita bytes e tempo de download,
+guarda as respostas em cache (TTL + LRU) e passa imagens pelo mesmo
+tratamento das fotos enviadas por upload (``photo.process_photo``).
+
+Configuração por variáveis de ambiente:
+- CURRICULO_FETCH_MAX_BYTES tamanho máximo de um recurso (padrão 5 MB);
+- CURRICULO_FETCH_TIMEOUT tempo máximo (s) de conexão + download;
+- CURRICULO_FETCH_CACHE_TTL (s) e CURRICULO_FETCH_CACHE_ITEMS.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from photo import PhotoError, process_photo
+
+if TYPE_CHECKING:  # requests só é importado na primeira sessão
+    import requests
+
+
+class FetchError(IOError):
+    """Recurso remoto acima dos limites ou indisponível."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class ResourceFetcher:
+    def __init__(
+        self,
+        max_bytes: int = 5 * 1024 * 1024,
+        timeout: float = 5.0,
+        ttl: int = 600,
+        max_items: int = 128,
+        max_cache_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_items = max_items
+        self.max_cache_bytes = max_cache_bytes
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self._session: Optional["requests.Session"] = None
+        self._session_pid: Optional[int] = None
+        self.stats = {"hits": 0, "misses": 0, "errors": 0, "bytes_downloaded": 0}
+
+    @classmethod
+    def from_env(cls) -> "ResourceFetcher":
+        return cls(
+            max_bytes=_env_int("CURRICULO_FETCH_MAX_BYTES", 5 * 1024 * 1024),
+            timeout=float(_env_int("CURRICULO_FETCH_TIMEOUT", 5)),
+            ttl=_env_int("CURRICULO_FETCH_CACHE_TTL", 600),
+            max_items=_env_int("CURRICULO_FETCH_CACHE_ITEMS", 128),
+        )
+
+    @property
+    def session(self) -> "requests.Session":
+        # Sessões não sobrevivem bem a fork; cada processo cria a sua
+        if self._session is None or self._session_pid != os.getpid():
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = "meucurriculo/1.0"
+            self._session = session
+            self._session_pid = os.getpid()
+        return self._session
+
+    def _cache_get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._cache[url]
+                self._cache_bytes -= len(result["string"])
+                return None
+            self._cache.move_to_end(url)
+            return result
+
+    def _cache_put(self, url: str, result: Dict[str, Any]) -> None:
+        size = len(result["string"])
+        if size > self.max_cache_bytes:
+            return
+        with self._lock:
+            old = self._cache.pop(url, None)
+            if old is not None:
+                self._cache_bytes -= len(old[1]["string"])
+            self._cache[url] = (time.monotonic() + self.ttl, result)
+            self._cache_bytes += size
+            while self._cache and (
+                len(self._cache) > self.max_items or self._cache_bytes > self.max_cache_bytes
+            ):
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted["string"])
+
+    def _download(self, url: str) -> Dict[str, Any]:
+        deadline = time.monotonic() + self.timeout
+        with self.session.get(url, stream=True, timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            declared = resp.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                raise FetchError(f"Recurso maior que {self.max_bytes} bytes: {url}")
+            chunks = []
+            total = 0
+            for chunk in resp.iter_content(64 * 1024):
+                total += len(chunk)
+                if total > self.max_bytes:
+                    raise FetchError(f"Recurso maior que {self.max_bytes} bytes: {url}")
+                if time.monotonic() > deadline:
+                    raise FetchError(f"Tempo esgotado baixando {url}")
+                chunks.append(chunk)
+            data = b"".join(chunks)
+            mime = (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            final_url = resp.url
+        with self._lock:
+            self.stats["bytes_downloaded"] += len(data)
+
+        if mime.startswith("image/") and mime != "image/svg+xml":
+            processed = process_photo(data, mime)
+            data, mime = processed.data, processed.mime
+        return {"string": data, "mime_type": mime or None, "redirected_url": final_url}
+
+    def __call__(self, url: str) -> Dict[str, Any]:
+        if not url.lower().startswith(("http://", "https://")):
+            # data:, file: etc. continuam com o fetcher padrão do WeasyPrint
+            from weasyprint import default_url_fetcher
+
+            return default_url_fetcher(url)
+
+        cached = self._cache_get(url)
+        if cached is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            return dict(cached)
+        with self._lock:
+            self.stats["misses"] += 1
+        try:
+            result = self._download(url)
+        except (IOError, PhotoError):  # RequestException e FetchError são IOError
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        self._cache_put(url, result)
+        return dict(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            info = dict(self.stats)
+            info["items"] = len(self._cache)
+            info["bytes"] = self._cache_bytes
+        return info
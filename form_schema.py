@@ -0,0 +1,294 @@
+"""Esquema declarativo do formulário do currículo.
+
+Usado pelo backend Flask (``app.py``) e pelo modo estático PyScript
+(``script.py``), por isso é Python puro, sem dependências.
+
+``parse_form`` percorre uma única vez os dados enviados e monta o
+``cv_data``: campos simples, listas de habilidades separadas por vírgula e
+seções repetidas (experiências, formações etc.), em que o i-ésimo valor de
+cada campo forma o i-ésimo item.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+# Limite simples de segurança por campo (poderia ser ajustado)
+MAX_LEN = 4000
+
+
+def normalize_text(text: str) -> str:
+    """Limpeza simples: tira espaços extras e garante início com maiúscula."""
+    text = (text or "").strip()
+    if not text:
+        return ""
+    # Espaços internos
+    text = re.sub(r"\s+", " ", text)
+    # Primeira letra maiúscula
+    return text[0].upper() + text[1:]
+
+
+def normalize_period(periodo: str) -> str:
+    """Padroniza o separador do período em ' — ' sem tentar parser complexo."""
+    if not periodo:
+        return ""
+    periodo = re.sub(r"\s*[-–—]+\s*", " — ", periodo.strip())
+    return periodo
+
+
+# Habilidades por lista (técnicas, comportamentais, outras)
+MAX_SKILLS = 100
+
+
+def parse_skills(raw: str, limit: Optional[int] = MAX_SKILLS) -> List[str]:
+    """Habilidades separadas por vírgula, no máximo ``limit`` (``None``: todas)."""
+    return [s.strip() for s in raw.split(",") if s.strip()][:limit]
+
+
+def _resumo(text: str) -> str:
+    return normalize_text(text)[:1000]
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str  # atributo name do input
+    key: str  # chave no cv_data (ou no item da seção)
+    normalizer: Optional[Callable[[str], Any]] = None
+
+
+@dataclass(frozen=True)
+class Section:
+    key: str  # chave da lista no cv_data
+    container: str  # id do container dos blocos repetidos no HTML
+    fields: Tuple[Field, ...]
+    max_items: int = 100
+
+
+# Ordem = ordem das chaves no cv_data (e no JSON exportado)
+SCHEMA: Tuple[Union[Field, Section], ...] = (
+    Field("nome", "nome", normalize_text),
+    Field("titulo", "titulo", normalize_text),
+    Field("email", "email"),
+    Field("telefone", "telefone"),
+    Field("endereco", "endereco", normalize_text),
+    Field("link_portfolio", "portfolio"),
+    Field("foto_url", "foto_url"),
+    Field("resumo", "resumo", _resumo),
+    Section(
+        "experiencias",
+        "experiencias-container",
+        (
+            Field("exp_empresa", "empresa"),
+            Field("exp_cargo", "cargo"),
+            Field("exp_periodo", "periodo", normalize_period),
+            Field("exp_descricao", "descricao"),
+            Field("exp_local", "local"),
+            Field("exp_conquistas", "conquistas"),
+            Field("exp_tech", "tecnologias"),
+        ),
+    ),
+    Section(
+        "formacoes",
+        "formacoes-container",
+        (
+            Field("edu_curso", "curso"),
+            Field("edu_inst", "instituicao"),
+            Field("edu_cidade", "cidade"),
+            Field("edu_ano", "ano"),
+            Field("edu_status", "status"),
+        ),
+    ),
+    Field("skills_tecnicas", "skills_tecnicas", parse_skills),
+    Field("skills_comportamentais", "skills_comportamentais", parse_skills),
+    Field("skills_outras", "skills_outras", parse_skills),
+    Section(
+        "certificacoes",
+        "certificacoes-container",
+        (
+            Field("cert_nome", "nome"),
+            Field("cert_inst", "instituicao"),
+            Field("cert_ano", "ano"),
+            Field("cert_codigo", "codigo"),
+        ),
+    ),
+    Section(
+        "projetos",
+        "projetos-container",
+        (
+            Field("proj_nome", "nome"),
+            Field("proj_tec", "tecnologias"),
+            Field("proj_desc", "descricao"),
+            Field("proj_link", "link"),
+        ),
+    ),
+    Section(
+        "idiomas",
+        "idiomas-container",
+        (Field("idioma_nome", "nome"), Field("idioma_nivel", "nivel")),
+    ),
+    Section(
+        "cursos_extra",
+        "cursos-extra-container",
+        (
+            Field("curso_extra_nome", "nome"),
+            Field("curso_extra_carga", "carga"),
+            Field("curso_extra_inst", "instituicao"),
+            Field("curso_extra_ano", "ano"),
+        ),
+    ),
+    Section(
+        "premios",
+        "premios-container",
+        (
+            Field("premio_titulo", "titulo"),
+            Field("premio_inst", "instituicao"),
+            Field("premio_ano", "ano"),
+            Field("premio_desc", "descricao"),
+        ),
+    ),
+    Section(
+        "voluntariados",
+        "voluntariado-container",
+        (
+            Field("vol_org", "organizacao"),
+            Field("vol_funcao", "funcao"),
+            Field("vol_periodo", "periodo"),
+            Field("vol_desc", "descricao"),
+        ),
+    ),
+    Field("publicacoes", "publicacoes_texto"),
+)
+
+SECTIONS = tuple(entry for entry in SCHEMA if isinstance(entry, Section))
+
+# name do input -> (seção ou None, campo)
+_BY_NAME: Dict[str, Tuple[Optional[Section], Field]] = {}
+for _entry in SCHEMA:
+    if isinstance(_entry, Section):
+        for _field in _entry.fields:
+            _BY_NAME[_field.name] = (_entry, _field)
+    else:
+        _BY_NAME[_entry.name] = (None, _entry)
+
+
+def _group(pairs: Iterable[Tuple[str, str]]) -> Iterable[Tuple[str, List[str]]]:
+    grouped: Dict[str, List[str]] = {}
+    for name, value in pairs:
+        if name in _BY_NAME:
+            grouped.setdefault(name, []).append(value)
+    return grouped.items()
+
+
+def parse_form(source, max_len: int = MAX_LEN) -> Dict[str, Any]:
+    """Monta o ``cv_data`` a partir do formulário enviado.
+
+    ``source`` pode ser um iterável de pares (nome, valor), na ordem do
+    documento, ou um MultiDict do Werkzeug (``request.form``), cujas listas
+    por nome são usadas diretamente. Campos simples usam o primeiro valor
+    enviado; nas seções, itens com todos os campos vazios são descartados.
+    Nomes fora do esquema são ignorados.
+    """
+    groups = source.lists() if hasattr(source, "lists") else _group(source)
+    scalars: Dict[str, str] = {}
+    columns: Dict[str, List[str]] = {}
+    lookup = _BY_NAME.get
+    for name, values in groups:
+        spec = lookup(name)
+        if spec is None or not values:
+            continue
+        section, field = spec
+        if section is None:
+            scalars[field.key] = (values[0] or "").strip()[:max_len]
+        else:
+            columns[name] = values
+
+    cv_data: Dict[str, Any] = {}
+    for entry in SCHEMA:
+        if isinstance(entry, Field):
+            value = scalars.get(entry.key, "")
+            cv_data[entry.key] = entry.normalizer(value) if entry.normalizer else value
+            continue
+        items = []
+        # zip: um item só existe se todos os campos do bloco foram enviados
+        for raw in zip(*(columns.get(f.name, ()) for f in entry.fields)):
+            row = [(v or "").strip()[:max_len] for v in raw]
+            if not any(row):
+                continue
+            items.append(
+                {
+                    f.key: f.normalizer(v) if f.normalizer else v
+                    for f, v in zip(entry.fields, row)
+                }
+            )
+            if len(items) >= entry.max_items:
+                break
+        cv_data[entry.key] = items
+    return cv_data
+
+
+# Chaves aceitas no cv_data além das do esquema
+EXTRA_KEYS = ("data_geracao",)
+
+# foto_url pode ser a data URL da foto enviada por upload (já reduzida); no
+# JSON, o app ainda passa a data URL pela mesma redução de um upload
+MAX_FOTO_URL_LEN = 2 * 1024 * 1024
+
+
+def validate_cv_data(data: Any, max_len: int = MAX_LEN) -> Tuple[Dict[str, Any], List[str]]:
+    """Valida um ``cv_data`` vindo de JSON (ex.: o exportado por /gerar).
+
+    Não normaliza de novo os textos: só confere tipos e limites, descarta
+    chaves desconhecidas e preenche as ausentes. Devolve (cv_data, erros).
+    """
+    if not isinstance(data, dict):
+        return {}, ["cv_data deve ser um objeto JSON"]
+    errors: List[str] = []
+
+    def text(value: Any, where: str, limit: int = max_len) -> str:
+        if value is None:
+            return ""
+        if not isinstance(value, str):
+            errors.append(f"{where}: esperado texto")
+            return ""
+        if len(value) > limit:
+            errors.append(f"{where}: máximo de {limit} caracteres")
+        return value
+
+    cv_data: Dict[str, Any] = {}
+    for entry in SCHEMA:
+        value = data.get(entry.key)
+        if isinstance(entry, Field):
+            if entry.normalizer is parse_skills:
+                if value is None:
+                    value = []
+                elif isinstance(value, str):
+                    value = parse_skills(value, limit=None)
+                elif not isinstance(value, list):
+                    errors.append(f"{entry.key}: esperado lista de textos")
+                    value = []
+                if len(value) > MAX_SKILLS:
+                    errors.append(f"{entry.key}: máximo de {MAX_SKILLS} itens")
+                cv_data[entry.key] = [text(v, f"{entry.key}[{i}]") for i, v in enumerate(value)]
+            else:
+                limit = MAX_FOTO_URL_LEN if entry.key == "foto_url" else max_len
+                cv_data[entry.key] = text(value, entry.key, limit)
+            continue
+        if value is None:
+            value = []
+        if not isinstance(value, list):
+            errors.append(f"{entry.key}: esperado lista de objetos")
+            value = []
+        if len(value) > entry.max_items:
+            errors.append(f"{entry.key}: máximo de {entry.max_items} itens")
+        items = []
+        for i, item in enumerate(value):
+            if not isinstance(item, dict):
+                errors.append(f"{entry.key}[{i}]: esperado objeto")
+                continue
+            items.append(
+                {f.key: text(item.get(f.key), f"{entry.key}[{i}].{f.key}") for f in entry.fields}
+            )
+        cv_data[entry.key] = items
+    for key in EXTRA_KEYS:
+        if data.get(key):
+            cv_data[key] = text(data[key], key)
+    return cv_data, errors
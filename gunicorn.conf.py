@@ -0,0 +1,38 @@
+# Carregado automaticamente pelo gunicorn quando iniciado na raiz do projeto
+# (Procfile e Dockerfile usam `gunicorn app:app`).
+import gc
+import os
+import time
+
+# CURRICULO_PRELOAD=1: o mestre importa o app e carrega WeasyPrint, CSS,
+# templates etc. antes do fork; os workers compartilham essas páginas
+# (copy-on-write) em vez de cada um carregar a sua cópia.
+preload_app = os.environ.get("CURRICULO_PRELOAD", "0") == "1"
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from app import preload
+
+    timings = preload()
+    # Objetos do preload fora do coletor: o gc não toca nas páginas e elas
+    # continuam compartilhadas depois do fork
+    gc.freeze()
+    server.log.info("curriculo: preload no mestre %s", timings)
+
+
+def post_fork(server, worker):
+    worker.curriculo_forked = time.perf_counter()
+
+
+def post_worker_init(worker):
+    # Aquece o worker antes da primeira requisição (pool de PDF / CSS compilado)
+    from app import warm_up
+
+    warm_up()
+    worker.log.info(
+        "curriculo: worker %s pronto em %.0f ms",
+        worker.pid,
+        (time.perf_counter() - worker.curriculo_forked) * 1000,
+    )
@@ -0,0 +1,186 @@
+"""Texto visível de uma página HTML, extraído em streaming.
+
+Páginas de vagas costumam ter centenas de KB de scripts, estilos, SVGs e
+JSON de estado em volta de poucos KB de texto. ``TextExtractor`` recebe o
+HTML em pedaços (``feed``), à medida que o download avança, e guarda só o
+texto fora das tags ignoradas, sem montar árvore nenhuma: o conteúdo de
+``<script>``, ``<style>`` etc. é pulado procurando direto a tag de
+fechamento. Um pedaço pode terminar no meio de uma tag ou de uma entidade;
+o resto fica no buffer até o próximo ``feed``.
+
+Como no navegador, aspas só delimitam um atributo logo depois do ``=``; um
+apóstrofo solto (``<a title=it's>``) não abre nada. Uma aspa de atributo que
+nunca fecha faz a tag terminar no primeiro ``>``, mas só depois de
+``_MAX_TAG`` caracteres sem fim ou no ``close``, já que a aspa de fechamento
+pode estar no próximo pedaço.
+
+O texto guardado tem limite (``max_chars``); passado dele, o resto da
+página é descartado e ``truncated`` fica verdadeiro.
+"""
+import codecs
+import re
+from html import unescape
+from typing import List, Optional
+
+# Conteúdo que não é texto da vaga
+SKIP_TAGS = frozenset(
+    ("script", "style", "noscript", "template", "svg", "math", "iframe", "object", "select")
+)
+# Tags que separam palavras (o resto, como <b> e <span>, pode estar no meio de uma)
+_BLOCK_TAGS = frozenset(
+    (
+        "address article aside blockquote br dd div dl dt fieldset figcaption figure "
+        "footer form h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section table "
+        "tbody td tfoot th thead title tr ul"
+    ).split()
+)
+
+_TAG_NAME_RE = re.compile(r"</?([a-zA-Z][a-zA-Z0-9:-]*)")
+# Fim de tag fora de aspas (valores entre aspas podem conter ">")
+_TAG_END_RE = re.compile(r"""[^>=]*(?:(?:=\s*"[^"]*"|=\s*'[^']*'|=(?!\s*["']))[^>=]*)*>""")
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.I)
+# Um "<" sem fim por mais que isso é texto solto, não uma tag (ou comentário)
+_MAX_TAG = 256 * 1024
+
+
+class TextExtractor:
+    def __init__(self, max_chars: int = 512 * 1024):
+        self.max_chars = max_chars
+        self.truncated = False
+        self._buf = ""
+        self._skip: Optional[re.Pattern] = None
+        self._skip_len = 0
+        self._parts: List[str] = []
+        self._size = 0
+
+    @property
+    def full(self) -> bool:
+        return self._size >= self.max_chars
+
+    def _emit(self, text: str) -> None:
+        if not text or self.full:
+            return
+        if "&" in text:
+            text = unescape(text)
+        room = self.max_chars - self._size
+        if len(text) > room:
+            text = text[:room]
+            self.truncated = True
+        self._parts.append(text)
+        self._size += len(text)
+
+    def feed(self, data: str) -> None:
+        """Processa mais um pedaço do HTML."""
+        if self.full:
+            self.truncated = True
+            return
+        buf = self._buf + data if self._buf else data
+        self._buf = buf[self._scan(buf, final=False):]
+
+    def _scan(self, buf: str, final: bool) -> int:
+        """Extrai o texto de ``buf``; devolve até onde consumiu.
+
+        Com ``final`` não há próximo pedaço: o que estiver incompleto é resolvido agora.
+        """
+        pos = 0
+        n = len(buf)
+        while pos < n:
+            if self._skip is not None:
+                match = self._skip.search(buf, pos)
+                if match is None:
+                    # Guarda só o suficiente para achar a tag de fechamento dividida
+                    pos = max(pos, n - self._skip_len)
+                    break
+                self._skip = None
+                pos = match.end()
+                continue
+            lt = buf.find("<", pos)
+            if lt < 0:
+                # Texto até o fim; uma entidade pode ter sido cortada ao meio
+                amp = buf.rfind("&", pos)
+                end = n
+                if not final and amp >= 0 and ";" not in buf[amp:] and n - amp < 32:
+                    end = amp
+                self._emit(buf[pos:end])
+                pos = end
+                break
+            self._emit(buf[pos:lt])
+            last_chance = final or n - lt > _MAX_TAG
+            pos = self._tag(buf, lt, last_chance)
+            if pos < 0:
+                # Tag incompleta: espera o próximo pedaço
+                pos = lt
+                if last_chance:
+                    self._emit(buf[lt : lt + 1])
+                    pos = lt + 1
+                    continue
+                break
+        return pos
+
+    def _tag(self, buf: str, lt: int, last_chance: bool = False) -> int:
+        """Consome a tag em ``buf[lt]``; devolve a posição seguinte ou -1 se incompleta.
+
+        Com ``last_chance``, uma aspa sem par não impede a tag de terminar no primeiro ``>``.
+        """
+        if buf.startswith("<!--", lt):
+            end = buf.find("-->", lt + 4)
+            return -1 if end < 0 else end + 3
+        if buf.startswith("<![CDATA[", lt):
+            end = buf.find("]]>", lt + 9)
+            return -1 if end < 0 else end + 3
+        name = _TAG_NAME_RE.match(buf, lt)
+        if name is None:
+            if buf[lt:] in ("<", "</"):
+                return -1
+            if buf[lt + 1] in "!?":
+                end = buf.find(">", lt)
+                return -1 if end < 0 else end + 1
+            # "<" solto no texto ("a < b")
+            self._emit("<")
+            return lt + 1
+        match = _TAG_END_RE.match(buf, name.end())
+        if match is not None:
+            end = match.end()
+        elif last_chance and ">" in buf[name.end():]:
+            end = buf.index(">", name.end()) + 1
+        else:
+            return -1
+        tag = name.group(1).lower()
+        closing = buf[lt + 1] == "/"
+        if not closing and tag in SKIP_TAGS and buf[end - 2] != "/":
+            self._skip = re.compile(r"</\s*%s\s*>" % re.escape(tag), re.I)
+            self._skip_len = len(tag) + 8
+        elif tag in _BLOCK_TAGS:
+            self._emit(" ")
+        return end
+
+    def close(self) -> str:
+        """Termina a extração e devolve o texto."""
+        if self._skip is None and self._buf and not self.full:
+            # Sobra: texto final ou uma tag com aspa que nunca fechou
+            self._scan(self._buf, final=True)
+        self._buf = ""
+        return "".join(self._parts)
+
+
+def extract_text(html: str, max_chars: int = 512 * 1024) -> str:
+    """Texto visível de um HTML já inteiro na memória."""
+    extractor = TextExtractor(max_chars)
+    extractor.feed(html)
+    return extractor.close()
+
+
+def sniff_encoding(head: bytes, declared: Optional[str]) -> str:
+    """Codificação da página: cabeçalho HTTP, ``<meta charset>`` ou UTF-8."""
+    for candidate in (declared, _meta_charset(head)):
+        if candidate:
+            try:
+                return codecs.lookup(candidate).name
+            except LookupError:
+                pass
+    return "utf-8"
+
+
+def _meta_charset(head: bytes) -> Optional[str]:
+    match = _META_CHARSET_RE.search(head[:4096])
+    return match.group(1).decode("ascii") if match else None
@@ -0,0 +1,380 @@
+"""Cache compartilhado (SQLite) das palavras-chave extraídas de vagas.
+
+Todos os workers do gunicorn usam o mesmo arquivo SQLite, então uma vaga
+popular é baixada uma única vez por TTL. Entradas vencidas com ETag ou
+Last-Modified são revalidadas com GET condicional; falhas de download são
+guardadas por um TTL menor (cache negativo) para não insistir em URLs quebradas.
+Se a vaga já tinha palavras-chave boas, a falha não as apaga: as antigas
+continuam servidas e a nova tentativa fica para depois do TTL negativo.
+
+Configuração por variáveis de ambiente:
+- CURRICULO_JOB_CACHE=0 desliga o cache;
+- CURRICULO_JOB_CACHE_PATH caminho do arquivo SQLite;
+- CURRICULO_JOB_CACHE_TTL / CURRICULO_JOB_CACHE_NEGATIVE_TTL em segundos;
+- CURRICULO_JOB_CACHE_MAX_ENTRIES limite de vagas guardadas (LRU).
+
+Acertos não abrem transação de escrita: o ``last_used`` e os contadores
+ficam acumulados no processo e vão para o SQLite juntos, numa transação a
+cada ``_FLUSH_SECONDS`` ou ``_FLUSH_ITEMS`` registros (e no ``snapshot``).
+"""
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Parâmetros de rastreamento que não mudam o conteúdo da vaga. Só ``utm_`` é
+# prefixo; os outros nomes precisam bater inteiros (``reference``, ``trkId`` ou
+# o ``ref`` que identifica a vaga em alguns sites mudam o conteúdo)
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = frozenset(("fbclid", "gclid", "msclkid", "trk", "refid"))
+
+_FLUSH_SECONDS = 5.0
+_FLUSH_ITEMS = 100
+
+# download(url, headers_condicionais) -> (status, texto | None, headers da resposta)
+Downloader = Callable[[str, Dict[str, str]], Tuple[int, Optional[str], Mapping[str, str]]]
+Extractor = Callable[[str], Any]  # resultado precisa ser serializável em JSON
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_keywords (
+    url TEXT PRIMARY KEY,
+    ok INTEGER NOT NULL,
+    keywords TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    fetch_seconds REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS job_keywords_last_used ON job_keywords(last_used);
+CREATE TABLE IF NOT EXISTS job_keywords_stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name.startswith(_TRACKING_PREFIXES) or name in _TRACKING_PARAMS
+
+
+def normalize_url(url: str) -> str:
+    """Normaliza a URL da vaga para usar como chave do cache.
+
+    Só esquema, host, porta e a ordem da query mudam; o caminho fica como veio
+    (``/vagas/123`` e ``/vagas/123/`` podem ser páginas diferentes).
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (
+        (scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)
+    ):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(k)
+    )
+    path = parts.path or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class JobKeywordCache:
+    def __init__(
+        self,
+        path: str,
+        ttl: int = 3600,
+        negative_ttl: int = 300,
+        max_entries: int = 1000,
+        enabled: bool = True,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Escritas perdidas (banco travado por outro worker etc.), por processo
+        self.write_errors = 0
+        # Acumulado no processo até o próximo flush: url -> last_used e contadores
+        self._pending_used: Dict[str, float] = {}
+        self._pending_stats: Dict[str, float] = {}
+        self._pending_items = 0
+        self._pending_since = time.monotonic()
+        self._pending_pid = os.getpid()
+        if self.enabled:
+            try:
+                # Só o esquema; as conexões de uso abrem em cada worker (ver app.preload)
+                with closing(self._connect()) as conn:
+                    conn.executescript(_SCHEMA)
+            except sqlite3.Error:
+                self.enabled = False
+            else:
+                atexit.register(self.flush)
+
+    @classmethod
+    def from_env(cls) -> "JobKeywordCache":
+        default_path = os.path.join(tempfile.gettempdir(), "curriculo_job_cache.sqlite3")
+        return cls(
+            path=os.environ.get("CURRICULO_JOB_CACHE_PATH") or default_path,
+            ttl=_env_int("CURRICULO_JOB_CACHE_TTL", 3600),
+            negative_ttl=_env_int("CURRICULO_JOB_CACHE_NEGATIVE_TTL", 300),
+            max_entries=_env_int("CURRICULO_JOB_CACHE_MAX_ENTRIES", 1000),
+            enabled=os.environ.get("CURRICULO_JOB_CACHE", "1") != "0",
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        # Uma conexão por thread/processo; o arquivo é compartilhado entre workers
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _write_failed(self) -> None:
+        # O cache é opcional: a requisição segue com o resultado já calculado
+        with self._lock:
+            self.write_errors += 1
+
+    def _record(self, used: Optional[Tuple[str, float]] = None, **counters: float) -> None:
+        """Acumula um ``last_used`` e contadores; grava quando o lote enche ou envelhece."""
+        now = time.monotonic()
+        with self._lock:
+            if self._pending_pid != os.getpid():
+                # Depois do fork o lote é do processo pai, que grava o seu
+                self._pending_used, self._pending_stats = {}, {}
+                self._pending_items = 0
+                self._pending_since = now
+                self._pending_pid = os.getpid()
+            if used is not None:
+                key, last_used = used
+                self._pending_used[key] = max(last_used, self._pending_used.get(key, 0.0))
+            for name, value in counters.items():
+                self._pending_stats[name] = self._pending_stats.get(name, 0.0) + value
+            self._pending_items += 1
+            due = (
+                self._pending_items >= _FLUSH_ITEMS
+                or now - self._pending_since >= _FLUSH_SECONDS
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Grava no SQLite, numa transação, o que foi acumulado neste processo."""
+        with self._lock:
+            if self._pending_pid != os.getpid():
+                return
+            used, self._pending_used = self._pending_used, {}
+            stats, self._pending_stats = self._pending_stats, {}
+            self._pending_items = 0
+            self._pending_since = time.monotonic()
+        if not used and not stats:
+            return
+        conn = None
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN")
+            conn.executemany(
+                "UPDATE job_keywords SET last_used = MAX(last_used, ?) WHERE url = ?",
+                [(last_used, key) for key, last_used in used.items()],
+            )
+            conn.executemany(
+                "INSERT INTO job_keywords_stats(name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                list(stats.items()),
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            # Só ordem do LRU e estatísticas: perder um lote não afeta as respostas
+            if conn is not None and conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+            self._write_failed()
+
+    def _store(
+        self,
+        conn: sqlite3.Connection,
+        key: str,
+        ok: bool,
+        keywords: Any,
+        headers: Mapping[str, str],
+        fetch_seconds: float,
+    ) -> None:
+        now = time.time()
+        ttl = self.ttl if ok else self.negative_ttl
+        conn.execute(
+            "INSERT OR REPLACE INTO job_keywords"
+            "(url, ok, keywords, etag, last_modified, expires_at, last_used, fetch_seconds) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                int(ok),
+                json.dumps(keywords, ensure_ascii=False),
+                headers.get("ETag") if ok else None,
+                headers.get("Last-Modified") if ok else None,
+                now + ttl,
+                now,
+                fetch_seconds,
+            ),
+        )
+        conn.execute(
+            "DELETE FROM job_keywords WHERE url IN ("
+            "SELECT url FROM job_keywords ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def get_or_fetch(
+        self,
+        url: str,
+        download: Downloader,
+        extract: Extractor,
+        variant: str = "",
+    ) -> Any:
+        """Devolve as palavras-chave da vaga, baixando só quando necessário.
+
+        ``variant`` diferencia extrações distintas da mesma URL (ex.: limite
+        de palavras). Erros de download devolvem lista vazia, como antes.
+        """
+        if not self.enabled:
+            return self._fetch_uncached(url, download, extract)
+        key = f"{normalize_url(url)}#{variant}" if variant else normalize_url(url)
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT ok, keywords, etag, last_modified, expires_at, fetch_seconds "
+                "FROM job_keywords WHERE url = ?",
+                (key,),
+            ).fetchone()
+        except sqlite3.Error:
+            return self._fetch_uncached(url, download, extract)
+
+        now = time.time()
+        if row is not None:
+            ok, keywords_json, etag, last_modified, expires_at, fetch_seconds = row
+            if expires_at > now:
+                if ok:
+                    self._record((key, now), hits=1, saved_seconds=fetch_seconds)
+                else:
+                    self._record((key, now), negative_hits=1, saved_seconds=fetch_seconds)
+                return json.loads(keywords_json)
+
+        conditional: Dict[str, str] = {}
+        if row is not None and row[0]:
+            if row[2]:
+                conditional["If-None-Match"] = row[2]
+            if row[3]:
+                conditional["If-Modified-Since"] = row[3]
+
+        started = time.perf_counter()
+        try:
+            status, text, headers = download(url, conditional)
+        except Exception:
+            elapsed = time.perf_counter() - started
+            stale = row is not None and row[0]
+            try:
+                if stale:
+                    conn.execute(
+                        "UPDATE job_keywords SET expires_at = ?, last_used = ? WHERE url = ?",
+                        (now + self.negative_ttl, now, key),
+                    )
+                else:
+                    self._store(conn, key, False, [], {}, elapsed)
+            except sqlite3.Error:
+                self._write_failed()
+            if stale:
+                self._record(stale_served=1, fetch_errors=1, fetch_seconds=elapsed)
+                return json.loads(row[1])
+            self._record(misses=1, fetch_errors=1, fetch_seconds=elapsed)
+            return []
+
+        if status == 304 and row is not None:
+            elapsed = time.perf_counter() - started
+            try:
+                conn.execute(
+                    "UPDATE job_keywords SET expires_at = ?, last_used = ? WHERE url = ?",
+                    (now + self.ttl, now, key),
+                )
+            except sqlite3.Error:
+                self._write_failed()
+            # Só pagamos a ida e volta do GET condicional, não o download + parse
+            self._record(
+                revalidated=1,
+                fetch_seconds=elapsed,
+                saved_seconds=max(row[5] - elapsed, 0.0),
+            )
+            return json.loads(row[1])
+
+        keywords = extract(text or "")
+        elapsed = time.perf_counter() - started
+        try:
+            self._store(conn, key, True, keywords, headers, elapsed)
+        except sqlite3.Error:
+            self._write_failed()
+        self._record(misses=1, fetch_seconds=elapsed)
+        return keywords
+
+    @staticmethod
+    def _fetch_uncached(url: str, download: Downloader, extract: Extractor) -> Any:
+        try:
+            _, text, _ = download(url, {})
+        except Exception:
+            return []
+        return extract(text or "")
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.flush()
+        info: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "path": self.path,
+            "write_errors": self.write_errors,
+        }
+        if not self.enabled:
+            return info
+        try:
+            conn = self._conn()
+            stats = dict(conn.execute("SELECT name, value FROM job_keywords_stats"))
+            info["entries"] = conn.execute("SELECT COUNT(*) FROM job_keywords").fetchone()[0]
+        except sqlite3.Error:
+            return info
+        for name in (
+            "hits",
+            "negative_hits",
+            "revalidated",
+            "stale_served",
+            "misses",
+            "fetch_errors",
+        ):
+            info[name] = int(stats.get(name, 0))
+        served = (
+            info["hits"] + info["negative_hits"] + info["revalidated"] + info["stale_served"]
+        )
+        total = served + info["misses"]
+        info["hit_rate"] = round(served / total, 4) if total else 0.0
+        info["fetch_seconds"] = round(stats.get("fetch_seconds", 0.0), 3)
+        info["saved_seconds"] = round(stats.get("saved_seconds", 0.0), 3)
+        return info
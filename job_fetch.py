@@ -0,0 +1,242 @@
+"""Busca da vaga em paralelo com o resto da requisição.
+
+O ``/gerar`` dispara a busca (``JobFetcher.start``) assim que lê o
+``job_url`` e segue com o formulário, a foto e o template; só espera pelo
+resultado na hora de ranquear, e no máximo até o orçamento de latência
+contado desde o disparo. Estourado o orçamento, o currículo sai sem o
+ranqueamento pela vaga; o download já em andamento continua em segundo plano
+e alimenta o cache de vagas (``job_cache``) para a próxima requisição.
+
+A fila das threads de download é limitada: com ``max_pending`` buscas
+pendentes no processo, novas buscas nem são disparadas (o currículo sai sem
+ranqueamento), e uma busca que só sai da fila depois de estourado o
+orçamento de quem a pediu é descartada em vez de ocupar uma thread.
+
+Os downloads usam uma ``requests.Session`` por processo, com keep-alive e
+pool de conexões, e leem a resposta em streaming: cada pedaço já passa pelo
+extrator de texto (``html_text``) e a leitura para no limite de bytes, então
+nem o HTML inteiro nem uma árvore dele ficam na memória. O ``job_cache``
+guarda só a contagem de termos da vaga (``ranking.term_counts``), nem o
+texto nem o HTML.
+
+Configuração por variáveis de ambiente:
+- CURRICULO_JOB_FETCH_BUDGET_MS espera máxima pela vaga (0 = até o timeout);
+- CURRICULO_JOB_FETCH_TIMEOUT tempo máximo (s) de conexão + download;
+- CURRICULO_JOB_FETCH_WORKERS threads de download por processo;
+- CURRICULO_JOB_FETCH_MAX_PENDING buscas pendentes (na fila ou baixando) por processo;
+- CURRICULO_JOB_FETCH_MAX_BYTES bytes lidos de uma página, no máximo.
+"""
+import codecs
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Tuple
+
+from html_text import TextExtractor, sniff_encoding
+from metrics import metrics
+
+_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([^\"';\s]+)", re.I)
+_CHUNK = 64 * 1024
+# Resultado de uma busca descartada na fila (orçamento de quem pediu já estourado)
+_EXPIRED = object()
+
+if TYPE_CHECKING:  # requests só é importado na primeira busca
+    import requests
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class JobFetcher:
+    def __init__(
+        self,
+        budget: float = 1.5,
+        timeout: float = 5.0,
+        workers: int = 4,
+        max_bytes: int = 2 * 1024 * 1024,
+        max_pending: int = 16,
+    ):
+        self.budget = budget
+        self.timeout = timeout
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._session: Optional["requests.Session"] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self.stats = {
+            "started": 0,
+            "in_budget": 0,
+            "budget_exceeded": 0,
+            "errors": 0,
+            "truncated": 0,
+            "rejected": 0,
+            "expired": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "JobFetcher":
+        return cls(
+            budget=_env_int("CURRICULO_JOB_FETCH_BUDGET_MS", 1500) / 1000,
+            timeout=float(_env_int("CURRICULO_JOB_FETCH_TIMEOUT", 5)),
+            workers=_env_int("CURRICULO_JOB_FETCH_WORKERS", 4),
+            max_bytes=_env_int("CURRICULO_JOB_FETCH_MAX_BYTES", 2 * 1024 * 1024),
+            max_pending=max(_env_int("CURRICULO_JOB_FETCH_MAX_PENDING", 16), 1),
+        )
+
+    def _ensure_process(self) -> None:
+        # Sessão e threads não sobrevivem a fork; cada processo cria as suas
+        with self._lock:
+            if self._pid != os.getpid():
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = "meucurriculo/1.0"
+                self._session = session
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="vaga"
+                )
+                self._pending = 0
+                self._pid = os.getpid()
+
+    @property
+    def session(self) -> "requests.Session":
+        self._ensure_process()
+        return self._session
+
+    def download(
+        self, url: str, headers: Dict[str, str]
+    ) -> Tuple[int, Optional[str], Mapping[str, str]]:
+        """Downloader do ``job_cache``: GET (condicional) pela sessão do processo.
+
+        Devolve o texto visível da página (não o HTML), lido até ``max_bytes``.
+        """
+        with self.session.get(url, timeout=self.timeout, headers=headers, stream=True) as resp:
+            if resp.status_code == 304:
+                return 304, None, resp.headers
+            resp.raise_for_status()
+            charset = _CHARSET_RE.search(resp.headers.get("Content-Type", ""))
+            extractor = TextExtractor()
+            decoder = None
+            received = 0
+            for chunk in resp.iter_content(_CHUNK):
+                if decoder is None:
+                    encoding = sniff_encoding(chunk, charset.group(1) if charset else None)
+                    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                if self.max_bytes and received + len(chunk) > self.max_bytes:
+                    chunk = chunk[: self.max_bytes - received]
+                    extractor.truncated = True
+                received += len(chunk)
+                extractor.feed(decoder.decode(chunk))
+                if extractor.truncated or extractor.full:
+                    # Para de ler; fechar a resposta descarta o resto da conexão
+                    break
+            if decoder is not None:
+                extractor.feed(decoder.decode(b"", final=True))
+            text = extractor.close()
+        metrics.inc("curriculo_job_fetch_bytes_total", received)
+        if extractor.truncated:
+            self._bump("truncated")
+        return resp.status_code, text, resp.headers
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def start(self, fn: Callable[[str], Any], url: str, inline: bool = False) -> Optional[Future]:
+        """Roda ``fn(url)`` numa thread de download.
+
+        ``None`` se não houver URL ou se já houver ``max_pending`` buscas pendentes.
+        Com ``inline`` (captura de perfil), roda na thread atual e devolve o
+        ``Future`` já resolvido, para o download e a extração entrarem no perfil.
+        """
+        if not url:
+            return None
+        self._ensure_process()
+        if inline:
+            future: Future = Future()
+            future.started = time.perf_counter()
+            try:
+                future.set_result(fn(url))
+            except Exception as exc:
+                future.set_exception(exc)
+            self._bump("started")
+            return future
+        with self._lock:
+            full = self._pending >= self.max_pending
+            if full:
+                self.stats["rejected"] += 1
+            else:
+                self._pending += 1
+        if full:
+            metrics.inc("curriculo_job_fetch_total", result="rejected")
+            return None
+        started = time.perf_counter()
+        future = self._executor.submit(self._run, fn, url, started)
+        future.started = started
+        self._bump("started")
+        return future
+
+    def _run(self, fn: Callable[[str], Any], url: str, started: float) -> Any:
+        try:
+            if self.budget > 0 and time.perf_counter() - started > self.budget:
+                # Quem pediu já desistiu de esperar: não ocupa a thread com ela
+                self._bump("expired")
+                metrics.inc("curriculo_job_fetch_total", result="expired")
+                return _EXPIRED
+            return fn(url)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def wait(self, future: Optional[Future], default: Any) -> Any:
+        """Resultado da busca, ou ``default`` se o orçamento acabar antes."""
+        if future is None:
+            return default
+        remaining = None
+        if self.budget > 0:
+            remaining = max(self.budget - (time.perf_counter() - future.started), 0.0)
+        waited_from = time.perf_counter()
+        try:
+            value = future.result(timeout=remaining)
+            if value is _EXPIRED:
+                # Descartada na fila: para quem esperou, o orçamento acabou
+                value, result = default, "budget_exceeded"
+            else:
+                result = "in_budget"
+        except FutureTimeout:
+            value = default
+            result = "budget_exceeded"
+        except Exception:
+            value = default
+            result = "errors"
+        self._bump(result)
+        metrics.inc("curriculo_job_fetch_total", result=result)
+        # Só o tempo em que a requisição ficou parada esperando pela vaga
+        metrics.observe("vaga_espera", time.perf_counter() - waited_from)
+        return value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            info: Dict[str, Any] = dict(self.stats)
+            info["pending"] = self._pending
+        info["budget_ms"] = int(self.budget * 1000)
+        info["max_pending"] = self.max_pending
+        finished = info["in_budget"] + info["budget_exceeded"] + info["errors"]
+        info["budget_exceeded_ratio"] = (
+            round(info["budget_exceeded"] / finished, 3) if finished else 0.0
+        )
+        return info
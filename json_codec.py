@@ -0,0 +1,37 @@
+"""Codec JSON: usa ``orjson`` quando instalado, senão a biblioteca padrão.
+
+Os bytes gerados são os mesmos nos dois casos (UTF-8, indentação de 2
+espaços, ordem das chaves preservada), então o cache de arquivos e os ETags
+não mudam conforme a dependência está ou não presente.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+
+    ORJSON_OK = True
+except ImportError:  # dependência opcional
+    orjson = None
+    ORJSON_OK = False
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decodifica JSON; levanta ``ValueError`` se inválido."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_pretty(obj: Any) -> bytes:
+    """JSON indentado (formato do arquivo exportado por /gerar)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def dumps(obj: Any) -> bytes:
+    """JSON compacto."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,278 @@
+"""Tempos por etapa e métricas agregadas (formato texto do Prometheus).
+
+Cada etapa medida com ``timer``/``observe`` entra em dois lugares:
+
+- na requisição atual, para o cabeçalho ``Server-Timing`` (ver
+  ``server_timing``);
+- em histogramas e contadores acumulados no processo e gravados num SQLite
+  compartilhado. Assim ``GET /metrics`` soma os números de todos os workers
+  do gunicorn, como o cache de vagas.
+
+Como no cache de vagas, a gravação é em lote: uma transação a cada
+``_FLUSH_SECONDS`` ou ``_FLUSH_ITEMS`` registros, no ``render`` e na saída do
+processo, e não uma por requisição.
+
+Configuração por variáveis de ambiente:
+- CURRICULO_METRICS=0 desliga a coleta (o Server-Timing continua);
+- CURRICULO_METRICS_PATH caminho do arquivo SQLite.
+"""
+import atexit
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing, contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from flask import g, has_request_context
+
+# Limites (le) dos histogramas
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (32, 64, 128, 256, 512, 768, 1024, 1536, 2048))
+
+_FLUSH_SECONDS = 5.0
+_FLUSH_ITEMS = 500
+
+HELP = {
+    "curriculo_stage_seconds": ("histogram", "Duração de cada etapa da geração"),
+    "curriculo_output_bytes": ("histogram", "Tamanho dos arquivos gerados"),
+    "curriculo_job_fetch_bytes_total": ("counter", "Bytes baixados de páginas de vagas"),
+    "curriculo_job_fetch_total": (
+        "counter",
+        "Buscas de vaga no /gerar (in_budget, budget_exceeded, errors, rejected; "
+        "expired = descartadas na fila, também contadas em budget_exceeded)",
+    ),
+    "curriculo_documents_total": ("counter", "Documentos entregues, por formato e cache"),
+    "curriculo_errors_total": ("counter", "Erros por etapa e tipo"),
+    "curriculo_render_admission_total": (
+        "counter",
+        "Pedidos de PDF no controle de memória (admitted, deferred, rejected)",
+    ),
+    "curriculo_render_memory_bytes": (
+        "histogram",
+        "Memória estimada dos PDFs em andamento no processo, a cada admissão",
+    ),
+    "curriculo_profiles_total": ("counter", "Requisições capturadas com cProfile, por motivo"),
+}
+_BUCKETS = {
+    "curriculo_stage_seconds": SECONDS_BUCKETS,
+    "curriculo_output_bytes": BYTES_BUCKETS,
+    "curriculo_render_memory_bytes": MEMORY_BUCKETS,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (name, labels, bucket)
+);
+"""
+
+Key = Tuple[str, str, str]  # (métrica, labels no formato Prometheus, bucket)
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    pairs = []
+    for name, value in sorted(labels.items()):
+        if value:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            pairs.append(f'{name}="{value}"')
+    return ",".join(pairs)
+
+
+class Metrics:
+    def __init__(self, path: str, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._pending: Dict[Key, float] = {}
+        self._pending_items = 0
+        self._pending_since = time.monotonic()
+        self._pending_pid = os.getpid()
+        self._gauges: List[Tuple[str, str, Callable[[], Dict[str, float]]]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if self.enabled:
+            try:
+                # Fechada em seguida: o mestre do preload não passa conexão pelo fork
+                with closing(self._connect()) as conn:
+                    conn.executescript(_SCHEMA)
+            except sqlite3.Error:
+                self.enabled = False
+
+    @classmethod
+    def from_env(cls) -> "Metrics":
+        default_path = os.path.join(tempfile.gettempdir(), "curriculo_metrics.sqlite3")
+        return cls(
+            path=os.environ.get("CURRICULO_METRICS_PATH") or default_path,
+            enabled=os.environ.get("CURRICULO_METRICS", "1") != "0",
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _add(self, items: List[Tuple[Key, float]]) -> None:
+        """Acumula no processo; grava quando o lote enche ou envelhece."""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._pending_pid != os.getpid():
+                # Depois do fork o lote é do processo pai, que grava o seu
+                self._pending = {}
+                self._pending_items = 0
+                self._pending_since = now
+                self._pending_pid = os.getpid()
+            for key, value in items:
+                self._pending[key] = self._pending.get(key, 0.0) + value
+            self._pending_items += 1
+            due = (
+                self._pending_items >= _FLUSH_ITEMS
+                or now - self._pending_since >= _FLUSH_SECONDS
+            )
+        if due:
+            self.flush()
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Dict[str, float]]) -> None:
+        """Registra um valor lido na hora do /metrics; ``collect`` devolve labels -> valor.
+
+        Só faz sentido para números já compartilhados entre os workers (ex.: SQLite).
+        """
+        self._gauges.append((name, help_text, collect))
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        self._add([((name, _labels(labels), ""), value)])
+
+    def histogram(self, name: str, value: float, **labels: str) -> None:
+        label_str = _labels(labels)
+        bucket = next((str(le) for le in _BUCKETS[name] if value <= le), "+Inf")
+        self._add(
+            [
+                ((name, label_str, bucket), 1),
+                ((name, label_str, "sum"), value),
+                ((name, label_str, "count"), 1),
+            ]
+        )
+
+    def observe(self, stage: str, seconds: float, **labels: str) -> None:
+        """Registra a duração de uma etapa (histograma + Server-Timing)."""
+        self.histogram("curriculo_stage_seconds", seconds, stage=stage, **labels)
+        if has_request_context():
+            timings = g.setdefault("server_timing", [])
+            timings.append((stage, seconds, labels.get("template") or labels.get("format")))
+
+    @contextmanager
+    def timer(self, stage: str, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, **labels)
+
+    def flush(self) -> None:
+        """Grava no SQLite, numa transação, o que foi acumulado neste processo."""
+        with self._lock:
+            if self._pending_pid != os.getpid():
+                return
+            pending, self._pending = self._pending, {}
+            self._pending_items = 0
+            self._pending_since = time.monotonic()
+        if not pending:
+            return
+        conn = None
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO metrics(name, labels, bucket, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(name, labels, bucket) DO UPDATE SET value = value + excluded.value",
+                [(name, labels, bucket, value) for (name, labels, bucket), value in pending.items()],
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            # Métrica perdida não pode derrubar a requisição
+            if conn is not None and conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus (todos os workers)."""
+        self.flush()
+        if not self.enabled:
+            return ""
+        try:
+            rows = self._conn().execute(
+                "SELECT name, labels, bucket, value FROM metrics ORDER BY name, labels"
+            ).fetchall()
+        except sqlite3.Error:
+            return ""
+        series: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for name, labels, bucket, value in rows:
+            series.setdefault(name, {}).setdefault(labels, {})[bucket] = value
+
+        lines = []
+        for name, (kind, help_text) in HELP.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, values in series.get(name, {}).items():
+                if kind == "counter":
+                    lines.append(_sample(name, labels, values.get("", 0.0)))
+                    continue
+                cumulative = 0.0
+                for le in _BUCKETS[name]:
+                    cumulative += values.get(str(le), 0.0)
+                    le_label = _join(labels, f'le="{_fmt(le)}"')
+                    lines.append(_sample(f"{name}_bucket", le_label, cumulative))
+                cumulative += values.get("+Inf", 0.0)
+                lines.append(_sample(f"{name}_bucket", _join(labels, 'le="+Inf"'), cumulative))
+                lines.append(_sample(f"{name}_sum", labels, values.get("sum", 0.0)))
+                lines.append(_sample(f"{name}_count", labels, values.get("count", 0.0)))
+        for name, help_text, collect in self._gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in collect().items():
+                lines.append(_sample(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+
+def _join(labels: str, extra: str) -> str:
+    return f"{labels},{extra}" if labels else extra
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _sample(name: str, labels: str, value: float) -> str:
+    return f"{name}{{{labels}}} {_fmt(value)}" if labels else f"{name} {_fmt(value)}"
+
+
+def server_timing() -> str:
+    """Valor do cabeçalho ``Server-Timing`` com as etapas da requisição atual."""
+    parts = []
+    for stage, seconds, desc in g.get("server_timing", ()):
+        entry = f"{stage};dur={seconds * 1000:.1f}"
+        if desc:
+            entry += f';desc="{desc}"'
+        parts.append(entry)
+    return ", ".join(parts)
+
+
+metrics = Metrics.from_env()
+atexit.register(metrics.flush)
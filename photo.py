@@ -0,0 +1,182 @@
+"""Tratamento da foto antes de embutir no currículo.
+
+A maior foto dos templates é o avatar de 90px CSS do corporativo; a 300 dpi
+isso dá ~280 pixels. Qualquer coisa acima disso só aumenta o HTML (data URL)
+e o trabalho do WeasyPrint, então a imagem é validada, girada conforme o
+EXIF, recortada ao centro em quadrado (os templates usam ``object-fit: cover``),
+reduzida e regravada como JPEG. O resultado fica em cache pelo hash do
+conteúdo original. O upload pode ser passado como arquivo: é lido em blocos
+(hash) e aberto direto pelo Pillow, sem uma cópia inteira na memória. Fotos
+que chegam como data URL no JSON (``/api/gerar``, lote) passam pelo mesmo
+tratamento (``process_data_url``).
+
+Configuração por variáveis de ambiente:
+- CURRICULO_PHOTO_MAX_PX lado do quadrado final (padrão 288);
+- CURRICULO_PHOTO_QUALITY qualidade JPEG (padrão 85);
+- CURRICULO_PHOTO_CACHE_BYTES limite do cache em memória;
+- CURRICULO_PHOTO_MAX_BYTES tamanho máximo do arquivo enviado.
+"""
+import base64
+import binascii
+import hashlib
+import io
+import os
+import threading
+from dataclasses import dataclass
+from typing import IO, Any, Dict, Optional, Tuple, Union
+
+from render_cache import RenderCache
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF", "BMP", "TIFF", "MPO"}
+MAX_PX = int(os.environ.get("CURRICULO_PHOTO_MAX_PX", 288))
+QUALITY = int(os.environ.get("CURRICULO_PHOTO_QUALITY", 85))
+MAX_BYTES = int(os.environ.get("CURRICULO_PHOTO_MAX_BYTES", 10 * 1024 * 1024))
+
+
+# Pillow só é importado na primeira foto (ou no preload do gunicorn)
+_pil_modules: Optional[Tuple[Any, ...]] = None
+
+
+def pil() -> Optional[Tuple[Any, Any]]:
+    """``(Image, ImageOps)`` do Pillow, importados na primeira chamada; ``None`` sem Pillow."""
+    global _pil_modules
+    if _pil_modules is None:
+        try:
+            from PIL import Image, ImageOps
+
+            Image.MAX_IMAGE_PIXELS = 40_000_000  # proteção contra "decompression bomb"
+            _pil_modules = (Image, ImageOps)
+        except Exception:  # Pillow ausente: a foto segue como veio
+            _pil_modules = ()
+    return _pil_modules or None
+
+
+class PhotoError(ValueError):
+    """Arquivo enviado não é uma imagem suportada."""
+
+
+class PhotoTooLarge(PhotoError):
+    """Arquivo acima de ``MAX_BYTES``."""
+
+
+@dataclass
+class ProcessedPhoto:
+    data: bytes
+    mime: str
+    original_bytes: int
+    cached: bool = False
+
+    @property
+    def processed_bytes(self) -> int:
+        return len(self.data)
+
+    def data_url(self) -> str:
+        return f"data:{self.mime};base64,{base64.b64encode(self.data).decode('ascii')}"
+
+
+_cache = RenderCache(
+    max_items=512,
+    max_bytes=int(os.environ.get("CURRICULO_PHOTO_CACHE_BYTES", 16 * 1024 * 1024)),
+)
+_lock = threading.Lock()
+stats = {"processed": 0, "cache_hits": 0, "rejected": 0, "original_bytes": 0, "processed_bytes": 0}
+
+
+def _bump(**counters: int) -> None:
+    with _lock:
+        for name, value in counters.items():
+            stats[name] += value
+
+
+def _shrink(source: Union[bytes, IO[bytes]], max_px: int, quality: int) -> bytes:
+    Image, ImageOps = pil()
+    try:
+        img = Image.open(source if hasattr(source, "read") else io.BytesIO(source))
+        if img.format not in ALLOWED_FORMATS:
+            raise PhotoError(f"Formato de imagem não suportado: {img.format}")
+        img.draft("RGB", (max_px * 2, max_px * 2))  # JPEG: decodifica já reduzido
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, "white")
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        img = ImageOps.fit(img, (min(max_px, *img.size),) * 2, Image.LANCZOS)
+    except PhotoError:
+        raise
+    except Exception as exc:
+        raise PhotoError("Arquivo de foto inválido ou corrompido.") from exc
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def _size_and_hash(source: Union[bytes, IO[bytes]]) -> Tuple[int, str]:
+    if not hasattr(source, "read"):
+        return len(source), hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    for chunk in iter(lambda: source.read(1 << 16), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    source.seek(0)
+    return size, digest.hexdigest()
+
+
+def process_photo(source: Union[bytes, IO[bytes]], mime: str = "image/jpeg") -> ProcessedPhoto:
+    """Valida, reduz e regrava a foto; levanta ``PhotoError`` se não for imagem.
+
+    ``source`` são os bytes da foto ou o arquivo enviado (ex.: ``FileStorage.stream``).
+    """
+    size, digest = _size_and_hash(source)
+    if size > MAX_BYTES:
+        _bump(rejected=1)
+        raise PhotoTooLarge(f"Foto muito grande: o limite é {MAX_BYTES // (1024 * 1024)} MB.")
+    if pil() is None:
+        data = source.read() if hasattr(source, "read") else source
+        return ProcessedPhoto(data, mime or "image/jpeg", size)
+    key = f"{digest}:{MAX_PX}:{QUALITY}"
+    cached = _cache.get(key)
+    if cached is not None:
+        _bump(cache_hits=1, original_bytes=size, processed_bytes=len(cached))
+        return ProcessedPhoto(cached, "image/jpeg", size, cached=True)
+    try:
+        small = _shrink(source, MAX_PX, QUALITY)
+    except PhotoError:
+        _bump(rejected=1)
+        raise
+    _cache.put(key, small)
+    _bump(processed=1, original_bytes=size, processed_bytes=len(small))
+    return ProcessedPhoto(small, "image/jpeg", size)
+
+
+def process_data_url(url: str) -> Optional[ProcessedPhoto]:
+    """Reduz a imagem de uma data URL base64; ``None`` se ``url`` não for uma.
+
+    SVG fica como veio (não é bitmap). Levanta ``PhotoError`` se o conteúdo
+    não for uma imagem válida.
+    """
+    if not url.startswith("data:image/"):
+        return None
+    header, sep, payload = url.partition(",")
+    if not sep or not header.endswith(";base64"):
+        return None
+    mime = header[len("data:"):-len(";base64")].split(";")[0].strip().lower()
+    if mime == "image/svg+xml":
+        return None
+    try:
+        data = base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError) as exc:
+        _bump(rejected=1)
+        raise PhotoError("Foto em data URL com base64 inválido.") from exc
+    return process_photo(data, mime)
+
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        info = dict(stats)
+    info["cache"] = _cache.snapshot()
+    return info
@@ -0,0 +1,120 @@
+"""Pré-visualização em HTML com cache de fragmentos.
+
+Os templates dos currículos marcam cada parte com ``{% block %}``: o
+cabeçalho, cada seção e, dentro das listas, cada item (blocos ``scoped``,
+que enxergam a variável do laço). Aqui a renderização troca a função de
+cada bloco por uma versão com cache, cuja chave é o hash dos valores que o
+bloco lê. Essas dependências saem da árvore sintática do template (nomes
+lidos dentro do bloco), calculadas uma vez por template carregado.
+
+Assim, editar a descrição de uma experiência só re-renderiza aquele item
+(e a montagem da seção, que reaproveita os outros itens do cache).
+
+Configuração por variáveis de ambiente:
+- CURRICULO_PREVIEW_CACHE=0 desliga o cache de fragmentos;
+- CURRICULO_PREVIEW_CACHE_BYTES limite do cache em memória.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from jinja2 import Environment, Template, nodes
+from jinja2.runtime import Context
+
+from render_cache import RenderCache
+
+_cache = RenderCache(
+    max_items=4096,
+    max_bytes=int(os.environ.get("CURRICULO_PREVIEW_CACHE_BYTES", 16 * 1024 * 1024)),
+    enabled=os.environ.get("CURRICULO_PREVIEW_CACHE", "1") != "0",
+)
+_lock = threading.Lock()
+stats = {"previews": 0, "fragment_hits": 0, "fragment_misses": 0}
+# nome do template -> (template carregado, versão, dependências de cada bloco)
+_templates: Dict[str, Tuple[Template, str, Dict[str, Tuple[str, ...]]]] = {}
+
+
+def _bump(**counters: int) -> None:
+    with _lock:
+        for name, value in counters.items():
+            stats[name] += value
+
+
+def _digest(*values: Any) -> str:
+    raw = json.dumps(
+        values, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=repr
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _template_info(
+    env: Environment, name: str
+) -> Tuple[Template, str, Dict[str, Tuple[str, ...]]]:
+    """Template, hash do fonte e nomes lidos por bloco (refeito se o template recarregar)."""
+    template = env.get_template(name)
+    info = _templates.get(name)
+    if info is None or info[0] is not template:
+        source, _, _ = env.loader.get_source(env, name)
+        deps = {
+            block.name: tuple(
+                sorted({n.name for n in block.find_all(nodes.Name) if n.ctx == "load"})
+            )
+            for block in env.parse(source).find_all(nodes.Block)
+        }
+        version = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+        info = _templates[name] = (template, version, deps)
+    return info
+
+
+def etag(env: Environment, template_name: str, context: Dict[str, Any]) -> str:
+    """ETag da prévia: muda com os dados ou com o fonte do template."""
+    _, version, _ = _template_info(env, template_name)
+    return _digest(template_name, version, context)
+
+
+def _cached_block(
+    template_name: str,
+    version: str,
+    block: str,
+    deps: Tuple[str, ...],
+    render_func: Callable[[Context], Iterator[str]],
+) -> Callable[[Context], Iterator[str]]:
+    def render(context: Context) -> Iterator[str]:
+        key = _digest(template_name, version, block, [context.get(name) for name in deps])
+        cached = _cache.get(key)
+        if cached is not None:
+            _bump(fragment_hits=1)
+            yield cached.decode("utf-8")
+            return
+        html = "".join(render_func(context))
+        _cache.put(key, html.encode("utf-8"))
+        _bump(fragment_misses=1)
+        yield html
+
+    return render
+
+
+def render(env: Environment, template_name: str, context: Dict[str, Any]) -> str:
+    """Renderiza o template reaproveitando os fragmentos já vistos.
+
+    ``context`` deve vir completo (com o que o Flask injeta, ver
+    ``app.update_template_context``); o HTML é idêntico ao de ``render_template``.
+    """
+    template, version, deps = _template_info(env, template_name)
+    ctx = template.new_context(context)
+    if _cache.enabled:
+        for block, funcs in ctx.blocks.items():
+            # Só o bloco do próprio template; sem herança nos currículos
+            funcs[0] = _cached_block(template_name, version, block, deps.get(block, ()), funcs[0])
+    html = env.concat(template.root_render_func(ctx))
+    _bump(previews=1)
+    return html
+
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        info = dict(stats)
+    info["cache"] = _cache.snapshot()
+    return info
@@ -0,0 +1,326 @@
+"""Captura opcional de perfil (cProfile) de requisições de geração.
+
+Para investigar um currículo que fica lento só em produção, sem guardar os
+dados da pessoa: uma requisição escolhida roda inteira sob o ``cProfile`` e
+o resultado vai para um diretório local, em dois arquivos por captura:
+
+- ``<id>.prof``: estatísticas do ``cProfile`` com a árvore de chamadas
+  (``python -m pstats``, snakeviz etc.);
+- ``<id>.json``: resumo legível (tempo por biblioteca: WeasyPrint, Jinja,
+  python-docx...; funções mais caras) e o *formato* do pedido, sem
+  conteúdo: nomes dos campos, quantidade de itens e tamanhos dos textos e
+  arquivos.
+
+Uma requisição é capturada quando traz o cabeçalho ``X-Curriculo-Profile``
+com o token de administração, ou por amostragem. Nos dois casos vale um
+limite de capturas por minuto (por processo), e o diretório é podado dos
+arquivos mais antigos ao passar do limite de bytes. Durante a captura tudo
+roda na própria thread, para entrar no perfil: o PDF é renderizado fora do
+pool de processos, a vaga é baixada e extraída sem passar pelas threads do
+``job_fetch``, e o cache de documentos (``render_cache``) é ignorado.
+Desligado (padrão), o custo é um teste de atributo por requisição.
+
+Configuração por variáveis de ambiente:
+- CURRICULO_PROFILE_TOKEN token aceito no cabeçalho (vazio desliga o gatilho);
+- CURRICULO_PROFILE_SAMPLE fração de requisições amostradas (ex.: 0.001);
+- CURRICULO_PROFILE_MAX_PER_MINUTE capturas por minuto, por processo;
+- CURRICULO_PROFILE_DIR diretório das capturas;
+- CURRICULO_PROFILE_MAX_BYTES espaço máximo do diretório.
+"""
+import cProfile
+import functools
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import make_response, request
+
+from metrics import metrics
+
+HEADER = "X-Curriculo-Profile"
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Prefixo do caminho do módulo -> biblioteca, para o resumo do perfil
+_LIBRARIES = (
+    ("weasyprint", "weasyprint"),
+    ("pydyf", "weasyprint"),
+    ("tinycss2", "weasyprint"),
+    ("cssselect2", "weasyprint"),
+    ("fontTools", "weasyprint"),
+    ("jinja2", "jinja"),
+    ("markupsafe", "jinja"),
+    ("docx", "python-docx"),
+    ("lxml", "python-docx"),
+    ("PIL", "pillow"),
+    ("requests", "requests"),
+    ("urllib3", "requests"),
+    ("werkzeug", "flask"),
+    ("flask", "flask"),
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _library(filename: str) -> str:
+    parts = filename.replace("\\", "/").split("/")
+    for prefix, name in _LIBRARIES:
+        if prefix in parts:
+            return name
+    if filename.startswith("~") or filename.startswith("<"):
+        return "builtins"
+    if "site-packages" in parts or "dist-packages" in parts:
+        return "outras"
+    return "app" if os.path.dirname(os.path.abspath(filename)) == _APP_DIR else "stdlib"
+
+
+def _shape(value: Any, depth: int = 0) -> Any:
+    """Estrutura de um valor JSON sem o conteúdo (tamanhos e quantidades)."""
+    if isinstance(value, dict):
+        if depth > 4:
+            return {"campos": len(value)}
+        return {str(key): _shape(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, list):
+        info: Dict[str, Any] = {"itens": len(value)}
+        if value:
+            info["primeiro"] = _shape(value[0], depth + 1)
+        return info
+    if isinstance(value, str):
+        return {"chars": len(value)}
+    return type(value).__name__
+
+
+def payload_shape() -> Dict[str, Any]:
+    """Formato do pedido atual: campos, quantidades e tamanhos, nunca os valores."""
+    shape: Dict[str, Any] = {
+        "endpoint": request.endpoint,
+        "content_length": request.content_length,
+        "query": sorted(request.args),
+    }
+    if request.form:
+        fields = {}
+        for name in request.form:
+            lengths = [len(value) for value in request.form.getlist(name)]
+            fields[name] = lengths[0] if len(lengths) == 1 else lengths
+        shape["form"] = fields
+    if request.files:
+        shape["files"] = {
+            name: {"mimetype": storage.mimetype, "bytes": _stream_size(storage.stream)}
+            for name, storage in request.files.items()
+        }
+    if request.is_json:
+        body = request.get_json(silent=True)
+        if body is not None:
+            shape["json"] = _shape(body)
+    return shape
+
+
+def _stream_size(stream) -> Optional[int]:
+    try:
+        position = stream.tell()
+        stream.seek(0, io.SEEK_END)
+        size = stream.tell()
+        stream.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        directory: str,
+        token: str = "",
+        sample_rate: float = 0.0,
+        max_per_minute: int = 2,
+        max_bytes: int = 200 * 1024 * 1024,
+    ):
+        self.directory = directory
+        self.token = token
+        self.sample_rate = sample_rate
+        self.max_per_minute = max_per_minute
+        self.max_bytes = max_bytes
+        self.enabled = bool(token) or sample_rate > 0
+        self._lock = threading.Lock()
+        self._recent: deque = deque()
+        self._local = threading.local()
+        self.stats = {"captured": 0, "rate_limited": 0, "write_errors": 0, "pruned_files": 0}
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        return cls(
+            directory=os.environ.get("CURRICULO_PROFILE_DIR")
+            or os.path.join(tempfile.gettempdir(), "curriculo_perfis"),
+            token=os.environ.get("CURRICULO_PROFILE_TOKEN", ""),
+            sample_rate=_env_float("CURRICULO_PROFILE_SAMPLE", 0.0),
+            max_per_minute=_env_int("CURRICULO_PROFILE_MAX_PER_MINUTE", 2),
+            max_bytes=_env_int("CURRICULO_PROFILE_MAX_BYTES", 200 * 1024 * 1024),
+        )
+
+    @property
+    def capturing(self) -> bool:
+        """Se a thread atual está numa captura (sem pool, threads de vaga nem cache)."""
+        return getattr(self._local, "capturing", False)
+
+    def _reason(self) -> Optional[str]:
+        """Por que capturar esta requisição (``cabecalho``/``amostra``), ou ``None``."""
+        sent = request.headers.get(HEADER)
+        if sent and self.token and hmac.compare_digest(sent.encode(), self.token.encode()):
+            reason = "cabecalho"
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            reason = "amostra"
+        else:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_per_minute:
+                self.stats["rate_limited"] += 1
+                return None
+            self._recent.append(now)
+        return reason
+
+    def profiled(self, view: Callable) -> Callable:
+        """Decorador de view: roda a requisição sob o cProfile quando escolhida."""
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return view(*args, **kwargs)
+            reason = self._reason()
+            if reason is None:
+                return view(*args, **kwargs)
+            return self._capture(reason, view, args, kwargs)
+
+        return wrapper
+
+    def _capture(self, reason: str, view: Callable, args, kwargs):
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        profiler = cProfile.Profile()
+        self._local.capturing = True
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = make_response(view(*args, **kwargs))
+        finally:
+            profiler.disable()
+            self._local.capturing = False
+        info = {
+            "id": profile_id,
+            "reason": reason,
+            "seconds": round(time.perf_counter() - started, 4),
+            "status": response.status_code,
+            "pid": os.getpid(),
+            "payload": payload_shape(),
+        }
+        self._write(profile_id, profiler, info)
+        metrics.inc("curriculo_profiles_total", reason=reason)
+        if reason == "cabecalho":
+            # Só quem mandou o token fica sabendo qual arquivo olhar
+            response.headers[HEADER + "-Id"] = profile_id
+        return response
+
+    def _write(self, profile_id: str, profiler: cProfile.Profile, info: Dict[str, Any]) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, profile_id)
+            profiler.dump_stats(base + ".prof")
+            info.update(_summary(pstats.Stats(profiler)))
+            with open(base + ".json", "w", encoding="utf-8") as fh:
+                json.dump(info, fh, ensure_ascii=False, indent=2)
+        except OSError:
+            with self._lock:
+                self.stats["write_errors"] += 1
+            return
+        with self._lock:
+            self.stats["captured"] += 1
+        self._prune()
+
+    def _files(self) -> List[os.DirEntry]:
+        try:
+            return [entry for entry in os.scandir(self.directory) if entry.is_file()]
+        except OSError:
+            return []
+
+    def _prune(self) -> None:
+        """Apaga as capturas mais antigas até o diretório caber em ``max_bytes``."""
+        files = sorted(self._files(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in files)
+        removed = 0
+        for entry in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            with self._lock:
+                self.stats["pruned_files"] += removed
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            info: Dict[str, Any] = dict(self.stats)
+        info.update(
+            enabled=self.enabled,
+            header_trigger=bool(self.token),
+            sample_rate=self.sample_rate,
+            max_per_minute=self.max_per_minute,
+        )
+        if self.enabled:
+            files = self._files()
+            info["files"] = len(files)
+            info["bytes"] = sum(entry.stat().st_size for entry in files)
+        return info
+
+
+def _summary(stats: pstats.Stats, top: int = 40) -> Dict[str, Any]:
+    """Tempo próprio por biblioteca e as funções com maior tempo acumulado."""
+    by_library: Dict[str, float] = {}
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        library = _library(filename)
+        by_library[library] = by_library.get(library, 0.0) + own
+        rows.append((cumulative, own, calls, f"{filename}:{line}({function})", library))
+    rows.sort(reverse=True)
+    return {
+        "total_seconds": round(stats.total_tt, 4),
+        "own_seconds_by_library": {
+            name: round(seconds, 4)
+            for name, seconds in sorted(by_library.items(), key=lambda item: -item[1])
+        },
+        "top_cumulative": [
+            {
+                "function": name,
+                "library": library,
+                "calls": calls,
+                "own_seconds": round(own, 4),
+                "cumulative_seconds": round(cumulative, 4),
+            }
+            for cumulative, own, calls, name, library in rows[:top]
+        ],
+    }
@@ -0,0 +1,207 @@
+"""Ranqueamento de seções do currículo pela relevância para uma vaga.
+
+- um único tokenizador (minúsculas, sem acentos, sem stopwords PT/EN);
+- pesos TF-IDF dos termos da vaga, com IDF vindo de um corpus local de
+  vagas (arquivo JSON gerado offline; sem corpus, IDF = 1);
+- cada item do currículo é tokenizado uma única vez (``tokenize_cv``) e
+  pontuado pela soma dos pesos dos termos em comum (interseção de conjuntos,
+  sem laços em Python por palavra da vaga). Com várias vagas para o mesmo
+  currículo, os conjuntos de termos são reaproveitados em todas elas.
+
+Gerar o corpus a partir de vagas salvas (.html ou .txt):
+
+    python ranking.py corpus.json vagas/*.html
+
+e apontar CURRICULO_RANKING_CORPUS para o arquivo gerado.
+"""
+import json
+import math
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from html_text import extract_text
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    """
+    a ao aos as ate com como da das de dela dele deles demais depois do dos e
+    ela elas ele eles em entre era essa essas esse esses esta estas este estes
+    eu foi for ha isso isto ja la lhe mais mas me mesmo meu minha muito na nas
+    nao nem no nos nossa nosso num numa o os ou para pela pelas pelo pelos por
+    qual quando que quem se sem ser seu seus sua suas so sobre tambem te tem
+    ter toda todas todo todos tu um uma umas uns voce voces vaga vagas empresa
+    trabalho atividades requisitos beneficios experiencia conhecimento area
+    about above after again all also an and any are as at be been being both
+    but by can could did do does doing each few from further had has have
+    having he her here hers him his how if in into is it its just more most
+    must my no nor not of off on once only or other our out over own same she
+    should so some such than that the their them then there these they this
+    those through to too under until up very was we were what when where which
+    while who whom why will with would you your job role team work company
+    experience requirements responsibilities
+    """.split()
+)
+
+
+def fold(text: str) -> str:
+    """Minúsculas e sem acentos (``Gestão`` -> ``gestao``)."""
+    text = text.lower()
+    if text.isascii():
+        return text
+    # NFKD separa letra e acento; o encode descarta os acentos (e o que não
+    # for ASCII, que o tokenizador ignoraria de qualquer forma)
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens relevantes do texto, na ordem em que aparecem."""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(fold(text)) if len(t) > 1 and t not in STOPWORDS]
+
+
+def term_counts(text: str, max_terms: int = 60) -> Dict[str, int]:
+    """Frequência dos ``max_terms`` termos mais comuns do texto."""
+    # Conta primeiro e filtra depois: stopwords são checadas uma vez por termo
+    counts = Counter(_TOKEN_RE.findall(fold(text or "")))
+    for term in [t for t in counts if len(t) < 2 or t in STOPWORDS]:
+        del counts[term]
+    return dict(counts.most_common(max_terms))
+
+
+def html_to_text(html: str) -> str:
+    """Texto visível do HTML, com o mesmo extrator usado nas vagas baixadas."""
+    return extract_text(html)
+
+
+class Corpus:
+    """Frequência de documentos por termo em um conjunto de vagas."""
+
+    def __init__(self, doc_freq: Optional[Dict[str, int]] = None, documents: int = 0):
+        self.doc_freq = doc_freq or {}
+        self.documents = documents
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "Corpus":
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return cls(data.get("doc_freq", {}), data.get("documents", 0))
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"documents": self.documents, "doc_freq": self.doc_freq},
+                fh,
+                ensure_ascii=False,
+            )
+
+    def add(self, text: str) -> None:
+        self.documents += 1
+        for term in set(tokenize(text)):
+            self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+
+    def idf(self, term: str) -> float:
+        if not self.documents:
+            return 1.0
+        # IDF suavizado (mesma fórmula do scikit-learn)
+        return math.log((1 + self.documents) / (1 + self.doc_freq.get(term, 0))) + 1.0
+
+
+corpus = Corpus.load(os.environ.get("CURRICULO_RANKING_CORPUS"))
+
+
+def job_weights(counts: Dict[str, int], corpus_: Optional[Corpus] = None) -> Dict[str, float]:
+    """Pesos TF-IDF dos termos da vaga (TF sublinear)."""
+    corpus_ = corpus_ or corpus
+    return {t: (1.0 + math.log(c)) * corpus_.idf(t) for t, c in counts.items() if c > 0}
+
+
+def _item_text(item: Any, fields: Iterable[str]) -> str:
+    if isinstance(item, str):
+        return item
+    return " ".join(str(item.get(f) or "") for f in fields)
+
+
+# Seção do cv_data -> campos usados na pontuação de cada item
+SECTION_FIELDS = {
+    "experiencias": ("cargo", "empresa", "descricao", "conquistas", "tecnologias"),
+    "projetos": ("nome", "tecnologias", "descricao"),
+    "skills_tecnicas": (),
+    "skills_comportamentais": (),
+    "skills_outras": (),
+}
+
+
+def tokenize_items(items: List[Any], fields: Iterable[str]) -> List[FrozenSet[str]]:
+    """Conjunto de termos de cada item (stopwords incluídas; ver ``score_items``)."""
+    findall = _TOKEN_RE.findall
+    return [frozenset(findall(fold(_item_text(it, fields)))) for it in items]
+
+
+def tokenize_cv(cv_data: Dict[str, Any]) -> Dict[str, List[FrozenSet[str]]]:
+    """Termos dos itens de cada seção ranqueável, na ordem do ``cv_data``."""
+    return {
+        section: tokenize_items(cv_data[section], fields)
+        for section, fields in SECTION_FIELDS.items()
+        if cv_data.get(section)
+    }
+
+
+def score_items(token_sets: List[FrozenSet[str]], weights: Dict[str, float]) -> List[float]:
+    """Pontuação de cada item: soma dos pesos dos termos em comum com a vaga."""
+    terms = weights.keys()
+    get = weights.__getitem__
+    # Stopwords nunca estão em ``weights``, então a interseção já as descarta
+    return [sum(map(get, terms & tokens)) for tokens in token_sets]
+
+
+def rank_cv(
+    cv_data: Dict[str, Any],
+    weights: Dict[str, float],
+    tokens: Optional[Dict[str, List[FrozenSet[str]]]] = None,
+) -> Dict[str, List[float]]:
+    """Reordena (no lugar) as seções do ``cv_data`` pela relevância para a vaga.
+
+    A ordenação é estável: itens empatados mantêm a ordem do formulário.
+    ``tokens`` é o ``tokenize_cv`` do mesmo ``cv_data`` (ainda na ordem
+    original), para ranquear o currículo contra várias vagas sem tokenizar de
+    novo. Devolve as pontuações por seção, na nova ordem.
+    """
+    scores: Dict[str, List[float]] = {}
+    if not weights:
+        return scores
+    if tokens is None:
+        tokens = tokenize_cv(cv_data)
+    for section in SECTION_FIELDS:
+        items = cv_data.get(section)
+        if not items:
+            continue
+        item_scores = score_items(tokens[section], weights)
+        order = sorted(range(len(items)), key=lambda i: -item_scores[i])
+        cv_data[section] = [items[i] for i in order]
+        scores[section] = [item_scores[i] for i in order]
+    return scores
+
+
+def _build_corpus(output: str, paths: List[str]) -> None:
+    built = Corpus.load(output)
+    for path in paths:
+        with open(path, encoding="utf-8", errors="ignore") as fh:
+            text = fh.read()
+        built.add(html_to_text(text) if path.endswith((".html", ".htm")) else text)
+    built.save(output)
+    print(f"{output}: {built.documents} vagas, {len(built.doc_freq)} termos")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("uso: python ranking.py corpus.json vaga1.html [vaga2.txt ...]")
+        sys.exit(1)
+    _build_corpus(sys.argv[1], sys.argv[2:])
@@ -0,0 +1,231 @@
+"""Cache endereçado por conteúdo para os arquivos gerados em /gerar.
+
+Dois níveis:
+- memória (LRU por processo, limitado por número de itens e bytes);
+- disco (opcional, diretório compartilhado entre os workers do gunicorn).
+
+Configuração por variáveis de ambiente:
+- CURRICULO_RENDER_CACHE=0 desliga o cache;
+- CURRICULO_RENDER_CACHE_ITEMS / CURRICULO_RENDER_CACHE_BYTES limitam a memória;
+- CURRICULO_RENDER_CACHE_DIR ativa o nível em disco;
+- CURRICULO_RENDER_CACHE_DISK_BYTES limita o diretório em disco.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Escritas em disco entre duas varreduras completas do diretório
+_DISK_RESCAN_PUTS = 256
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def make_key(cv_data: Dict[str, Any], template_style: str, output_format: str) -> str:
+    """Hash estável dos dados normalizados + template + formato.
+
+    ``data_geracao`` (dd/mm/aaaa) entra na chave: os arquivos trazem a data,
+    então uma entrada vale só no dia em que foi gerada.
+    """
+    raw = json.dumps(
+        [cv_data, template_style, output_format],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    def __init__(
+        self,
+        max_items: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        enabled: bool = True,
+    ):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.enabled = enabled
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        # Estimativa do tamanho do diretório em disco (None = ainda não varrido)
+        self._disk_bytes: Optional[int] = None
+        self._disk_puts = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "RenderCache":
+        return cls(
+            max_items=_env_int("CURRICULO_RENDER_CACHE_ITEMS", 256),
+            max_bytes=_env_int("CURRICULO_RENDER_CACHE_BYTES", 64 * 1024 * 1024),
+            disk_dir=os.environ.get("CURRICULO_RENDER_CACHE_DIR") or None,
+            disk_max_bytes=_env_int("CURRICULO_RENDER_CACHE_DISK_BYTES", 512 * 1024 * 1024),
+            enabled=os.environ.get("CURRICULO_RENDER_CACHE", "1") != "0",
+        )
+
+    # ---- memória -------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def _memory_put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._items and (
+                len(self._items) > self.max_items or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+    # ---- disco ---------------------------------------------------------
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            os.utime(path)  # mtime serve como "último uso" para a limpeza
+            return data
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, data: bytes) -> None:
+        if len(data) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Escrita atômica: outro worker nunca lê um arquivo pela metade
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        # Varredura completa só quando a conta local passa do limite ou a cada
+        # N escritas (os outros workers também gravam no diretório)
+        with self._lock:
+            self._disk_puts += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data)
+            scan = (
+                self._disk_bytes is None
+                or self._disk_bytes > self.disk_max_bytes
+                or self._disk_puts >= _DISK_RESCAN_PUTS
+            )
+            if scan:
+                self._disk_puts = 0
+        if scan:
+            self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        """Varre o diretório, apaga os menos usados acima do limite e acerta a conta."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        if total <= self.disk_max_bytes:
+            with self._lock:
+                self._disk_bytes = total
+            return
+        entries.sort()
+        # Desce a 90% do limite, para as próximas escritas não varrerem de novo
+        target = self.disk_max_bytes * 9 // 10
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.stats["disk_evictions"] += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    # ---- API pública ---------------------------------------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        data = self._memory_get(key)
+        if data is not None:
+            with self._lock:
+                self.stats["memory_hits"] += 1
+            return data
+        if self.disk_dir:
+            data = self._disk_get(key)
+            if data is not None:
+                self._memory_put(key, data)
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                return data
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        if not self.enabled:
+            return
+        self._memory_put(key, data)
+        if self.disk_dir:
+            self._disk_put(key, data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            info = dict(self.stats)
+            info["items"] = len(self._items)
+            info["bytes"] = self._bytes
+        info["enabled"] = self.enabled
+        info["disk_dir"] = self.disk_dir
+        return info
@@ -0,0 +1,374 @@
+"""Fila durável (SQLite) para gerar currículos em segundo plano.
+
+``POST /gerar`` com ``modo=async`` grava o pedido na fila e responde na hora
+com o id da tarefa; threads de cada worker do gunicorn pegam as tarefas
+pendentes, baixam a vaga, renderizam e guardam o arquivo no próprio SQLite.
+O cliente consulta ``GET /tarefas/<id>`` e baixa em ``/tarefas/<id>/arquivo``
+enquanto o arquivo não expira.
+
+A fila sobrevive a reinícios: tarefas em execução por um processo que morreu
+voltam para a fila quando o prazo (lease) vence, até ``max_attempts`` vezes.
+O pedido (dados do currículo, com a foto) só fica gravado até a tarefa
+terminar; depois resta o arquivo gerado, apagado quando expira.
+
+Configuração por variáveis de ambiente:
+- CURRICULO_ASYNC_PATH caminho do arquivo SQLite;
+- CURRICULO_ASYNC_WORKERS threads de renderização por processo;
+- CURRICULO_ASYNC_TTL segundos que o arquivo pronto fica disponível;
+- CURRICULO_ASYNC_LEASE segundos até uma tarefa travada voltar para a fila;
+- CURRICULO_ASYNC_MAX_PENDING limite de tarefas aguardando (acima disso, 503);
+- CURRICULO_ASYNC_RETRY_AFTER segundos sugeridos no Retry-After desse 503.
+
+Se o arquivo SQLite não pode ser criado (diretório sem escrita, banco
+travado), a fila fica desligada (``enabled`` falso) e os endpoints
+assíncronos respondem 503; o resto do app sobe normalmente.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from metrics import metrics
+from render_pool import Busy
+
+# handler(pedido) -> (nome do arquivo, formato, bytes)
+Handler = Callable[[Dict[str, Any]], Tuple[str, str, bytes]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS render_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_until REAL,
+    expires_at REAL,
+    filename TEXT,
+    output_format TEXT,
+    result BLOB,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS render_jobs_status ON render_jobs(status, created_at);
+CREATE TABLE IF NOT EXISTS render_jobs_stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+_STATUS_FIELDS = (
+    "status",
+    "attempts",
+    "created_at",
+    "started_at",
+    "finished_at",
+    "expires_at",
+    "filename",
+    "output_format",
+    "error",
+)
+
+
+class QueueFull(Exception):
+    """Tarefas pendentes demais; o cliente deve tentar mais tarde."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Fila de tarefas cheia")
+        self.retry_after = retry_after
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class RenderJobQueue:
+    def __init__(
+        self,
+        path: str,
+        workers: int = 2,
+        ttl: int = 3600,
+        lease: int = 120,
+        max_pending: int = 500,
+        max_attempts: int = 3,
+        poll_interval: float = 0.5,
+        retry_after: int = 5,
+    ):
+        self.path = path
+        self.workers = workers
+        self.ttl = ttl
+        self.lease = lease
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retry_after = retry_after
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid: Optional[int] = None
+        self.enabled = True
+        try:
+            # Conexão descartável: nada aberto aqui sobrevive ao fork do preload
+            with closing(self._connect()) as conn:
+                conn.executescript(_SCHEMA)
+        except sqlite3.Error:
+            self.enabled = False
+
+    @classmethod
+    def from_env(cls) -> "RenderJobQueue":
+        default_path = os.path.join(tempfile.gettempdir(), "curriculo_tarefas.sqlite3")
+        return cls(
+            path=os.environ.get("CURRICULO_ASYNC_PATH") or default_path,
+            workers=max(_env_int("CURRICULO_ASYNC_WORKERS", 2), 1),
+            ttl=max(_env_int("CURRICULO_ASYNC_TTL", 3600), 1),
+            lease=max(_env_int("CURRICULO_ASYNC_LEASE", 120), 1),
+            max_pending=max(_env_int("CURRICULO_ASYNC_MAX_PENDING", 500), 1),
+            retry_after=max(_env_int("CURRICULO_ASYNC_RETRY_AFTER", 5), 1),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _bump(self, conn: sqlite3.Connection, **counters: float) -> None:
+        conn.executemany(
+            "INSERT INTO render_jobs_stats(name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            list(counters.items()),
+        )
+
+    def submit(self, request: Dict[str, Any]) -> str:
+        """Enfileira o pedido e devolve o id da tarefa."""
+        conn = self._conn()
+        pending = conn.execute(
+            "SELECT COUNT(*) FROM render_jobs WHERE status = 'queued'"
+        ).fetchone()[0]
+        if pending >= self.max_pending:
+            self._bump(conn, rejected=1)
+            raise QueueFull(self.retry_after)
+        job_id = uuid.uuid4().hex
+        conn.execute(
+            "INSERT INTO render_jobs(id, status, request, created_at) VALUES (?, 'queued', ?, ?)",
+            (job_id, json.dumps(request, ensure_ascii=False), time.time()),
+        )
+        self._bump(conn, submitted=1)
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado da tarefa (sem o arquivo); ``None`` se não existe ou expirou."""
+        row = self._conn().execute(
+            "SELECT status, attempts, created_at, started_at, finished_at, expires_at, "
+            "filename, output_format, error FROM render_jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None or (row[5] is not None and row[5] < time.time()):
+            return None
+        info = dict(zip(_STATUS_FIELDS, row))
+        info["id"] = job_id
+        if info["status"] == "queued":
+            info["position"] = self._conn().execute(
+                "SELECT COUNT(*) FROM render_jobs WHERE status = 'queued' AND created_at < ?",
+                (info["created_at"],),
+            ).fetchone()[0] + 1
+        return info
+
+    def result(self, job_id: str) -> Optional[Tuple[str, str, bytes]]:
+        """(nome do arquivo, formato, bytes) de uma tarefa concluída e não expirada."""
+        row = self._conn().execute(
+            "SELECT filename, output_format, result FROM render_jobs "
+            "WHERE id = ? AND status = 'done' AND expires_at > ?",
+            (job_id, time.time()),
+        ).fetchone()
+        return (row[0], row[1], bytes(row[2])) if row else None
+
+    def _claim(self) -> Optional[Tuple[str, Dict[str, Any], float]]:
+        """Pega a tarefa mais antiga pendente (ou com lease vencido)."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = conn.execute(
+                    "SELECT id, request, created_at, attempts FROM render_jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if row[3] < self.max_attempts:
+                    break
+                # O processo morreu com ela todas as vezes: desiste
+                conn.execute(
+                    "UPDATE render_jobs SET status = 'error', request = '{}', error = ?, "
+                    "finished_at = ?, expires_at = ?, lease_until = NULL WHERE id = ?",
+                    (
+                        f"Tarefa abandonada após {row[3]} tentativas",
+                        now,
+                        now + self.ttl,
+                        row[0],
+                    ),
+                )
+                self._bump(conn, failed=1)
+            conn.execute(
+                "UPDATE render_jobs SET status = 'running', attempts = attempts + 1, "
+                "started_at = ?, lease_until = ? WHERE id = ?",
+                (now, now + self.lease, row[0]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row[0], json.loads(row[1]), row[2]
+
+    def _finish(self, job_id: str, created_at: float, started: float, outcome) -> None:
+        # O pedido (currículo e foto) não é mais necessário: não fica no disco até expirar
+        conn = self._conn()
+        now = time.time()
+        if isinstance(outcome, Exception):
+            conn.execute(
+                "UPDATE render_jobs SET status = 'error', request = '{}', error = ?, "
+                "finished_at = ?, expires_at = ?, lease_until = NULL WHERE id = ?",
+                (f"{type(outcome).__name__}: {outcome}", now, now + self.ttl, job_id),
+            )
+            self._bump(conn, failed=1)
+            metrics.inc("curriculo_errors_total", stage="tarefa", kind=type(outcome).__name__)
+            return
+        filename, output_format, payload = outcome
+        conn.execute(
+            "UPDATE render_jobs SET status = 'done', request = '{}', filename = ?, "
+            "output_format = ?, result = ?, finished_at = ?, expires_at = ?, "
+            "lease_until = NULL WHERE id = ?",
+            (filename, output_format, payload, now, now + self.ttl, job_id),
+        )
+        self._bump(
+            conn,
+            completed=1,
+            wait_seconds=started - created_at,
+            run_seconds=now - started,
+        )
+        metrics.observe("tarefa_espera", started - created_at, format=output_format)
+        metrics.observe("tarefa_execucao", now - started, format=output_format)
+
+    def _release(self, job_id: str) -> None:
+        # Volta para a fila sem gastar tentativa (pool de PDF lotado ou sem memória)
+        self._conn().execute(
+            "UPDATE render_jobs SET status = 'queued', attempts = attempts - 1, "
+            "lease_until = NULL WHERE id = ?",
+            (job_id,),
+        )
+
+    def purge_expired(self) -> int:
+        cur = self._conn().execute(
+            "DELETE FROM render_jobs WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (time.time(),),
+        )
+        return cur.rowcount
+
+    def run_once(self, handler: Handler) -> bool:
+        """Processa uma tarefa; devolve ``False`` se a fila estava vazia."""
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        job_id, request, created_at = claimed
+        started = time.time()
+        try:
+            outcome = handler(request)
+        except Busy as exc:
+            self._release(job_id)
+            time.sleep(exc.retry_after)
+            return True
+        except Exception as exc:
+            outcome = exc
+        self._finish(job_id, created_at, started, outcome)
+        return True
+
+    def _loop(self, handler: Handler) -> None:
+        last_purge = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_purge > 60:
+                    self.purge_expired()
+                    last_purge = time.monotonic()
+                if self.run_once(handler):
+                    continue
+            except sqlite3.Error:
+                time.sleep(self.poll_interval)
+            # Fila vazia: espera uma nova tarefa deste processo ou o próximo ciclo
+            # (tarefas enviadas a outros workers só são vistas pela consulta)
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def start(self, handler: Handler) -> None:
+        """Sobe as threads de renderização (idempotente; refaz após um fork)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            for i in range(self.workers):
+                threading.Thread(
+                    target=self._loop, args=(handler,), name=f"tarefa-{i}", daemon=True
+                ).start()
+            self._pid = os.getpid()
+
+    def depth(self) -> Dict[str, int]:
+        """Tarefas por estado (todos os workers), para o /metrics."""
+        if not self.enabled:
+            return {}
+        try:
+            return dict(
+                self._conn().execute("SELECT status, COUNT(*) FROM render_jobs GROUP BY status")
+            )
+        except sqlite3.Error:
+            return {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        info: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "path": self.path,
+            "workers": self.workers,
+            "ttl": self.ttl,
+        }
+        if not self.enabled:
+            return info
+        try:
+            conn = self._conn()
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM render_jobs GROUP BY status"))
+            stats = dict(conn.execute("SELECT name, value FROM render_jobs_stats"))
+            oldest = conn.execute(
+                "SELECT MIN(created_at) FROM render_jobs WHERE status = 'queued'"
+            ).fetchone()[0]
+        except sqlite3.Error:
+            return info
+        for status in ("queued", "running", "done", "error"):
+            info[status] = counts.get(status, 0)
+        for name in ("submitted", "completed", "failed", "rejected"):
+            info[name] = int(stats.get(name, 0))
+        completed = info["completed"] or 1
+        info["avg_wait_seconds"] = round(stats.get("wait_seconds", 0.0) / completed, 3)
+        info["avg_run_seconds"] = round(stats.get("run_seconds", 0.0) / completed, 3)
+        info["oldest_queued_seconds"] = round(time.time() - oldest, 3) if oldest else 0.0
+        info["running_here"] = self._pid == os.getpid()
+        return info
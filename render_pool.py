@@ -0,0 +1,278 @@
+"""Pool de processos dedicado à renderização de PDF com WeasyPrint.
+
+Cada worker do gunicorn mantém alguns processos filhos já aquecidos
+(WeasyPrint importado, CSS dos templates compilado e um documento mínimo
+renderizado). O /gerar envia o
+HTML para um deles em vez de renderizar na própria thread da requisição.
+
+- fila limitada: se todos os processos estão ocupados e a fila está cheia,
+  ``PoolBusy`` é levantada na hora (o app responde 503 + Retry-After);
+- timeout por job: o processo que estourou o tempo é encerrado e substituído;
+- reciclagem: cada processo é reiniciado após N jobs, limitando o crescimento
+  de memória do WeasyPrint.
+
+Configuração por variáveis de ambiente:
+- CURRICULO_RENDER_POOL=0 renderiza na própria thread, como antes;
+- CURRICULO_RENDER_POOL_WORKERS, CURRICULO_RENDER_POOL_QUEUE;
+- CURRICULO_RENDER_POOL_TIMEOUT (s), CURRICULO_RENDER_POOL_MAX_JOBS;
+- CURRICULO_RENDER_POOL_RETRY_AFTER (s) sugerido ao cliente no 503.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_WARMUP_HTML = "<html><body><p>aquecimento</p></body></html>"
+
+
+class RenderPoolError(Exception):
+    """Erro genérico do pool de renderização."""
+
+
+class Busy(RenderPoolError):
+    """Sem capacidade para renderizar agora; tente de novo em ``retry_after`` segundos."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PoolBusy(Busy):
+    """Todos os processos ocupados e fila cheia."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Fila de renderização cheia", retry_after)
+
+
+class RenderTimeout(RenderPoolError):
+    """O job passou do tempo máximo e o processo foi encerrado."""
+
+
+class RenderFailed(RenderPoolError):
+    """O WeasyPrint levantou exceção dentro do processo filho."""
+
+
+def _worker_main(conn, warm: bool) -> None:
+    """Loop do processo filho: recebe (html, base_url, template), devolve o PDF e os tempos."""
+    try:
+        from weasyprint import HTML
+
+        import stylesheets
+        from fetcher import ResourceFetcher
+
+        url_fetcher = ResourceFetcher.from_env()
+        if warm:
+            stylesheets.warm_up()
+            HTML(string=_WARMUP_HTML).write_pdf(font_config=stylesheets.font_config())
+        import_error = None
+    except Exception as exc:  # libs de sistema ausentes
+        HTML = None
+        import_error = f"{type(exc).__name__}: {exc}"
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg is None:
+            break
+        if HTML is None:
+            conn.send(("error", import_error))
+            continue
+        html, base_url, template_name = msg
+        try:
+            started = time.perf_counter()
+            document = HTML(string=html, base_url=base_url, url_fetcher=url_fetcher).render(
+                **stylesheets.pdf_options(template_name)
+            )
+            laid_out = time.perf_counter()
+            pdf = document.write_pdf()
+            finished = time.perf_counter()
+            timings = {"pdf_layout": laid_out - started, "pdf_escrita": finished - laid_out}
+            conn.send(("ok", (pdf, timings)))
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+class _Slot:
+    """Um processo filho e a ponta do pipe usada para falar com ele."""
+
+    def __init__(self, ctx, warm: bool):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, warm), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def kill(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.conn.close()
+        self.process.join(timeout=0.5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class RenderPool:
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 8,
+        timeout: float = 30.0,
+        max_jobs_per_worker: int = 200,
+        retry_after: int = 2,
+        warm: bool = True,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.retry_after = retry_after
+        self.warm = warm
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Slot]" = queue.Queue()
+        self._slots: List[_Slot] = []
+        self._lock = threading.Lock()
+        self._pending = 0  # jobs aguardando ou em execução
+        self._pid: Optional[int] = None
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "recycled": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "RenderPool":
+        return cls(
+            workers=max(_env_int("CURRICULO_RENDER_POOL_WORKERS", 2), 1),
+            max_queue=max(_env_int("CURRICULO_RENDER_POOL_QUEUE", 8), 0),
+            timeout=float(_env_int("CURRICULO_RENDER_POOL_TIMEOUT", 30)),
+            max_jobs_per_worker=max(_env_int("CURRICULO_RENDER_POOL_MAX_JOBS", 200), 1),
+            retry_after=max(_env_int("CURRICULO_RENDER_POOL_RETRY_AFTER", 2), 1),
+        )
+
+    def start(self) -> None:
+        """Sobe os processos (idempotente; refaz o pool após um fork)."""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._slots = []
+            self._idle = queue.Queue()
+            for _ in range(self.workers):
+                slot = _Slot(self._ctx, self.warm)
+                self._slots.append(slot)
+                self._idle.put(slot)
+            self._pid = os.getpid()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            for slot in self._slots:
+                slot.kill()
+            self._slots = []
+            self._pid = None
+
+    def _replace(self, slot: _Slot) -> _Slot:
+        slot.kill()
+        fresh = _Slot(self._ctx, self.warm)
+        with self._lock:
+            self._slots = [fresh if s is slot else s for s in self._slots]
+        return fresh
+
+    def render(
+        self,
+        html: str,
+        base_url: Optional[str] = None,
+        template_name: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> bytes:
+        """Renderiza ``html`` em PDF num processo do pool e devolve os bytes.
+
+        ``template_name`` indica qual CSS pré-compilado aplicar (ver ``stylesheets``).
+        Se ``timings`` for passado, recebe os segundos de espera por um processo
+        livre (``pdf_fila``), de layout e de escrita do PDF.
+        """
+        self.start()
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.stats["rejected"] += 1
+                raise PoolBusy(self.retry_after)
+            self._pending += 1
+            self.stats["submitted"] += 1
+        deadline = time.monotonic() + self.timeout
+        slot: Optional[_Slot] = None
+        try:
+            try:
+                slot = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self.stats["timeouts"] += 1
+                raise RenderTimeout("Tempo esgotado aguardando um processo livre")
+            if timings is not None:
+                timings["pdf_fila"] = self.timeout - (deadline - time.monotonic())
+
+            try:
+                slot.conn.send((html, base_url, template_name))
+                remaining = max(deadline - time.monotonic(), 0.0)
+                ready = slot.conn.poll(remaining)
+                result = slot.conn.recv() if ready else None
+            except (OSError, EOFError):
+                # Processo morreu (ex.: OOM); troca por um novo
+                slot = self._replace(slot)
+                with self._lock:
+                    self.stats["failures"] += 1
+                raise RenderFailed("Processo de renderização encerrado inesperadamente")
+
+            if result is None:
+                slot = self._replace(slot)
+                with self._lock:
+                    self.stats["timeouts"] += 1
+                raise RenderTimeout(f"Renderização excedeu {self.timeout:.0f}s")
+
+            slot.jobs += 1
+            if slot.jobs >= self.max_jobs_per_worker:
+                slot = self._replace(slot)
+                with self._lock:
+                    self.stats["recycled"] += 1
+
+            status, value = result
+            if status != "ok":
+                with self._lock:
+                    self.stats["failures"] += 1
+                raise RenderFailed(value)
+            with self._lock:
+                self.stats["completed"] += 1
+            pdf, worker_timings = value
+            if timings is not None:
+                timings.update(worker_timings)
+            return pdf
+        finally:
+            if slot is not None:
+                self._idle.put(slot)
+            with self._lock:
+                self._pending -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            info = dict(self.stats)
+            info["pending"] = self._pending
+            info["workers"] = self.workers
+            info["max_queue"] = self.max_queue
+            info["running"] = self._pid == os.getpid()
+        return info
@@ -0,0 +1,78 @@
+"""CSS dos templates de PDF compilado uma vez por processo.
+
+Cada ``resume_template*.html`` traz um bloco ``<style>`` grande. Em vez de o
+WeasyPrint reinterpretar esse CSS a cada PDF, o bloco é extraído do arquivo
+do template, compilado num ``weasyprint.CSS`` com uma ``FontConfiguration``
+compartilhada e reaproveitado; o template é renderizado com
+``css_externo=True`` e deixa de incluir o ``<style>``.
+
+CURRICULO_PRECOMPILED_CSS=0 volta ao CSS embutido no HTML.
+"""
+import glob
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+ENABLED = os.environ.get("CURRICULO_PRECOMPILED_CSS", "1") != "0"
+
+_STYLE_RE = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+_lock = threading.Lock()
+_compiled: Dict[str, Any] = {}
+_font_config = None
+
+
+def extract_css(template_name: str) -> str:
+    """Concatena os blocos ``<style>`` do arquivo do template."""
+    with open(os.path.join(TEMPLATES_DIR, template_name), encoding="utf-8") as fh:
+        source = fh.read()
+    return "\n".join(_STYLE_RE.findall(source))
+
+
+def font_config():
+    """``FontConfiguration`` única do processo (fontconfig é caro de montar)."""
+    global _font_config
+    if _font_config is None:
+        try:
+            from weasyprint.text.fonts import FontConfiguration
+        except ImportError:  # WeasyPrint < 53
+            from weasyprint.fonts import FontConfiguration
+        _font_config = FontConfiguration()
+    return _font_config
+
+
+def get_stylesheet(template_name: str):
+    """Devolve o CSS compilado do template, compilando na primeira chamada."""
+    sheet = _compiled.get(template_name)
+    if sheet is not None:
+        return sheet
+    from weasyprint import CSS
+
+    with _lock:
+        sheet = _compiled.get(template_name)
+        if sheet is None:
+            sheet = CSS(string=extract_css(template_name), font_config=font_config())
+            _compiled[template_name] = sheet
+    return sheet
+
+
+def pdf_options(template_name: Optional[str]) -> Dict[str, Any]:
+    """Argumentos extras de ``write_pdf`` para o template (vazio se desligado)."""
+    if not (ENABLED and template_name):
+        return {}
+    return {"stylesheets": [get_stylesheet(template_name)], "font_config": font_config()}
+
+
+def warm_up() -> Dict[str, float]:
+    """Compila o CSS de todos os templates de PDF; devolve segundos por template."""
+    timings = {}
+    if not ENABLED:
+        return timings
+    for path in sorted(glob.glob(os.path.join(TEMPLATES_DIR, "resume_template*.html"))):
+        name = os.path.basename(path)
+        started = time.perf_counter()
+        get_stylesheet(name)
+        timings[name] = round(time.perf_counter() - started, 4)
+    return timings
@@ -0,0 +1,82 @@
+// Service worker do modo estático: guarda a página, o Python e os arquivos
+// de terceiros (vendor/, ver vendor_assets.py) para abrir sem rede.
+// - vendor/ e CDNs com versão fixa: cache primeiro (o conteúdo nunca muda);
+// - demais arquivos da página: responde do cache e atualiza em segundo plano.
+// Arquivos dos CDNs são pedidos com CORS: a resposta opaca de um <script>
+// sem crossorigin não tem status (ok é falso) e nunca entraria no cache.
+const CACHE = 'curriculo-estatico-v2';
+const SHELL = [
+    './',
+    'index.html',
+    'static/css/style.css',
+    'cv_worker.js',
+    'cv_worker.py',
+    'form_schema.py',
+    'script.py',
+];
+
+self.addEventListener('install', function (ev) {
+    ev.waitUntil((async function () {
+        const cache = await caches.open(CACHE);
+        await cache.addAll(SHELL);
+        // Arquivos de terceiros só existem se vendor_assets.py foi executado
+        try {
+            const response = await fetch('vendor/manifest.json');
+            if (response.ok) {
+                const manifest = await response.json();
+                await cache.addAll(Object.keys(manifest.files));
+            }
+        } catch (e) {
+            console.warn('vendor/ indisponível; runtime virá do CDN', e);
+        }
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', function (ev) {
+    ev.waitUntil((async function () {
+        for (const name of await caches.keys()) {
+            if (name !== CACHE) await caches.delete(name);
+        }
+        await self.clients.claim();
+    })());
+});
+
+function imutavel(url) {
+    return url.pathname.includes('/vendor/') ||
+        url.hostname === 'cdn.jsdelivr.net' ||
+        url.hostname === 'cdnjs.cloudflare.com' ||
+        url.hostname === 'pyscript.net';
+}
+
+function buscar(request, url) {
+    if (url.origin === self.location.origin || request.mode !== 'no-cors') {
+        return fetch(request);
+    }
+    // Sem cabeçalhos CORS no CDN, fica a resposta opaca (usável, fora do cache)
+    return fetch(request.url, { mode: 'cors', credentials: 'omit' }).catch(function () {
+        return fetch(request);
+    });
+}
+
+self.addEventListener('fetch', function (ev) {
+    if (ev.request.method !== 'GET') return;
+    const url = new URL(ev.request.url);
+    if (url.origin !== self.location.origin && !imutavel(url)) return;
+
+    ev.respondWith((async function () {
+        const cache = await caches.open(CACHE);
+        const cached = await cache.match(ev.request, { ignoreSearch: true });
+        if (cached && imutavel(url)) return cached;
+
+        const network = buscar(ev.request, url).then(function (response) {
+            if (response.ok) cache.put(ev.request, response.clone());
+            return response;
+        });
+        if (cached) {
+            ev.waitUntil(network.catch(function () {}));
+            return cached;
+        }
+        return network;
+    })());
+});
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from admission import MemoryBusy, RenderAdmission
+from render_pool import Busy
+
+
+def test_single_render_above_budget_is_admitted():
+    admission = RenderAdmission(budget_bytes=100, wait=0)
+    with admission.admit(500) as info:
+        assert info == {"waited": 0.0, "in_flight_bytes": 500}
+    assert admission.snapshot()["in_flight_bytes"] == 0
+
+
+def test_render_over_budget_is_rejected_after_wait():
+    admission = RenderAdmission(budget_bytes=100, wait=0.05, retry_after=7)
+    with admission.admit(80):
+        with pytest.raises(MemoryBusy) as exc:
+            with admission.admit(30):
+                pass
+    assert isinstance(exc.value, Busy) and exc.value.retry_after == 7
+    snapshot = admission.snapshot()
+    assert snapshot["rejected"] == 1 and snapshot["deferred"] == 1
+    assert snapshot["in_flight"] == 0 and snapshot["in_flight_bytes"] == 0
+
+
+def test_waiting_render_is_admitted_when_bytes_are_released():
+    admission = RenderAdmission(budget_bytes=100, wait=5)
+    holding, release = threading.Event(), threading.Event()
+
+    def first():
+        with admission.admit(80):
+            holding.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    holding.wait(5)
+    threading.Timer(0.05, release.set).start()
+    with admission.admit(30) as info:
+        assert info["waited"] > 0
+        assert info["in_flight_bytes"] == 30
+    thread.join()
+    snapshot = admission.snapshot()
+    assert snapshot["admitted"] == 2 and snapshot["rejected"] == 0
+    assert snapshot["peak_bytes"] == 80
+
+
+def test_zero_budget_disables_admission():
+    admission = RenderAdmission(budget_bytes=0)
+    with admission.admit(10**12) as info:
+        assert info["waited"] == 0.0
+    assert admission.snapshot()["admitted"] == 0
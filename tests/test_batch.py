@@ -0,0 +1,55 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from batch import BatchInputError, iter_records, stream_zip
+
+
+def _manifest(records, render=None):
+    render = render or (lambda index, record: (f"{index}.json", json.dumps(record).encode()))
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(records, render, workers=2))))
+    return archive, json.loads(archive.read("manifest.json"))
+
+
+def test_batch_manifest_reports_invalid_records():
+    lines = [b'{"nome": "Ana"}\n', b"{quebrado\n", b"[1]\n", b'{"nome": "Bia"}\n']
+    archive, manifest = _manifest(iter_records(lines, max_records=10))
+    assert (manifest["total"], manifest["ok"], manifest["errors"]) == (4, 2, 2)
+    items = {item["index"]: item for item in manifest["items"]}
+    assert items[1]["error"].startswith("BatchInputError: JSON inválido")
+    assert items[2]["error"] == "BatchInputError: Cada registro deve ser um objeto JSON"
+    assert sorted(archive.namelist()) == ["0.json", "3.json", "manifest.json"]
+
+
+def test_batch_manifest_reports_render_errors_and_record_limit():
+    def render(index, record):
+        if record.get("falha"):
+            raise ValueError("sem nome")
+        return f"{index}.json", b"{}"
+
+    lines = [b'{"nome": "Ana"}\n', b'{"falha": true}\n', b'{"nome": "Caio"}\n']
+    _, manifest = _manifest(iter_records(lines, max_records=2), render)
+    errors = [item for item in manifest["items"] if not item["ok"]]
+    assert errors[0] == {"index": 1, "ok": False, "error": "ValueError: sem nome"}
+    # O registro além do limite vira um erro no lugar dele, e o resto é ignorado
+    assert errors[1]["index"] == 2
+    assert "Máximo de 2 currículos" in errors[1]["error"]
+    assert manifest["total"] == 3
+
+
+def test_batch_json_array_over_limit_goes_to_manifest():
+    with pytest.raises(BatchInputError, match="Máximo de 2"):
+        list(iter_records([b"[{}, {}, {}]"], max_records=2))
+    _, manifest = _manifest(iter_records([b"[{}, {}, {}]"], max_records=2))
+    assert manifest["items"] == [
+        {"index": None, "ok": False, "error": "Máximo de 2 currículos por lote"}
+    ]
+
+
+def test_json_array_above_byte_cap_is_rejected_before_parsing():
+    lines = [b"[\n"] + [b'{"nome": "Ana"},\n'] * 100 + [b'{"nome": "Bia"}]\n']
+    with pytest.raises(BatchInputError, match="JSONL"):
+        list(iter_records(lines, max_records=1000, max_array_bytes=512))
+    assert len(list(iter_records(lines, max_records=1000, max_array_bytes=64 * 1024))) == 101
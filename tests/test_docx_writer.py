@@ -0,0 +1,51 @@
+import io
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+import docx_writer
+
+pytest.importorskip("docx")  # o pacote base vem do python-docx
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+CV = {
+    "nome": "Ana & Filhos <Dados>",
+    "titulo": " Engenheira de dados ",
+    "email": "ana@example.com",
+    "resumo": "Linha um\nLinha dois\tcom tab e controle\x07.",
+    "experiencias": [{"cargo": "Analista", "empresa": "ACME", "descricao": "ETL em Python"}],
+    "formacoes": [{"curso": "Estatística", "ano": "2015"}],
+    "skills_tecnicas": ["Python", "SQL"],
+}
+
+
+def test_write_fast_produces_a_valid_package():
+    data = docx_writer.write_fast(CV)
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        assert package.testzip() is None
+        names = package.namelist()
+        assert "[Content_Types].xml" in names and "word/document.xml" in names
+        assert len(names) == len(set(names))
+        root = ElementTree.fromstring(package.read("word/document.xml"))
+    text = "".join(node.text or "" for node in root.iter(f"{_W}t"))
+    assert "Ana & Filhos <Dados>" in text
+    assert "\x07" not in text
+
+
+def test_write_fast_matches_python_docx_document():
+    # O python-docx recusa caracteres de controle; o motor rápido os descarta
+    cv = dict(CV, resumo=CV["resumo"].replace("\x07", ""))
+    fast = zipfile.ZipFile(io.BytesIO(docx_writer.write_fast(cv)))
+    reference = zipfile.ZipFile(io.BytesIO(docx_writer.write_python_docx(cv)))
+    assert fast.read("word/document.xml") == reference.read("word/document.xml")
+    assert sorted(fast.namelist()) == sorted(reference.namelist())
+
+
+def test_write_fast_output_opens_in_python_docx():
+    from docx import Document
+
+    document = Document(io.BytesIO(docx_writer.write_fast(CV)))
+    styles = [p.style.name for p in document.paragraphs]
+    assert styles[0] == "Title" and "Heading 1" in styles and "List Bullet" in styles
@@ -0,0 +1,47 @@
+import base64
+
+import photo
+from form_schema import MAX_SKILLS, SECTIONS, parse_form, validate_cv_data
+
+
+def test_validate_cv_data_rejects_too_many_items():
+    section = SECTIONS[0]
+    item = {field.key: "x" for field in section.fields}
+    cv_data, errors = validate_cv_data({section.key: [item] * section.max_items})
+    assert not errors
+    assert len(cv_data[section.key]) == section.max_items
+
+    _, errors = validate_cv_data({section.key: [item] * (section.max_items + 1)})
+    assert errors == [f"{section.key}: máximo de {section.max_items} itens"]
+
+
+def test_validate_cv_data_reports_wrong_types():
+    _, errors = validate_cv_data({"nome": 1, SECTIONS[0].key: "texto"})
+    assert "nome: esperado texto" in errors
+    assert f"{SECTIONS[0].key}: esperado lista de objetos" in errors
+    assert validate_cv_data([]) == ({}, ["cv_data deve ser um objeto JSON"])
+
+
+def test_skill_lists_are_capped():
+    many = ", ".join(f"skill{i}" for i in range(MAX_SKILLS + 20))
+    assert len(parse_form([("skills_tecnicas", many)])["skills_tecnicas"]) == MAX_SKILLS
+    _, errors = validate_cv_data({"skills_tecnicas": many})
+    assert errors == [f"skills_tecnicas: máximo de {MAX_SKILLS} itens"]
+    _, errors = validate_cv_data({"skills_outras": ["x"] * MAX_SKILLS})
+    assert not errors
+
+
+def test_data_url_photo_goes_through_photo_processing(monkeypatch):
+    seen = {}
+
+    def fake_process(data, mime):
+        seen["args"] = (data, mime)
+        return photo.ProcessedPhoto(b"small", "image/jpeg", len(data))
+
+    monkeypatch.setattr(photo, "process_photo", fake_process)
+    url = "data:image/png;base64," + base64.b64encode(b"big image").decode()
+    assert photo.process_data_url(url).data_url() == "data:image/jpeg;base64,c21hbGw="
+    assert seen["args"] == (b"big image", "image/png")
+    # Outras URLs (e SVG) ficam como vieram
+    assert photo.process_data_url("https://example.com/foto.png") is None
+    assert photo.process_data_url("data:image/svg+xml;base64,PHN2Zy8+") is None
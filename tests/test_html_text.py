@@ -0,0 +1,35 @@
+from html_text import TextExtractor, extract_text
+
+
+def test_extract_text_skips_scripts_and_caps_chars():
+    html = "<p>Vaga <b>Python</b></p><script>var x = '<p>não</p>';</script><p>Django</p>"
+    assert extract_text(html).split() == ["Vaga", "Python", "Django"]
+    extractor = TextExtractor(max_chars=10)
+    extractor.feed("<p>" + "a" * 50 + "</p>")
+    assert extractor.close() == " " + "a" * 9  # o <p> vale um espaço
+    assert extractor.truncated
+
+
+def test_text_extractor_handles_tags_split_across_chunks():
+    extractor = TextExtractor()
+    for chunk in ("<di", "v>Engenheira<st", "yle>p{}</sty", "le> de dados &am", "p; ML</div>"):
+        extractor.feed(chunk)
+    assert extractor.close().split() == ["Engenheira", "de", "dados", "&", "ML"]
+
+
+def test_lone_quote_inside_an_attribute_does_not_swallow_text():
+    html = "<a title=it's href=/vaga>Python</a> e <b class='x>y'>Django</b> depois"
+    assert extract_text(html).split() == ["Python", "e", "Django", "depois"]
+
+
+def test_unclosed_attribute_quote_ends_at_first_gt_on_close():
+    extractor = TextExtractor()
+    extractor.feed('<p>Vaga</p><a title="sem fim>Python</a> e Django')
+    assert extractor.close().split() == ["Vaga", "Python", "e", "Django"]
+
+
+def test_attribute_quote_closed_in_the_next_chunk_is_waited_for():
+    extractor = TextExtractor()
+    for chunk in ('<a title="x', '>y">Python</a>'):
+        extractor.feed(chunk)
+    assert extractor.close() == "Python"
@@ -0,0 +1,28 @@
+from job_cache import JobKeywordCache, normalize_url
+
+
+def test_normalize_url_drops_tracking_params():
+    url = "HTTPS://Vagas.Example.com:443/vaga/123?utm_source=x&UTM_Campaign=y&gclid=1&fbclid=2"
+    assert normalize_url(url) == "https://vagas.example.com/vaga/123"
+
+
+def test_normalize_url_keeps_params_that_only_look_like_tracking():
+    url = "https://example.com/v?ref=42&reference=a&trkId=b&trk=c&refid=d&id=7"
+    assert normalize_url(url) == "https://example.com/v?id=7&ref=42&reference=a&trkId=b"
+
+
+def test_normalize_url_sorts_query_and_keeps_custom_port():
+    assert normalize_url("http://example.com:8080/a?b=2&a=1") == "http://example.com:8080/a?a=1&b=2"
+
+
+def test_normalize_url_leaves_the_path_alone():
+    assert normalize_url("https://example.com/vagas/123/") == "https://example.com/vagas/123/"
+    assert normalize_url("https://example.com/vagas/123") == "https://example.com/vagas/123"
+    assert normalize_url("https://example.com/a//b") == "https://example.com/a//b"
+    assert normalize_url("https://example.com") == "https://example.com/"
+
+
+def test_schema_connection_is_closed_after_init(tmp_path):
+    cache = JobKeywordCache(str(tmp_path / "vagas.sqlite3"))
+    assert cache.enabled
+    assert getattr(cache._local, "conn", None) is None
@@ -0,0 +1,74 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from job_fetch import JobFetcher
+
+
+class _FakeResponse:
+    status_code = 200
+    headers = {"Content-Type": "text/html; charset=utf-8"}
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        for start in range(0, len(self.body), size):
+            chunk = self.body[start:start + size]
+            self.read += len(chunk)
+            yield chunk
+
+
+class _FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+def test_job_fetch_download_stops_at_max_bytes():
+    response = _FakeResponse(b"<p>" + b"palavra " * 100_000 + b"</p>")
+    fetcher = JobFetcher(max_bytes=64 * 1024)
+    # Sem requests: a sessão do processo já "existe"
+    fetcher._session, fetcher._pid = _FakeSession(response), os.getpid()
+    status, text, _ = fetcher.download("https://example.com/vaga", {})
+    assert status == 200
+    assert response.read <= 128 * 1024  # no máximo o pedaço em que o limite caiu
+    assert len(text) <= 64 * 1024
+    assert fetcher.stats["truncated"] == 1
+
+
+def _local_fetcher(**kwargs) -> JobFetcher:
+    # Sem requests: sessão e threads do processo já "existem"
+    fetcher = JobFetcher(**kwargs)
+    fetcher._executor = ThreadPoolExecutor(max_workers=fetcher.workers)
+    fetcher._pid = os.getpid()
+    return fetcher
+
+
+def test_fetch_expired_in_queue_counts_as_budget_exceeded():
+    fetcher = _local_fetcher(budget=0.05, workers=1)
+    release = threading.Event()
+    calls = []
+    slow = fetcher.start(lambda url: release.wait(5) and {"python": 1}, "https://a")
+    queued = fetcher.start(calls.append, "https://b")
+    assert fetcher.wait(slow, {}) == {}
+    release.set()
+    queued.result(timeout=5)  # sai da fila depois do orçamento e é descartada
+    assert fetcher.wait(queued, {}) == {}
+    assert calls == []
+    assert fetcher.stats["expired"] == 1
+    assert fetcher.stats["budget_exceeded"] == 2
+    assert fetcher.stats["in_budget"] == 0
+    assert fetcher.snapshot()["pending"] == 0
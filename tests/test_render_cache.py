@@ -0,0 +1,33 @@
+from render_cache import RenderCache, make_key
+
+
+def test_key_changes_with_data_geracao():
+    cv = {"nome": "Ana", "data_geracao": "16/10/2026"}
+    outro_dia = dict(cv, data_geracao="17/10/2026")
+    assert make_key(cv, "corporativo", "pdf") == make_key(dict(cv), "corporativo", "pdf")
+    assert make_key(cv, "corporativo", "pdf") != make_key(outro_dia, "corporativo", "pdf")
+
+
+def test_key_depends_on_template_and_format():
+    cv = {"nome": "Ana"}
+    assert make_key(cv, "corporativo", "pdf") != make_key(cv, "moderno", "pdf")
+    assert make_key(cv, "corporativo", "pdf") != make_key(cv, "corporativo", "word")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = RenderCache(max_items=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"  # "b" passa a ser o menos usado
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1" and cache.get("c") == b"3"
+    assert cache.stats["evictions"] == 1
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    # Duas instâncias no mesmo diretório fazem o papel de dois workers
+    RenderCache(disk_dir=str(tmp_path)).put("k" * 64, b"pdf")
+    other = RenderCache(disk_dir=str(tmp_path))
+    assert other.get("k" * 64) == b"pdf"
+    assert other.stats["disk_hits"] == 1
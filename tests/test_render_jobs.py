@@ -0,0 +1,85 @@
+import pytest
+
+from render_jobs import QueueFull, RenderJobQueue
+from render_pool import Busy
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return RenderJobQueue(str(tmp_path / "tarefas.sqlite3"), max_pending=2, max_attempts=2)
+
+
+def _request(queue, job_id):
+    return queue._conn().execute(
+        "SELECT request FROM render_jobs WHERE id = ?", (job_id,)
+    ).fetchone()[0]
+
+
+def test_job_runs_and_drops_the_request(queue):
+    job_id = queue.submit({"nome": "Ana", "foto_url": "data:image/jpeg;base64,AAAA"})
+    assert queue.get(job_id)["status"] == "queued"
+    assert queue.run_once(lambda request: ("ana.pdf", "pdf", request["nome"].encode()))
+    info = queue.get(job_id)
+    assert info["status"] == "done" and info["attempts"] == 1
+    assert queue.result(job_id) == ("ana.pdf", "pdf", b"Ana")
+    assert _request(queue, job_id) == "{}"  # currículo e foto não ficam no disco
+    assert not queue.run_once(lambda request: None)
+
+
+def test_handler_error_is_recorded(queue):
+    job_id = queue.submit({})
+
+    def handler(request):
+        raise ValueError("template inexistente")
+
+    queue.run_once(handler)
+    info = queue.get(job_id)
+    assert info["status"] == "error"
+    assert info["error"] == "ValueError: template inexistente"
+    assert queue.result(job_id) is None
+
+
+def test_busy_handler_releases_without_spending_an_attempt(queue):
+    job_id = queue.submit({})
+
+    def handler(request):
+        raise Busy("pool cheio", retry_after=0)
+
+    queue.run_once(handler)
+    info = queue.get(job_id)
+    assert info["status"] == "queued" and info["attempts"] == 0
+
+
+def test_expired_lease_is_claimed_again_until_max_attempts(queue):
+    job_id = queue.submit({})
+    for attempt in (1, 2):
+        claimed = queue._claim()
+        assert claimed[0] == job_id
+        assert queue.get(job_id)["attempts"] == attempt
+        # O processo morreu no meio: o lease vence
+        queue._conn().execute("UPDATE render_jobs SET lease_until = 0 WHERE id = ?", (job_id,))
+    assert queue._claim() is None
+    info = queue.get(job_id)
+    assert info["status"] == "error" and "2 tentativas" in info["error"]
+    assert _request(queue, job_id) == "{}"
+
+
+def test_submit_rejects_above_max_pending(queue):
+    queue.submit({})
+    queue.submit({})
+    with pytest.raises(QueueFull) as exc:
+        queue.submit({})
+    assert exc.value.retry_after == queue.retry_after
+    assert queue.snapshot()["rejected"] == 1
+
+
+def test_schema_connection_is_not_kept_for_the_fork(tmp_path):
+    queue = RenderJobQueue(str(tmp_path / "tarefas.sqlite3"))
+    assert queue.enabled
+    assert getattr(queue._local, "conn", None) is None  # nada herdado pelos workers
+    assert queue.snapshot()["queued"] == 0
+
+
+def test_queue_is_disabled_when_the_database_cannot_be_created(tmp_path):
+    queue = RenderJobQueue(str(tmp_path / "nao_existe" / "tarefas.sqlite3"))
+    assert not queue.enabled
@@ -0,0 +1,118 @@
+"""Baixa para ``vendor/`` os arquivos de terceiros do modo estático (index.html).
+
+As versões ficam fixas aqui; a página e o Web Worker procuram primeiro a
+cópia local e só caem para o CDN (mesma versão) se ela não existir. O
+PyScript (usado quando o Web Worker não está disponível) também é copiado, e
+com a cópia local ele usa o Pyodide de ``vendor/`` em vez do CDN. O
+``vendor/manifest.json`` gerado lista os arquivos para o service worker
+(``sw.js``) guardá-los no cache já na instalação, e assim as visitas
+seguintes abrem sem rede.
+
+A pasta é sempre ``vendor/`` ao lado deste script: ``index.html``,
+``cv_worker.js`` e ``sw.js`` procuram os arquivos nesse caminho.
+
+Uso (antes de publicar a página estática):
+
+    python vendor_assets.py [--forcar]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import urllib.request
+from typing import Dict
+
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vendor")
+
+PYODIDE_VERSION = "0.23.4"
+JSPDF_VERSION = "2.5.1"
+PYSCRIPT_VERSION = "2023.05.1"
+
+_PYODIDE_CDN = f"https://cdn.jsdelivr.net/pyodide/v{PYODIDE_VERSION}/full/"
+# Só o núcleo do Pyodide: form_schema.py e cv_worker.py usam apenas a stdlib
+_PYODIDE_FILES = (
+    "pyodide.js",
+    "pyodide.asm.js",
+    "pyodide.asm.wasm",
+    "python_stdlib.zip",
+    "repodata.json",
+)
+
+# caminho relativo a vendor/ -> URL de origem
+ASSETS: Dict[str, str] = {
+    **{f"pyodide/{PYODIDE_VERSION}/{name}": _PYODIDE_CDN + name for name in _PYODIDE_FILES},
+    f"jspdf/{JSPDF_VERSION}/jspdf.umd.min.js": (
+        f"https://cdnjs.cloudflare.com/ajax/libs/jspdf/{JSPDF_VERSION}/jspdf.umd.min.js"
+    ),
+    **{
+        f"pyscript/{PYSCRIPT_VERSION}/{name}": (
+            f"https://pyscript.net/releases/{PYSCRIPT_VERSION}/{name}"
+        )
+        for name in ("pyscript.js", "pyscript.css")
+    },
+}
+
+
+def download(url: str, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh, urllib.request.urlopen(url, timeout=60) as response:
+            while True:
+                chunk = response.read(1 << 16)
+                if not chunk:
+                    break
+                fh.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        # Download interrompido: não deixa o .tmp parcial em vendor/
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--forcar", action="store_true", help="baixa de novo o que já existe")
+    args = parser.parse_args(argv)
+
+    files = {}
+    for relative, url in ASSETS.items():
+        path = os.path.join(VENDOR_DIR, relative)
+        if args.forcar or not os.path.exists(path):
+            try:
+                download(url, path)
+            except OSError as exc:
+                print(f"erro ao baixar {url}: {exc}", file=sys.stderr)
+                return 1
+        size = os.path.getsize(path)
+        # Caminhos no manifesto relativos à raiz do site (onde ficam index.html e sw.js)
+        files[f"vendor/{relative}"] = {"bytes": size, "sha256": _sha256(path)}
+        print(f"{relative:45} {size:>10}")
+
+    manifest = {
+        "pyodide": PYODIDE_VERSION,
+        "jspdf": JSPDF_VERSION,
+        "pyscript": PYSCRIPT_VERSION,
+        "files": files,
+    }
+    with open(os.path.join(VENDOR_DIR, "manifest.json"), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+        fh.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())